@@ -1,21 +1,22 @@
 import logging
 import os
+from datetime import timedelta
 
 import typer
 from zero_3rdparty.file_utils import clean_dir
 
 from atlas_init.cli_cfn.aws import (
+    StackRef,
     activate_resource_type,
     deactivate_third_party_type,
+    delete_stacks,
     deregister_cfn_resource_type,
     get_last_cfn_type,
-    wait_on_stack_ok,
-)
-from atlas_init.cli_cfn.aws import (
-    delete_stack as delete_stack_aws,
+    wait_on_stacks_ok,
 )
 from atlas_init.cli_cfn.contract import contract_test_cmd
 from atlas_init.cli_cfn.example import example_cmd
+from atlas_init.cli_cfn.type_registry import CfnTypeRegistry, print_version_regions
 from atlas_init.cli_cfn.files import (
     create_sample_file_from_input,
     has_md_link,
@@ -154,17 +155,37 @@ def gen_docs():
 @app.command()
 def wait_on_stack(
     stack_name: str = typer.Argument(...),
-    region: str = typer.Argument(...),
+    regions: list[str] = typer.Argument(..., help="One or more regions, waits on all of them concurrently"),
     timeout_s: int = typer.Option(300, "-t", "--timeout-seconds"),
 ):
-    wait_on_stack_ok(stack_name, region, timeout_seconds=timeout_s)
-    logger.info(f"stack {stack_name} in {region} is ready ✅")
+    results = wait_on_stacks_ok([StackRef(stack_name, region) for region in regions], timeout_seconds=timeout_s)
+    if not all(result.is_ok for result in results):
+        raise typer.Exit(1)
+    logger.info(f"stack {stack_name} in {', '.join(regions)} is ready ✅")
 
 
 @app.command()
 def delete_stack(
     stack_name: str = typer.Argument(...),
-    region: str = typer.Argument(...),
+    regions: list[str] = typer.Argument(..., help="One or more regions, deletes concurrently"),
 ):
-    delete_stack_aws(region, stack_name)
-    logger.info(f"stack {stack_name} in {region} is deleted ✅")
+    results = delete_stacks([StackRef(stack_name, region) for region in regions])
+    if not all(result.is_ok for result in results):
+        raise typer.Exit(1)
+    logger.info(f"stack {stack_name} in {', '.join(regions)} is deleted ✅")
+
+
+@app.command()
+def versions(
+    type_name: str = typer.Argument(..., help="e.g. MongoDB::Atlas::Cluster"),
+    max_age_hours: float = typer.Option(6, "--max-age-hours", help="Only regions with an older snapshot are queried"),
+    force: bool = typer.Option(False, "--force", help="Query all regions ignoring the snapshot age"),
+):
+    settings = init_settings()
+    registry_path = settings.cfn_type_registry_path
+    registry = CfnTypeRegistry.load(registry_path)
+    max_age = timedelta(0) if force else timedelta(hours=max_age_hours)
+    try:
+        print_version_regions(type_name, registry, max_age=max_age)
+    finally:
+        registry.store(registry_path)
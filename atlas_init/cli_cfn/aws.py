@@ -1,26 +1,26 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
 from collections.abc import Sequence
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import UTC, datetime
 from functools import lru_cache, total_ordering
 from pathlib import Path
+from threading import Event as ThreadEvent
+from time import monotonic
+from typing import Callable, NamedTuple
 
 import botocore.exceptions
 import humanize
-import typer
+from ask_shell import new_task
 from boto3.session import Session
-from model_lib import Event
+from model_lib import Entity, Event
 from mypy_boto3_cloudformation import CloudFormationClient
 from mypy_boto3_cloudformation.type_defs import ListTypesOutputTypeDef, ParameterTypeDef
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
 from zero_3rdparty.datetime_utils import utc_now
-from zero_3rdparty.iter_utils import group_by_once
 
 from atlas_init.cli_helper.run import run_command_is_ok
-from atlas_init.cloud.aws import REGIONS, PascalAlias, region_continent
+from atlas_init.cloud.aws import REGIONS, PascalAlias
 from atlas_init.settings.interactive import confirm
 
 logger = logging.getLogger(__name__)
@@ -87,18 +87,26 @@ def delete_role_stack(type_name: str, region_name: str, role_arn: str = "") -> N
     delete_stack(region_name, stack_name, role_arn)
 
 
-def delete_stack(region_name: str, stack_name: str, role_arn: str = ""):
+def delete_stack(region_name: str, stack_name: str, role_arn: str = "", *, wait: bool = True) -> bool:
+    """Returns False if the stack doesn't exist, with `wait=False` the caller waits on the deletion."""
     client = cloud_formation_client(region_name)
     logger.warning(f"deleting stack {stack_name} in region={region_name}")
     try:
-        client.update_termination_protection(EnableTerminationProtection=False, StackName=stack_name)
+        [stack] = client.describe_stacks(StackName=stack_name)["Stacks"]
     except Exception as e:
         if "does not exist" in repr(e):
             logger.warning(f"stack {stack_name} not found")
-            return
+            return False
         raise
-    client.delete_stack(StackName=stack_name, RoleARN=role_arn)
-    wait_on_stack_ok(stack_name, region_name, expect_not_found=True)
+    if stack.get("EnableTerminationProtection"):
+        client.update_termination_protection(EnableTerminationProtection=False, StackName=stack_name)
+    if role_arn:
+        client.delete_stack(StackName=stack_name, RoleARN=role_arn)
+    else:
+        client.delete_stack(StackName=stack_name)
+    if wait:
+        wait_on_stack_ok(stack_name, region_name, expect_not_found=True)
+    return True
 
 
 def create_stack(
@@ -153,12 +161,6 @@ class StackInProgressError(StackBaseError):
     pass
 
 
-class StackError(StackBaseError):
-    def __init__(self, status: str, timestamp: datetime, status_reason: str, reasons: str) -> None:
-        super().__init__(status, timestamp, status_reason)
-        self.reasons = reasons
-
-
 @total_ordering
 class StackEvent(Event):
     model_config = PascalAlias
@@ -198,6 +200,16 @@ class StackEvents(Event):
                 return reason
         return ""
 
+    def operation_failures(self, stack_name: str) -> list[StackEvent]:
+        """FAILED events since the stack's last CREATE/UPDATE/DELETE_IN_PROGRESS event, ignores older operations."""
+        sorted_events = sorted(self.stack_events)
+        operation_start = EARLY_DATETIME
+        for event in reversed(sorted_events):
+            if event.logical_resource_id == stack_name and event.resource_status in _OPERATION_START_STATUSES:
+                operation_start = event.timestamp
+                break
+        return [event for event in sorted_events if event.timestamp >= operation_start and event.is_error]
+
     def multiple_reasons(self, max_reasons: int = 5) -> str:
         reasons = []
         for event in sorted(self.stack_events, reverse=True):
@@ -209,6 +221,167 @@ class StackEvents(Event):
         return "\n".join(reasons)
 
 
+_OPERATION_START_STATUSES = {"CREATE_IN_PROGRESS", "UPDATE_IN_PROGRESS", "DELETE_IN_PROGRESS"}
+STATUS_NOT_FOUND = "NOT_FOUND"
+STATUS_ABORTED = "ABORTED"
+STATUS_DEPLOY_FAILED = "DEPLOY_FAILED"
+
+
+class StackRef(NamedTuple):
+    stack_name: str
+    region: str
+
+    def __str__(self) -> str:
+        return f"{self.stack_name}@{self.region}"
+
+
+class StackWaitResult(Entity):
+    stack_name: str
+    region: str
+    status: str = ""
+    status_reason: str = ""
+    reasons: str = ""
+    duration_seconds: float = 0
+    polls: int = 0
+
+    @property
+    def is_error(self) -> bool:
+        return self.status.endswith("FAILED")
+
+    @property
+    def is_timeout(self) -> bool:
+        return self.status == "" or self.status.endswith("IN_PROGRESS")
+
+    @property
+    def is_ok(self) -> bool:
+        return not (self.is_error or self.is_timeout or self.status == STATUS_ABORTED)
+
+    @property
+    def is_deployed(self) -> bool:
+        return self.is_ok and "ROLLBACK" not in self.status
+
+    def summary_line(self) -> str:
+        status = self.status or "TIMEOUT"
+        reason = f" {self.status_reason}" if self.status_reason else ""
+        return f"{self.stack_name:<40} {self.region:<16} {status:<28} {self.duration_seconds:>6.0f}s {self.polls:>3} polls{reason}"
+
+
+class StackWaitError(Exception):
+    def __init__(self, result: StackWaitResult) -> None:
+        super().__init__(f"stack error {result.stack_name} {result.status} {result.status_reason}\n{result.reasons}")
+        self.result = result
+
+
+def stacks_summary(results: list[StackWaitResult]) -> str:
+    header = f"{'STACK':<40} {'REGION':<16} {'STATUS':<28} {'TIME':>7} {'POLLS':>9}"
+    return "\n".join([header, *(result.summary_line() for result in results)])
+
+
+def _wait_on_single_stack(
+    ref: StackRef,
+    *,
+    expect_not_found: bool,
+    timeout_seconds: float,
+    min_poll_seconds: float,
+    max_poll_seconds: float,
+    fail_fast: bool,
+    stop: ThreadEvent,
+) -> StackWaitResult:
+    """Polls faster while new stack events arrive and backs off exponentially while nothing happens."""
+    result = StackWaitResult(stack_name=ref.stack_name, region=ref.region)
+    client = cloud_formation_client(ref.region)
+    start = monotonic()
+    poll_seconds = min_poll_seconds
+    seen_events = 0
+    while not stop.is_set():
+        result.polls += 1
+        result.duration_seconds = monotonic() - start
+        try:
+            response = client.describe_stack_events(StackName=ref.stack_name)
+        except botocore.exceptions.ClientError as e:
+            error_message = e.response.get("Error", {}).get("Message", "")
+            if not expect_not_found or "does not exist" not in error_message:
+                raise
+            result.status = STATUS_NOT_FOUND
+            return result
+        parsed = StackEvents(stack_events=response.get("StackEvents", []))  # type: ignore
+        current_event = parsed.current_stack_event(ref.stack_name)
+        result.status = current_event.resource_status
+        result.status_reason = current_event.resource_status_reason
+        if fail_fast and (failures := parsed.operation_failures(ref.stack_name)):
+            first_failure = failures[0]
+            result.status = first_failure.resource_status
+            result.status_reason = f"{first_failure.logical_resource_id}: {first_failure.resource_status_reason}"
+            result.reasons = parsed.multiple_reasons()
+            stop.set()
+            return result
+        if not current_event.in_progress:
+            if current_event.is_error or "ROLLBACK" in result.status:
+                result.reasons = parsed.multiple_reasons()
+            if fail_fast and current_event.is_error:
+                stop.set()
+            return result
+        if result.duration_seconds >= timeout_seconds:
+            return result
+        event_count = len(parsed.stack_events)
+        if event_count > seen_events:
+            poll_seconds = min_poll_seconds
+        else:
+            poll_seconds = min(poll_seconds * 2, max_poll_seconds)
+        seen_events = event_count
+        stop.wait(min(poll_seconds, max(timeout_seconds - result.duration_seconds, 0)))
+    result.status = STATUS_ABORTED
+    return result
+
+
+def wait_on_stacks_ok(
+    stacks: Sequence[StackRef],
+    *,
+    expect_not_found: bool = False,
+    timeout_seconds: float = 300,
+    min_poll_seconds: float = 2,
+    max_poll_seconds: float = 30,
+    fail_fast: bool = True,
+    max_workers: int = 10,
+) -> list[StackWaitResult]:
+    """Waits on many stacks (possibly in different regions) concurrently.
+
+    With fail_fast, the first *_FAILED event of a stack operation stops the wait on that stack and aborts the others.
+    """
+    stop = ThreadEvent()
+    results: dict[StackRef, StackWaitResult] = {}
+    with (
+        new_task(f"Waiting on {len(stacks)} stacks", total=len(stacks)) as task,
+        ThreadPoolExecutor(max_workers=max_workers) as pool,
+    ):
+        futures = {
+            pool.submit(
+                _wait_on_single_stack,
+                ref,
+                expect_not_found=expect_not_found,
+                timeout_seconds=timeout_seconds,
+                min_poll_seconds=min_poll_seconds,
+                max_poll_seconds=max_poll_seconds,
+                fail_fast=fail_fast,
+                stop=stop,
+            ): ref
+            for ref in stacks
+        }
+        for future in as_completed(futures):
+            ref = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                stop.set()
+                raise
+            logger.info(f"stack {ref} {result.status or 'TIMEOUT'} {'✅' if result.is_ok else '❌'}")
+            results[ref] = result
+            task.update(advance=1)
+    ordered = [results[ref] for ref in stacks]
+    logger.info(f"stack wait summary:\n{stacks_summary(ordered)}")
+    return ordered
+
+
 def wait_on_stack_ok(
     stack_name: str,
     region_name: str,
@@ -216,88 +389,131 @@ def wait_on_stack_ok(
     expect_not_found: bool = False,
     timeout_seconds: int = 300,
 ) -> None:
-    attempts = timeout_seconds // 6
-
-    @retry(
-        stop=stop_after_attempt(attempts + 1),
-        wait=wait_fixed(6),
-        retry=retry_if_exception_type(StackInProgressError),
-        reraise=True,
+    [result] = wait_on_stacks_ok(
+        [StackRef(stack_name, region_name)],
+        expect_not_found=expect_not_found,
+        timeout_seconds=timeout_seconds,
+        fail_fast=False,
     )
-    def _wait_on_stack_ok() -> None:
-        client = cloud_formation_client(region_name)
-        try:
-            response = client.describe_stack_events(StackName=stack_name)
-        except botocore.exceptions.ClientError as e:
-            if not expect_not_found:
-                raise
-            error_message = e.response.get("Error", {}).get("Message", "")
-            if "does not exist" not in error_message:
-                raise
-            return None
-        parsed = StackEvents(stack_events=response.get("StackEvents", []))  # type: ignore
-        current_event = parsed.current_stack_event(stack_name)
-        if current_event.in_progress:
-            logger.info(f"stack in progress {stack_name} {current_event.resource_status}")
-            raise StackInProgressError(
-                current_event.resource_status,
-                current_event.timestamp,
-                current_event.resource_status_reason,
-            )
-        if current_event.is_error:
-            raise StackError(
-                current_event.resource_status,
-                current_event.timestamp,
-                current_event.resource_status_reason,
-                reasons=parsed.multiple_reasons(),
-            )
-        status = current_event.resource_status
-        logger.info(f"stack is ready {stack_name} {status} ✅")
-        if "ROLLBACK" in status:
-            last_reason = parsed.multiple_reasons()
-            logger.warning(f"stack did rollback, got: {current_event!r}\n{last_reason}")
+    if result.is_timeout:
+        raise StackInProgressError(result.status, utc_now(), result.status_reason)
+    if result.is_error:
+        raise StackWaitError(result)
+    logger.info(f"stack is ready {stack_name} {result.status} ✅")
+    if "ROLLBACK" in result.status:
+        logger.warning(f"stack did rollback, got: {result.status}\n{result.reasons}")
+
+
+def delete_stacks(
+    stacks: Sequence[StackRef], role_arn: str = "", timeout_seconds: float = 300
+) -> list[StackWaitResult]:
+    deleting = [ref for ref in stacks if delete_stack(ref.region, ref.stack_name, role_arn, wait=False)]
+    if not deleting:
+        return []
+    return wait_on_stacks_ok(deleting, expect_not_found=True, timeout_seconds=timeout_seconds)
+
+
+def _deploy_single_stack(
+    ref: StackRef,
+    template_str: str,
+    parameters: Sequence[ParameterTypeDef],
+    *,
+    role_arn: str,
+    update: bool,
+    timeout_seconds: float,
+    min_poll_seconds: float,
+    max_poll_seconds: float,
+    on_created: Callable[[StackRef], None],
+) -> StackWaitResult:
+    client = cloud_formation_client(ref.region)
+    start = monotonic()
+    request: dict = {"StackName": ref.stack_name, "TemplateBody": template_str, "Parameters": list(parameters)}
+    if role_arn:
+        request["RoleARN"] = role_arn
+    try:
+        if update:
+            client.update_stack(**request)
+        else:
+            client.create_stack(**request)
+            on_created(ref)
+    except botocore.exceptions.ClientError as e:
+        error_message = e.response.get("Error", {}).get("Message", "")
+        return StackWaitResult(
+            stack_name=ref.stack_name,
+            region=ref.region,
+            status=STATUS_DEPLOY_FAILED,
+            status_reason=error_message,
+            duration_seconds=monotonic() - start,
+        )
+    result = _wait_on_single_stack(
+        ref,
+        expect_not_found=False,
+        timeout_seconds=timeout_seconds,
+        min_poll_seconds=min_poll_seconds,
+        max_poll_seconds=max_poll_seconds,
+        fail_fast=False,
+        stop=ThreadEvent(),
+    )
+    result.duration_seconds = monotonic() - start
+    return result
 
-        return None
 
-    try:
-        return _wait_on_stack_ok()
-    except StackError as e:
-        logger.warning(f"stack error {stack_name} {e.status} {e.status_reason}\n{e.reasons}")
-        raise typer.Exit(1) from None
-
-
-def print_version_regions(type_name: str) -> None:
-    version_regions = get_last_version_all_regions(type_name)
-    if regions_with_no_version := version_regions.pop(None, []):
-        logger.warning(f"no version for {type_name} found in {regions_with_no_version}")
-    for version in sorted(version_regions.keys()):  # type: ignore
-        regions = sorted(version_regions[version])
-        regions_comma_separated = ",".join(regions)
-        logger.info(f"'{version}' is latest in {regions_comma_separated}\ncontinents:")
-        for continent, cont_regions in group_by_once(regions, key=region_continent).items():
-            continent_regions = ", ".join(sorted(cont_regions))
-            logger.info(f"continent={continent}: {continent_regions}")
-
-
-def get_last_version_all_regions(type_name: str) -> dict[str | None, list[str]]:
-    futures = {}
-    with ThreadPoolExecutor(max_workers=10) as pool:
-        for region in REGIONS:
-            future = pool.submit(get_last_cfn_type, type_name, region, is_third_party=True)
-            futures[future] = region
-        done, not_done = wait(futures.keys(), timeout=300)
-        for f in not_done:
-            logger.warning(f"timeout to find version in region = {futures[f]}")
-    version_regions: dict[str | None, list[str]] = defaultdict(list)
-    for f in done:
-        region: str = futures[f]
-        try:
-            version = f.result()
-        except Exception:
-            logger.exception(f"failed to find version in region = {region}, error 👆")
-            continue
-        version_regions[version].append(region)
-    return version_regions
+def deploy_stacks(
+    stacks: Sequence[StackRef],
+    template_str: str,
+    parameters: Sequence[ParameterTypeDef],
+    *,
+    role_arn: str = "",
+    update: bool = False,
+    timeout_seconds: float = 300,
+    max_concurrent: int = 5,
+    cleanup_on_failure: bool = True,
+    min_poll_seconds: float = 2,
+    max_poll_seconds: float = 30,
+) -> list[StackWaitResult]:
+    """Creates (or updates) the same template in many regions, at most `max_concurrent` stacks are in progress at once.
+
+    The duration of each result includes the create/update call. With cleanup_on_failure, stacks created by this call
+    that didn't complete (failed, timed out or rolled back) are deleted, failed updates are left to CloudFormation's rollback.
+    """
+    created: set[StackRef] = set()
+    results: dict[StackRef, StackWaitResult] = {}
+    action = "Updating" if update else "Creating"
+    with (
+        new_task(f"{action} {len(stacks)} stacks", total=len(stacks)) as task,
+        ThreadPoolExecutor(max_workers=max_concurrent) as pool,
+    ):
+        futures = {
+            pool.submit(
+                _deploy_single_stack,
+                ref,
+                template_str,
+                parameters,
+                role_arn=role_arn,
+                update=update,
+                timeout_seconds=timeout_seconds,
+                min_poll_seconds=min_poll_seconds,
+                max_poll_seconds=max_poll_seconds,
+                on_created=created.add,
+            ): ref
+            for ref in stacks
+        }
+        for future in as_completed(futures):
+            ref = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = StackWaitResult(stack_name=ref.stack_name, region=ref.region, status=STATUS_DEPLOY_FAILED)
+                result.status_reason = str(e)
+            logger.info(f"stack {ref} {result.status or 'TIMEOUT'} {'✅' if result.is_deployed else '❌'}")
+            results[ref] = result
+            task.update(advance=1)
+    ordered = [results[ref] for ref in stacks]
+    logger.info(f"stack deploy summary:\n{stacks_summary(ordered)}")
+    if cleanup_on_failure and (cleanup := [ref for ref in stacks if ref in created and not results[ref].is_deployed]):
+        logger.warning(f"cleaning up {len(cleanup)} failed stacks: {', '.join(map(str, cleanup))}")
+        delete_stacks(cleanup, role_arn=role_arn, timeout_seconds=timeout_seconds)
+    return ordered
 
 
 @total_ordering
@@ -322,18 +538,14 @@ def publish_cfn_type(region: str):
     client.publish_type()
 
 
-def get_last_cfn_type(
-    type_name: str, region: str, *, is_third_party: bool = False, force_version: str = ""
-) -> None | CfnTypeDetails:
+def list_cfn_types(type_name_prefix: str, region: str, *, is_third_party: bool = False) -> list[CfnTypeDetails]:
     client: CloudFormationClient = cloud_formation_client(region)
-    prefix = type_name
-    logger.info(f"finding public 3rd party for '{prefix}' in {region}")
     visibility = "PUBLIC" if is_third_party else "PRIVATE"
     category = "THIRD_PARTY" if is_third_party else "REGISTERED"
     type_details: list[CfnTypeDetails] = []
     kwargs = {
         "Visibility": visibility,
-        "Filters": {"Category": category, "TypeNamePrefix": prefix},
+        "Filters": {"Category": category, "TypeNamePrefix": type_name_prefix},
         "MaxResults": 100,
     }
     next_token = ""  # nosec
@@ -348,16 +560,26 @@ def get_last_cfn_type(
             detail = CfnTypeDetails(
                 last_updated=last_updated,
                 version=last_version,
-                type_name=t.get("TypeName", type_name),
+                type_name=t.get("TypeName", type_name_prefix),
                 type_arn=arn,
                 is_activated=t.get("IsActivated", False),
             )
-            if detail.type_name != type_name:
-                continue
             type_details.append(detail)
-            logger.debug(f"{last_version} published @ {last_updated}")
+            logger.debug(f"{detail.type_name} {last_version} published @ {last_updated}")
         if not next_token:
             break
+    return type_details
+
+
+def get_last_cfn_type(
+    type_name: str, region: str, *, is_third_party: bool = False, force_version: str = ""
+) -> None | CfnTypeDetails:
+    logger.info(f"finding public 3rd party for '{type_name}' in {region}")
+    type_details = [
+        detail
+        for detail in list_cfn_types(type_name, region, is_third_party=is_third_party)
+        if detail.type_name == type_name
+    ]
     if not type_details:
         logger.warning(f"no version for {type_name} in region {region}")
         return None
@@ -1,13 +1,19 @@
+from __future__ import annotations
+
 import logging
 import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from threading import RLock
+from typing import Any, NamedTuple
 
 from model_lib import Entity, dump, parse_model
 from mypy_boto3_cloudformation.type_defs import ParameterTypeDef
-from pydantic import ConfigDict, Field
+from pydantic import ConfigDict, Field, PrivateAttr
 from rich import prompt
-from zero_3rdparty.file_utils import clean_dir
+from zero_3rdparty.file_utils import clean_dir, ensure_parents_write_text
 from zero_3rdparty.dict_nested import iter_nested_key_values, update
 
 from atlas_init.cli_cfn.files import create_sample_file, default_log_group_name
@@ -16,6 +22,7 @@ from atlas_init.repos.cfn import CfnType, cfn_examples_dir, cfn_type_normalized
 
 logger = logging.getLogger(__name__)
 UNKNOWN_PLACEHOLDER = "UNKNOWN"
+_type_setting_pattern = re.compile(r'"Type": "([^"]+)"')
 
 
 class TemplatePathNotFoundError(Exception):
@@ -24,16 +31,128 @@ class TemplatePathNotFoundError(Exception):
         self.examples_dir = examples_dir
 
 
-def infer_template_path(repo_path: Path, type_name: str, stack_name: str, example_name: str = "") -> Path:
+class TemplateIndexEntry(NamedTuple):
+    mtime_ns: int
+    size: int
+    type_names: frozenset[str]
+
+
+class TemplateIndexRecord(Entity):
+    mtime_ns: int
+    size: int
+    type_names: list[str]
+
+
+class TemplateIndexFile(Entity):
+    examples_dir: Path
+    templates: dict[str, TemplateIndexRecord] = Field(default_factory=dict)  # path relative to examples_dir
+
+
+@dataclass
+class CfnTemplateIndex:
+    """The `"Type": "..."` settings of every `*.json` file below `examples_dir`.
+
+    `refresh` lists the directory to pick up added and removed files,
+    a file is only read again when its mtime or size changes.
+    With a `cache_path` the entries are stored after every change and loaded on startup, so a new process only reads
+    the templates that changed since the last run.
+    """
+
+    examples_dir: Path
+    cache_path: Path | None = None
+    _entries: dict[Path, TemplateIndexEntry] = field(init=False, default_factory=dict)
+    _paths_by_type: dict[str, list[Path]] = field(init=False, default_factory=dict)
+    _lock: RLock = field(init=False, default_factory=RLock, repr=False)
+
+    def __post_init__(self):
+        cache_path = self.cache_path
+        if cache_path is None or not cache_path.exists():
+            return
+        try:
+            stored = parse_model(cache_path, t=TemplateIndexFile)
+        except Exception as e:
+            logger.warning(f"ignoring invalid template index {cache_path}: {e!r}")
+            return
+        if stored.examples_dir != self.examples_dir:
+            return
+        self._set_entries(
+            {
+                self.examples_dir / rel_path: TemplateIndexEntry(
+                    record.mtime_ns, record.size, frozenset(record.type_names)
+                )
+                for rel_path, record in stored.templates.items()
+            }
+        )
+
+    def _set_entries(self, entries: dict[Path, TemplateIndexEntry]) -> None:
+        paths_by_type: dict[str, list[Path]] = defaultdict(list)
+        for path, entry in entries.items():
+            for type_name in entry.type_names:
+                paths_by_type[type_name].append(path)
+        self._entries = entries
+        self._paths_by_type = dict(paths_by_type)
+
+    def _store(self) -> None:
+        if self.cache_path is None:
+            return
+        stored = TemplateIndexFile(
+            examples_dir=self.examples_dir,
+            templates={
+                path.relative_to(self.examples_dir).as_posix(): TemplateIndexRecord(
+                    mtime_ns=entry.mtime_ns, size=entry.size, type_names=sorted(entry.type_names)
+                )
+                for path, entry in sorted(self._entries.items())
+            },
+        )
+        ensure_parents_write_text(self.cache_path, dump(stored, "json"))
+
+    def refresh(self) -> None:
+        with self._lock:
+            entries: dict[Path, TemplateIndexEntry] = {}
+            changed = False
+            for path in self.examples_dir.rglob("*.json"):
+                stat = path.stat()
+                entry = self._entries.get(path)
+                if entry is None or (entry.mtime_ns, entry.size) != (stat.st_mtime_ns, stat.st_size):
+                    type_names = frozenset(_type_setting_pattern.findall(path.read_text()))
+                    entry = TemplateIndexEntry(stat.st_mtime_ns, stat.st_size, type_names)
+                    changed = True
+                entries[path] = entry
+            if not changed and entries.keys() == self._entries.keys():
+                return
+            self._set_entries(entries)
+            self._store()
+
+    def template_paths(self, type_name: str) -> list[Path]:
+        self.refresh()
+        return list(self._paths_by_type.get(type_name, []))
+
+
+_template_indexes: dict[tuple[Path, Path | None], CfnTemplateIndex] = {}
+_template_indexes_lock = RLock()
+
+
+def load_template_index(examples_dir: Path, cache_path: Path | None = None) -> CfnTemplateIndex:
+    """Shared in-process index per examples directory, refreshed on every lookup and stored in `cache_path`."""
+    examples_dir = examples_dir.resolve()
+    key = (examples_dir, cache_path)
+    with _template_indexes_lock:
+        if cached := _template_indexes.get(key):
+            return cached
+        index = _template_indexes[key] = CfnTemplateIndex(examples_dir, cache_path)
+        return index
+
+
+def infer_template_path(
+    repo_path: Path, type_name: str, stack_name: str, example_name: str = "", index_cache_path: Path | None = None
+) -> Path:
     examples_dir = cfn_examples_dir(repo_path)
     template_paths: list[Path] = []
-    type_setting = f'"Type": "{type_name}"'
-    for p in examples_dir.rglob("*.json"):
+    for p in load_template_index(examples_dir, index_cache_path).template_paths(type_name):
         if example_name and example_name != p.stem:
             continue
-        if type_setting in p.read_text():
-            logger.info(f"found template @ '{p.stem}': {p.parent}")
-            template_paths.append(p)
+        logger.info(f"found template @ '{p.stem}': {p.parent}")
+        template_paths.append(p)
     if not template_paths:
         raise TemplatePathNotFoundError(type_name, examples_dir)
     if len(template_paths) > 1:
@@ -112,6 +231,7 @@ class CfnTemplate(Entity):
     model_config = PascalAlias | ConfigDict(extra="allow")
     parameters: dict[str, CfnParameter]
     resources: dict[str, CfnResource]
+    _resources_by_type: dict[str, CfnResource] = PrivateAttr(default_factory=dict)
 
     @classmethod
     def read_template_types(cls, template_path: Path, prefix: str = CfnType.MONGODB_ATLAS_CFN_TYPE_PREFIX) -> set[str]:
@@ -119,9 +239,11 @@ class CfnTemplate(Entity):
         return {r.type for r in cfn_template.resources.values() if r.type.startswith(prefix)}
 
     def find_resource(self, type_name: str) -> CfnResource:
-        for r in self.resources.values():
-            if r.type == type_name:
-                return r
+        if not self._resources_by_type:
+            for r in self.resources.values():
+                self._resources_by_type.setdefault(r.type, r)
+        if resource := self._resources_by_type.get(type_name):
+            return resource
         raise ValueError(f"resource not found: {type_name}")
 
     def normalized_type_name(self, type_name: str) -> str:
@@ -131,18 +253,15 @@ class CfnTemplate(Entity):
     def get_resource_properties(self, type_name: str, parameters: list[ParameterTypeDef]) -> dict:
         resource = self.find_resource(type_name)
         properties = resource.properties
+        top_level_refs: dict[str, str] = {}
+        for maybe_key, value in properties.items():
+            if isinstance(value, dict) and isinstance(ref := value.get("Ref"), str):
+                top_level_refs.setdefault(ref, maybe_key)
         for param in parameters:
             key = param.get("ParameterKey")
             assert key
             if key not in properties:
-                key_found = next(
-                    (
-                        maybe_key
-                        for maybe_key, value in properties.items()
-                        if isinstance(value, dict) and value.get("Ref") == key
-                    ),
-                    None,
-                )
+                key_found = top_level_refs.pop(key, None)
                 err_msg = f"unable to find parameter {key} in resource {type_name}, can happen if there are template parameters not used for {type_name}"
                 if key_found is None:
                     logger.warning(err_msg)
@@ -227,24 +346,29 @@ def dump_sample_file(
     return samples_path
 
 
-def modify_resource_with_params(resource: CfnResource, resource_params: dict[str, Any]) -> None:
-    updates: dict[str, tuple[str, Any]] = {}
-    resource_properties = resource.properties
-    for path, value in iter_nested_key_values(resource_properties, include_list_indexes=True):
-        if not isinstance(value, dict):
-            continue
-        if "Ref" not in value:
+def parameter_ref_paths(properties: dict[str, Any]) -> dict[str, list[str]]:
+    """Paths of every `{"Ref": param_name}` in the properties grouped by `param_name`, found in a single walk."""
+    ref_paths: dict[str, list[str]] = defaultdict(list)
+    for path, value in iter_nested_key_values(properties, include_list_indexes=True):
+        if not isinstance(value, dict) or "Ref" not in value:
             continue
         param_name = value["Ref"]
         assert isinstance(param_name, str), f"Ref must be a string, {path}, got={param_name!r}"
-        if param_value := resource_params.get(param_name):
-            updates[param_name] = (path, param_value)
-        else:
-            logger.warning(f"unable to find parameter {param_name} in resource params, path={path}")
+        ref_paths[param_name].append(path)
+    return dict(ref_paths)
+
+
+def modify_resource_with_params(resource: CfnResource, resource_params: dict[str, Any]) -> None:
+    resource_properties = resource.properties
+    ref_paths = parameter_ref_paths(resource_properties)
+    for param_name, paths in ref_paths.items():
+        if not resource_params.get(param_name):
+            for path in paths:
+                logger.warning(f"unable to find parameter {param_name} in resource params, path={path}")
 
     for param_name, param_value in resource_params.items():
-        if update_path_value := updates.get(param_name):
-            update(resource_properties, *update_path_value)
+        if param_value and (paths := ref_paths.get(param_name)):
+            update(resource_properties, paths[-1], param_value)
         else:
             logger.warning(f"No ref found for {param_name} assumming top level on resource")
             resource_properties[param_name] = param_value
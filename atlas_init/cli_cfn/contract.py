@@ -1,7 +1,12 @@
 import logging
 import os
 import re
+import shutil
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from xml.etree import ElementTree
 
 import typer
 from model_lib import Entity
@@ -19,6 +24,12 @@ from atlas_init.settings.env_vars import AtlasInitSettings, init_settings
 from atlas_init.settings.env_vars_generated import AWSSettings
 
 logger = logging.getLogger(__name__)
+INPUTS_DIRNAME = "inputs"
+RPDK_LOG_FILENAME = "rpdk.log"
+CONTRACT_SHARDS_DIRNAME = ".contract_shards"
+DEFAULT_LAMBDA_PORT = 3001
+_input_number_pattern = re.compile(r"^inputs_(\d+)_")
+_test_name_input_pattern = re.compile(r"inputs_(\d+)")
 
 
 class RunContractTest(Entity):
@@ -29,11 +40,12 @@ class RunContractTest(Entity):
     skip_build: bool = False
     dry_run: bool = Field(default_factory=is_dry_run)
     only_names: list[str] | None = None
+    shards: int = 1
+    base_port: int = DEFAULT_LAMBDA_PORT
 
     @property
     def run_tests_command(self) -> tuple[str, str]:
-        if self.only_names:
-            names = " ".join(f"-k {name}" for name in self.only_names)
+        if names := self.name_filter:
             return (
                 "cfn",
                 f"test --function-name TestEntrypoint --verbose --region {self.cfn_region} -- {names}",
@@ -43,12 +55,45 @@ class RunContractTest(Entity):
             f"test --function-name TestEntrypoint --verbose --region {self.cfn_region}",
         )
 
+    @property
+    def name_filter(self) -> str:
+        """pytest only uses the last `-k`, the names are combined into a single expression."""
+        if not self.only_names:
+            return ""
+        return f'-k "{" or ".join(self.only_names)}"'
+
+    def shard_tests_command(self, port: int, junit_path: Path) -> tuple[str, str]:
+        """Runs the suite against the lambda on `port` and lets pytest report per test timings to `junit_path`."""
+        names = self.name_filter
+        return (
+            "cfn",
+            f"test --function-name TestEntrypoint --verbose --region {self.cfn_region} "
+            f"--endpoint http://127.0.0.1:{port} -- --junitxml={junit_path} {names}".rstrip(),
+        )
+
+    def start_lambda_command(self, port: int | None = None) -> tuple[str, str]:
+        command = f"local start-lambda --skip-pull-image --region {self.cfn_region}"
+        if port is not None:
+            command += f" --port {port}"
+        return "sam", command
+
+
+class ContractTestTiming(Entity):
+    name: str
+    seconds: float
+    outcome: str
+    shard: int = 0
+
 
 class RunContractTestOutput(Entity):
     sam_local_logs: str
     sam_local_exit_code: int
     contract_test_ok: bool
     rpdk_log: str
+    timings: list[ContractTestTiming] = Field(default_factory=list)
+
+    def slowest(self, n: int = 10) -> list[ContractTestTiming]:
+        return sorted(self.timings, key=lambda timing: timing.seconds, reverse=True)[:n]
 
 
 class CreateContractTestInputs(Entity):
@@ -93,8 +138,13 @@ class CFNBuild(Entity):
 
 def contract_test_cmd(
     only_names: list[str] = typer.Option(None, "-n", "--only-names", help="only run these contract tests"),
+    shards: int = typer.Option(
+        1, "-s", "--shards", min=1, help="split the contract test inputs across this many local lambdas"
+    ),
 ):
-    result = contract_test(only_names=only_names)
+    result = contract_test(only_names=only_names, shards=shards)
+    for timing in result.slowest():
+        logger.info(f"shard {timing.shard}: {timing.name} {timing.outcome} in {timing.seconds:.1f}s")
     if result.contract_test_ok:
         logger.info("contract tests passed 🥳")
     else:
@@ -110,6 +160,7 @@ def contract_test(
     settings: AtlasInitSettings | None = None,
     resource_paths: ResourcePaths | None = None,
     only_names: list[str] | None = None,
+    shards: int = 1,
 ):
     settings = settings or init_settings(AWSSettings)
     resource_paths = resource_paths or find_paths(Repo.CFN)
@@ -127,6 +178,7 @@ def contract_test(
         aws_profile=aws_settings.AWS_PROFILE,
         cfn_region=settings.cfn_region(aws_settings.AWS_REGION),
         only_names=only_names,
+        shards=shards,
     )
     if run_contract_test.skip_build:
         logger.info("skipping build")
@@ -134,6 +186,8 @@ def contract_test(
         build_event = CFNBuild(resource_path=resource_paths.resource_path)
         build(build_event)
         logger.info("build ok ✅")
+    if run_contract_test.shards > 1:
+        return run_sharded_contract_tests(run_contract_test, create_response.input_files)
     return run_contract_tests(run_contract_test)
 
 
@@ -196,26 +250,32 @@ def build(event: CFNBuild):
 
 
 def run_contract_tests(event: RunContractTest) -> RunContractTestOutput:
+    return _run_against_local_lambda(event, event.resource_path, event.run_tests_command)
+
+
+def _run_against_local_lambda(
+    event: RunContractTest, test_cwd: Path, tests_command: tuple[str, str], port: int | None = None
+) -> RunContractTestOutput:
     with RunManager(dry_run=event.dry_run) as manager:
         manager.set_timeouts(3)
-        resource_path = event.resource_path
+        binary, start_command = event.start_lambda_command(port)
         run_future = manager.run_process_wait_on_log(
-            f"local start-lambda --skip-pull-image --region {event.cfn_region}",
-            binary="sam",
-            cwd=resource_path,
+            start_command,
+            binary=binary,
+            cwd=event.resource_path,
             logger=logger,
             line_in_log="Running on http://",
             timeout=60,
         )
-        binary, test_cmd = event.run_tests_command
+        binary, test_cmd = tests_command
         test_result_ok = run_binary_command_is_ok(
             binary,
             test_cmd,
-            cwd=resource_path,
+            cwd=test_cwd,
             logger=logger,
             dry_run=event.dry_run,
         )
-        extra_log = resource_path / "rpdk.log"
+        extra_log = test_cwd / RPDK_LOG_FILENAME
         log_content = extra_log.read_text() if extra_log.exists() else ""
     sam_local_result = run_future.result(timeout=1)
     return RunContractTestOutput(
@@ -224,3 +284,150 @@ def run_contract_tests(event: RunContractTest) -> RunContractTestOutput:
         contract_test_ok=test_result_ok,
         rpdk_log=log_content,
     )
+
+
+class ContractTestShard(Entity):
+    index: int
+    port: int
+    work_dir: Path
+    input_files: list[Path]
+    input_numbers: dict[int, int] = Field(
+        default_factory=dict, description="renumbered input number in the shard -> original input number"
+    )
+
+    @property
+    def junit_path(self) -> Path:
+        return self.work_dir / "junit.xml"
+
+
+def shard_input_files(input_files: list[Path], shards: int) -> list[list[Path]]:
+    """Files sharing the `inputs_{N}_` prefix (create/update/invalid) stay in the same shard, empty shards are dropped."""
+    groups: dict[str, list[Path]] = {}
+    for path in input_files:
+        match = _input_number_pattern.match(path.name)
+        groups.setdefault(match.group(1) if match else path.name, []).append(path)
+    sharded: list[list[Path]] = [[] for _ in range(shards)]
+    for i, group in enumerate(groups.values()):
+        sharded[i % shards].extend(group)
+    return [files for files in sharded if files]
+
+
+def is_port_free(port: int) -> bool:
+    with socket.socket() as sock:
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError:
+            return False
+    return True
+
+
+def next_free_port(start: int, taken: set[int]) -> int:
+    port = start
+    while port in taken or not is_port_free(port):
+        port += 1
+    return port
+
+
+def prepare_contract_test_shards(
+    resource_path: Path, input_files: list[Path], shards: int, base_port: int = DEFAULT_LAMBDA_PORT
+) -> list[ContractTestShard]:
+    """Each shard gets a working dir linking to the resource files with only its own inputs, renumbered from 1.
+
+    `cfn test` reads the inputs and writes `rpdk.log` relative to its working dir, so the shards can run side by side.
+    Each shard listens on the first free port from `base_port` not used by an earlier shard.
+    """
+    shards_dir = resource_path / CONTRACT_SHARDS_DIRNAME
+    if shards_dir.exists():
+        shutil.rmtree(shards_dir)
+    skip_names = {INPUTS_DIRNAME, RPDK_LOG_FILENAME, CONTRACT_SHARDS_DIRNAME}
+    resource_entries = [path for path in sorted(resource_path.iterdir()) if path.name not in skip_names]
+    contract_shards: list[ContractTestShard] = []
+    for index, shard_files in enumerate(shard_input_files(input_files, shards)):
+        work_dir = shards_dir / f"shard_{index}"
+        inputs_dir = work_dir / INPUTS_DIRNAME
+        inputs_dir.mkdir(parents=True)
+        for entry in resource_entries:
+            (work_dir / entry.name).symlink_to(entry, target_is_directory=entry.is_dir())
+        renumbered: dict[str, int] = {}
+        shard_inputs = []
+        for path in shard_files:
+            if match := _input_number_pattern.match(path.name):
+                number = renumbered.setdefault(match.group(1), len(renumbered) + 1)
+                dest = inputs_dir / f"inputs_{number}_{path.name[match.end() :]}"
+            else:
+                dest = inputs_dir / path.name
+            shutil.copyfile(path, dest)
+            shard_inputs.append(dest)
+        port = next_free_port(base_port + index, {shard.port for shard in contract_shards})
+        contract_shards.append(
+            ContractTestShard(
+                index=index,
+                port=port,
+                work_dir=work_dir,
+                input_files=shard_inputs,
+                input_numbers={number: int(original) for original, number in renumbered.items()},
+            )
+        )
+    return contract_shards
+
+
+def parse_junit_timings(
+    junit_path: Path, shard: int = 0, input_numbers: dict[int, int] | None = None
+) -> list[ContractTestTiming]:
+    """`input_numbers` maps the `inputs_{N}` in the test names of a shard back to the original input numbers."""
+    if not junit_path.exists():
+        return []
+    timings = []
+    for testcase in ElementTree.parse(junit_path).getroot().iter("testcase"):
+        outcome = "passed"
+        for child_tag, child_outcome in [("failure", "failed"), ("error", "error"), ("skipped", "skipped")]:
+            if testcase.find(child_tag) is not None:
+                outcome = child_outcome
+                break
+        name = testcase.get("name", "")
+        if input_numbers:
+            name = _test_name_input_pattern.sub(
+                lambda match: f"inputs_{input_numbers.get(int(match.group(1)), match.group(1))}", name
+            )
+        timings.append(
+            ContractTestTiming(
+                name=name,
+                seconds=float(testcase.get("time") or 0),
+                outcome=outcome,
+                shard=shard,
+            )
+        )
+    return timings
+
+
+def run_contract_test_shard(event: RunContractTest, shard: ContractTestShard) -> RunContractTestOutput:
+    tests_command = event.shard_tests_command(shard.port, shard.junit_path)
+    output = _run_against_local_lambda(event, shard.work_dir, tests_command, port=shard.port)
+    output.timings = parse_junit_timings(shard.junit_path, shard.index, shard.input_numbers)
+    return output
+
+
+def merge_contract_test_outputs(outputs: list[RunContractTestOutput]) -> RunContractTestOutput:
+    failed = [output for output in outputs if not output.contract_test_ok]
+    return RunContractTestOutput(
+        sam_local_logs="\n".join(f"shard {i}:\n{output.sam_local_logs}" for i, output in enumerate(outputs)),
+        sam_local_exit_code=(failed or outputs)[0].sam_local_exit_code,
+        contract_test_ok=not failed,
+        rpdk_log="\n".join(f"shard {i}:\n{output.rpdk_log}" for i, output in enumerate(outputs)),
+        timings=[timing for output in outputs for timing in output.timings],
+    )
+
+
+def run_sharded_contract_tests(event: RunContractTest, input_files: list[Path]) -> RunContractTestOutput:
+    """Runs one local lambda and `cfn test` per shard concurrently, each lambda listens on its own port."""
+    shards = prepare_contract_test_shards(event.resource_path, input_files, event.shards, event.base_port)
+    if not shards:
+        logger.warning("no contract test inputs to shard, running the suite once")
+        return run_contract_tests(event)
+    logger.info(f"running contract tests in {len(shards)} shards on ports {[shard.port for shard in shards]}")
+    try:
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            outputs = list(executor.map(partial(run_contract_test_shard, event), shards))
+    finally:
+        shutil.rmtree(event.resource_path / CONTRACT_SHARDS_DIRNAME, ignore_errors=True)
+    return merge_contract_test_outputs(outputs)
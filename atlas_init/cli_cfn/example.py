@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
@@ -8,7 +9,11 @@ from rich import prompt
 
 from atlas_init.cli_args import parse_key_values_any
 from atlas_init.cli_cfn.aws import (
+    StackRef,
+    StackWaitError,
     create_stack,
+    delete_stacks,
+    deploy_stacks,
     ensure_resource_type_activated,
     update_stack,
 )
@@ -43,6 +48,8 @@ class CfnExampleInputs(CfnType):
     export_example_to_inputs: bool
     export_example_to_samples: bool
     register_all_types_in_example: bool
+    regions: list[str] = []
+    max_concurrent_regions: int = 5
 
     @field_validator("resource_params", mode="before")
     @classmethod
@@ -57,6 +64,9 @@ class CfnExampleInputs(CfnType):
         if self.delete_stack_first and self.operation == Operation.UPDATE:
             err_msg = "cannot delete first when updating"
             raise ValueError(err_msg)
+        if self.regions and self.is_export:
+            err_msg = "cannot export when deploying to many regions"
+            raise ValueError(err_msg)
         return self
 
     @property
@@ -99,6 +109,13 @@ def example_cmd(
         False, "-s", "--export-example-to-samples", help="Export example to samples"
     ),
     register_all_types_in_example: bool = typer.Option(False, "--reg-all", help="Check all types"),
+    regions: list[str] = typer.Option(
+        ...,
+        "--regions",
+        default_factory=list,
+        help="Deploy the example to many regions concurrently, can be set many times",
+    ),
+    max_concurrent_regions: int = typer.Option(5, "--max-concurrent-regions", help="Regions deployed at once"),
 ):
     settings = init_settings(TFModuleCfn, AWSSettings)
     cfn_settings = TFModuleCfn.from_env()
@@ -109,7 +126,7 @@ def example_cmd(
         type_name=type_name or infer_cfn_type_name(),
         example_name=example_name,
         delete_stack_first=delete_first,
-        region_filter=region or settings.cfn_region(aws_settings.AWS_REGION),
+        region_filter=region or (regions[0] if regions else settings.cfn_region(aws_settings.AWS_REGION)),
         stack_name=stack_name or f"{cfn_settings.MONGODB_ATLAS_PROFILE}-{example_name or 'atlas-init'}",
         operation=operation,  # type: ignore
         resource_params=resource_params,  # type: ignore
@@ -121,8 +138,27 @@ def example_cmd(
         export_example_to_inputs=export_example_to_inputs,
         export_example_to_samples=export_example_to_samples,
         register_all_types_in_example=register_all_types_in_example,
+        regions=regions,
+        max_concurrent_regions=max_concurrent_regions,
     )
-    example_handler(inputs, repo_path, resource_path, settings)
+    run_example(inputs, repo_path, resource_path, settings)
+
+
+def run_example(
+    inputs: CfnExampleInputs,
+    repo_path: Path,
+    resource_path: Path,
+    settings: AtlasInitSettings,
+) -> None:
+    """A failed stack wait is logged and exits with code 1 instead of a traceback."""
+    try:
+        if inputs.regions:
+            example_regions_handler(inputs, repo_path, resource_path, settings)
+        else:
+            example_handler(inputs, repo_path, resource_path, settings)
+    except StackWaitError as e:
+        logger.warning(str(e))
+        raise typer.Exit(1) from None
 
 
 def example_handler(
@@ -143,7 +179,9 @@ def example_handler(
     force_deregister = inputs.force_deregister
     execution_role = inputs.execution_role
 
-    template_path = infer_template_path(repo_path, type_name, stack_name, inputs.example_name)
+    template_path = infer_template_path(
+        repo_path, type_name, stack_name, inputs.example_name, settings.cfn_template_index_path
+    )
     parameters = infer_template_parameters(template_path, type_name, stack_name, inputs.resource_params or {})
     logger.info(f"parameters: {parameters}")
     if not prompt.Confirm("parameters 👆looks good?")():
@@ -205,3 +243,75 @@ def example_handler(
         )
     else:
         raise NotImplementedError
+
+
+def example_regions_handler(
+    inputs: CfnExampleInputs,
+    repo_path: Path,
+    resource_path: Path,
+    settings: AtlasInitSettings,
+):
+    """Same as `example_handler` for every region in `inputs.regions`, the template and parameters are resolved once."""
+    type_name = inputs.type_name
+    stack_name = inputs.stack_name
+    regions = inputs.regions
+    execution_role = inputs.execution_role
+    logger.info(f"about to {inputs.operation} stack {stack_name} for {type_name} in {len(regions)} regions: {regions}")
+    template_path = infer_template_path(
+        repo_path, type_name, stack_name, inputs.example_name, settings.cfn_template_index_path
+    )
+    parameters = infer_template_parameters(template_path, type_name, stack_name, inputs.resource_params or {})
+    logger.info(f"parameters: {parameters}")
+    if not prompt.Confirm("parameters 👆looks good?")():
+        raise typer.Abort
+    refs = [StackRef(stack_name, region) for region in regions]
+    if inputs.operation == Operation.DELETE or inputs.delete_stack_first:
+        deleted = delete_stacks(refs, role_arn=execution_role, timeout_seconds=inputs.stack_timeout_s)
+        if not all(result.is_ok for result in deleted):
+            raise typer.Exit(1)
+        if inputs.operation == Operation.DELETE:
+            return
+    extra_example_types = []
+    if inputs.register_all_types_in_example:
+        extra_example_types = [t for t in CfnTemplate.read_template_types(template_path) if t != type_name]
+    if extra_example_types:
+        logger.info(f"extra types {extra_example_types} in example {template_path}")
+
+    def activate_types(region: str) -> None:
+        if not inputs.force_keep:
+            ensure_resource_type_activated(
+                type_name,
+                region,
+                inputs.force_deregister,
+                settings.is_interactive,
+                resource_path,
+                execution_role,
+                force_version=inputs.reg_version,
+            )
+        for extra_type in extra_example_types:
+            ensure_resource_type_activated(
+                extra_type,
+                region,
+                inputs.force_deregister,
+                settings.is_interactive,
+                resource_path,
+                execution_role,
+            )
+
+    # activation can prompt, interactive sessions keep one region at a time
+    max_workers = 1 if settings.is_interactive else inputs.max_concurrent_regions
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for future in as_completed([pool.submit(activate_types, region) for region in regions]):
+            future.result()
+    results = deploy_stacks(
+        refs,
+        template_path.read_text(),
+        parameters,
+        role_arn=execution_role,
+        update=inputs.operation == Operation.UPDATE,
+        timeout_seconds=inputs.stack_timeout_s,
+        max_concurrent=inputs.max_concurrent_regions,
+    )
+    if not all(result.is_deployed for result in results):
+        raise typer.Exit(1)
+    logger.info(f"stack {stack_name} {inputs.operation} in {len(regions)} regions ✅")
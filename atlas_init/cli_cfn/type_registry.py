@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import RLock
+
+from ask_shell import new_task
+from model_lib import Entity, dump, parse_model
+from pydantic import Field, PrivateAttr
+from zero_3rdparty.datetime_utils import utc_now
+from zero_3rdparty.file_utils import ensure_parents_write_text
+from zero_3rdparty.iter_utils import group_by_once
+
+from atlas_init.cli_cfn.aws import CfnTypeDetails, list_cfn_types
+from atlas_init.cloud.aws import REGIONS, region_continent
+
+logger = logging.getLogger(__name__)
+DEFAULT_MAX_AGE = timedelta(hours=6)
+
+
+def _visibility(is_third_party: bool) -> str:
+    return "PUBLIC" if is_third_party else "PRIVATE"
+
+
+class RegionTypes(Entity):
+    region: str
+    visibility: str
+    type_name_prefix: str
+    refreshed: datetime
+    types: list[CfnTypeDetails] = Field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return registry_key(self.region, self.type_name_prefix, self.visibility)
+
+    def is_stale(self, max_age: timedelta, now: datetime | None = None) -> bool:
+        return (now or utc_now()) - self.refreshed > max_age
+
+    def last_type(self, type_name: str) -> CfnTypeDetails | None:
+        matching = [t for t in self.types if t.type_name == type_name]
+        return max(matching) if matching else None
+
+
+def registry_key(region: str, type_name_prefix: str, visibility: str) -> str:
+    return f"{region}/{visibility}/{type_name_prefix}"
+
+
+class CfnTypeRegistry(Entity):
+    """Local snapshot of `list_types` per region.
+
+    Only regions older than `max_age` are re-queried on `refresh`, the version queries are answered from the snapshot.
+    """
+
+    entries: dict[str, RegionTypes] = Field(default_factory=dict)
+    _lock: RLock = PrivateAttr(default_factory=RLock)
+
+    @classmethod
+    def load(cls, path: Path) -> CfnTypeRegistry:
+        if path.exists():
+            return parse_model(path, t=cls)
+        return cls()
+
+    def store(self, path: Path) -> None:
+        with self._lock:
+            ensure_parents_write_text(path, dump(self, "yaml"))
+
+    def region_types(self, region: str, type_name_prefix: str, *, is_third_party: bool = True) -> RegionTypes | None:
+        with self._lock:
+            return self.entries.get(registry_key(region, type_name_prefix, _visibility(is_third_party)))
+
+    def stale_regions(
+        self,
+        type_name_prefix: str,
+        regions: list[str] | None = None,
+        *,
+        is_third_party: bool = True,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+    ) -> list[str]:
+        now = utc_now()
+        stale = []
+        for region in regions or REGIONS:
+            entry = self.region_types(region, type_name_prefix, is_third_party=is_third_party)
+            if entry is None or entry.is_stale(max_age, now):
+                stale.append(region)
+        return stale
+
+    def refresh_region(self, region: str, type_name_prefix: str, *, is_third_party: bool = True) -> RegionTypes:
+        refreshed = utc_now()
+        types = list_cfn_types(type_name_prefix, region, is_third_party=is_third_party)
+        entry = RegionTypes(
+            region=region,
+            visibility=_visibility(is_third_party),
+            type_name_prefix=type_name_prefix,
+            refreshed=refreshed,
+            types=types,
+        )
+        with self._lock:
+            self.entries[entry.key] = entry
+        return entry
+
+    def refresh(
+        self,
+        type_name_prefix: str,
+        regions: list[str] | None = None,
+        *,
+        is_third_party: bool = True,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+        force: bool = False,
+        max_workers: int = 10,
+    ) -> list[str]:
+        """Returns the regions that were re-queried successfully, a failing region keeps its previous snapshot."""
+        region_list: list[str] = list(regions or REGIONS)
+        if force:
+            stale = region_list
+        else:
+            stale = self.stale_regions(type_name_prefix, region_list, is_third_party=is_third_party, max_age=max_age)
+        if not stale:
+            logger.info(f"cfn type registry for '{type_name_prefix}' is fresh in {len(region_list)} regions")
+            return []
+        refreshed: list[str] = []
+        with (
+            ThreadPoolExecutor(max_workers=max_workers) as pool,
+            new_task(f"Refreshing cfn types '{type_name_prefix}'", total=len(stale)) as task,
+        ):
+            futures = {
+                pool.submit(self.refresh_region, region, type_name_prefix, is_third_party=is_third_party): region
+                for region in stale
+            }
+            for future in as_completed(futures):
+                region = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning(f"failed to refresh cfn types in region = {region}: {e!r}")
+                else:
+                    refreshed.append(region)
+                task.update(advance=1)
+        logger.info(f"cfn type registry refreshed {len(refreshed)}/{len(stale)} stale regions")
+        return sorted(refreshed, key=stale.index)
+
+    def last_cfn_type(self, type_name: str, region: str, *, is_third_party: bool = True) -> CfnTypeDetails | None:
+        entry = self.region_types(region, type_name, is_third_party=is_third_party)
+        return entry.last_type(type_name) if entry else None
+
+    def version_regions(
+        self, type_name: str, regions: list[str] | None = None, *, is_third_party: bool = True
+    ) -> dict[str | None, list[str]]:
+        """Regions without a snapshot are skipped, regions without the type are listed under `None`."""
+        version_regions: dict[str | None, list[str]] = defaultdict(list)
+        for region in regions or REGIONS:
+            entry = self.region_types(region, type_name, is_third_party=is_third_party)
+            if entry is None:
+                continue
+            last_type = entry.last_type(type_name)
+            version_regions[last_type.version if last_type else None].append(region)
+        return version_regions
+
+
+def get_last_version_all_regions(
+    type_name: str,
+    registry: CfnTypeRegistry | None = None,
+    *,
+    max_age: timedelta = DEFAULT_MAX_AGE,
+    max_workers: int = 10,
+) -> dict[str | None, list[str]]:
+    registry = registry or CfnTypeRegistry()
+    registry.refresh(type_name, is_third_party=True, max_age=max_age, max_workers=max_workers)
+    return registry.version_regions(type_name, is_third_party=True)
+
+
+def print_version_regions(
+    type_name: str, registry: CfnTypeRegistry | None = None, *, max_age: timedelta = DEFAULT_MAX_AGE
+) -> None:
+    version_regions = get_last_version_all_regions(type_name, registry, max_age=max_age)
+    if regions_with_no_version := version_regions.pop(None, []):
+        logger.warning(f"no version for {type_name} found in {regions_with_no_version}")
+    for version in sorted(version_regions.keys()):  # type: ignore
+        regions = sorted(version_regions[version])
+        regions_comma_separated = ",".join(regions)
+        logger.info(f"'{version}' is latest in {regions_comma_separated}\ncontinents:")
+        for continent, cont_regions in group_by_once(regions, key=region_continent).items():
+            continent_regions = ", ".join(sorted(cont_regions))
+            logger.info(f"continent={continent}: {continent_regions}")
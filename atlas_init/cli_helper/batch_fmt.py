@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from ask_shell import run_and_wait
+
+logger = logging.getLogger(__name__)
+_unsafe_filename_chars = re.compile(r"[^\w]")
+
+
+@dataclass
+class FormattedSource:
+    name: str
+    source: str
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class BatchFormatError(ValueError):
+    def __init__(self, failed: list[FormattedSource]) -> None:
+        self.failed = failed
+        details = "\n".join(f"{source.name}:\n" + "\n".join(source.errors) for source in failed)
+        super().__init__(f"failed to format {len(failed)} sources:\n{details}")
+
+
+def raise_on_errors(results: dict[str, FormattedSource]) -> dict[str, str]:
+    if failed := [result for result in results.values() if not result.ok]:
+        for result in failed:
+            logger.warning(f"unformatted source for {result.name}:\n{result.source}")
+        raise BatchFormatError(failed)
+    return {name: result.source for name, result in results.items()}
+
+
+def _write_sources(tmp_dir: Path, sources: dict[str, str], suffix: str) -> dict[str, Path]:
+    paths = {}
+    for i, (name, source) in enumerate(sources.items()):
+        path = tmp_dir / f"{i:04d}_{_unsafe_filename_chars.sub('_', name)}{suffix}"
+        path.write_text(source)
+        paths[name] = path
+    return paths
+
+
+def _collect(paths: dict[str, Path], output: str) -> dict[str, FormattedSource]:
+    """Error lines are attributed to a source by its file name, the names are unique within the batch."""
+    lines = output.splitlines()
+    return {
+        name: FormattedSource(
+            name=name,
+            source=path.read_text(),
+            errors=[line for line in lines if f"{path.name}:" in line],
+        )
+        for name, path in paths.items()
+    }
+
+
+def format_go_sources(sources: dict[str, str]) -> dict[str, FormattedSource]:
+    """Formats all sources with one `gofmt` call, a file with syntax errors is left unformatted."""
+    if not sources:
+        return {}
+    with TemporaryDirectory() as tmp_dir_str:
+        tmp_dir = Path(tmp_dir_str)
+        paths = _write_sources(tmp_dir, sources, ".go")
+        file_names = " ".join(path.name for path in paths.values())
+        run = run_and_wait(f"gofmt -w {file_names}", cwd=tmp_dir, allow_non_zero_exit=True)
+        return _collect(paths, f"{run.stdout}\n{run.stderr}")
+
+
+def format_python_sources(
+    sources: dict[str, str], *, line_length: int = 120, fix: bool = True
+) -> dict[str, FormattedSource]:
+    """Formats all sources with one `ruff format` call and, with `fix`, one `ruff check --fix` call.
+
+    Remaining lint violations are reported as errors of the source they were found in.
+    """
+    if not sources:
+        return {}
+    with TemporaryDirectory() as tmp_dir_str:
+        tmp_dir = Path(tmp_dir_str)
+        paths = _write_sources(tmp_dir, sources, ".py")
+        fmt_run = run_and_wait(f"ruff format . --line-length {line_length}", cwd=tmp_dir, allow_non_zero_exit=True)
+        output = f"{fmt_run.stdout}\n{fmt_run.stderr}"
+        if fix:
+            check_run = run_and_wait(
+                "ruff check --fix --output-format concise .", cwd=tmp_dir, allow_non_zero_exit=True
+            )
+            output += f"\n{check_run.stdout}\n{check_run.stderr}"
+        return _collect(paths, output)
@@ -10,13 +10,12 @@ from pathlib import Path
 
 import typer
 from ask_shell import confirm, new_task, print_to_live, run_and_wait, select_list
-from model_lib import Entity, Event, copy_and_validate
+from ask_shell.rich_live import get_live_console
+from model_lib import Entity, Event
 from pydantic import Field, ValidationError, field_validator, model_validator
 from pydantic_core import Url
 from rich.markdown import Markdown
-from zero_3rdparty import file_utils
 from zero_3rdparty.datetime_utils import utc_now
-from zero_3rdparty.str_utils import ensure_suffix
 
 from atlas_init.cli_helper.run import add_to_clipboard
 from atlas_init.cli_tf.github_logs import (
@@ -34,15 +33,17 @@ from atlas_init.cli_tf.go_test_summary import (
     RunHistoryFilter,
     TFCITestOutput,
     TestRow,
-    create_daily_report,
-    create_monthly_report,
+    write_daily_report,
+    write_monthly_reports,
 )
 from atlas_init.cli_tf.go_test_tf_error import (
     DetailsInfo,
     ErrorClassAuthor,
+    ErrorRuleMatcher,
     GoTestError,
     GoTestErrorClass,
     GoTestErrorClassification,
+    load_error_rule_matcher,
     parse_error_details,
 )
 from atlas_init.cli_tf.mock_tf_log import resolve_admin_api_path
@@ -111,6 +112,11 @@ def ci_tests(
     skip_daily: bool = typer.Option(False, "-sd", "--skip-daily", help="skip daily report"),
     skip_monthly: bool = typer.Option(False, "-sm", "--skip-monthly", help="skip monthly report"),
     ask_to_open: bool = typer.Option(False, "--open", "--ask-to-open", help="ask to open the reports"),
+    incremental_html: bool = typer.Option(
+        False,
+        "--incremental-html",
+        help="render only new or changed report pages to static html instead of a full mkdocs build",
+    ),
     copy_to_clipboard: bool = typer.Option(
         False,
         "--copy",
@@ -162,7 +168,7 @@ def ci_tests(
             logger.info("skipping monthly report")
         else:
             generate_monthly_summary(settings, monthly_input, ask_to_open)
-    export_ci_tests_markdown_to_html(settings, report_paths)
+    export_ci_tests_markdown_to_html(settings, report_paths, incremental=incremental_html)
 
 
 def run_daily_report(
@@ -191,41 +197,27 @@ def run_daily_report(
         history_filter=history_filter,
         row_modifier=add_md_link,
     )
-    daily_out = create_daily_report(out, settings, daily_in)
-    print_to_live(Markdown(daily_out.summary_md))
+    daily_path = write_daily_report(out, settings, daily_in, report_paths.daily_path)
+    logger.info(f"daily report written to {daily_path}")
+    daily_out = DailyReportOut(path=daily_path)
+    print_summary = get_live_console().is_terminal
+    if not (print_summary or copy_to_clipboard):
+        return daily_out
+    daily_out.summary_md = daily_path.read_text()
+    if print_summary:
+        print_to_live(Markdown(daily_out.summary_md))
     if copy_to_clipboard:
         add_to_clipboard(daily_out.summary_md, logger=logger)
-    file_utils.ensure_parents_write_text(report_paths.daily_path, daily_out.summary_md)
     return daily_out
 
 
 def generate_monthly_summary(
     settings: AtlasInitSettings, monthly_input: MonthlyReportIn, ask_to_open: bool = False
 ) -> None:
-    monthly_out = create_monthly_report(
-        settings,
-        monthly_input,
-    )
     paths = monthly_input.report_paths
-    summary_path = paths.summary_path
-    file_utils.ensure_parents_write_text(summary_path, monthly_out.summary_md)
+    logger.info(f"Writing details to {paths.details_dir}")
+    summary_path, error_only_path = write_monthly_reports(settings, monthly_input)
     logger.info(f"summary written to {summary_path}")
-    details_dir = paths.details_dir
-    file_utils.clean_dir(details_dir, recreate=True)
-    logger.info(f"Writing details to {details_dir}")
-    for name, details_md in monthly_out.test_details_md.items():
-        details_path = details_dir / ensure_suffix(name, ".md")
-        file_utils.ensure_parents_write_text(details_path, details_md)
-    monthly_error_only_out = create_monthly_report(
-        settings,
-        event=copy_and_validate(
-            monthly_input,
-            skip_rows=[MonthlyReportIn.skip_if_no_failures],
-            existing_details_md=monthly_out.test_details_md,
-        ),
-    )
-    error_only_path = paths.error_only_path
-    file_utils.ensure_parents_write_text(error_only_path, monthly_error_only_out.summary_md)
     logger.info(f"error-only summary written to {error_only_path}")
     if ask_to_open and confirm(f"do you want to open the summary file? {summary_path}", default=False):
         run_and_wait(f'code "{summary_path}"')
@@ -270,7 +262,8 @@ async def ci_tests_pipeline(event: TFCITestInput) -> TFCITestOutput:
     with new_task("classifying errors"):
         error_run_ids = [error.run_id for error in report_errors]
         existing_classifications = await dao.read_error_classifications(error_run_ids)
-        classified_errors = classify_errors(existing_classifications, report_errors)
+        matcher = load_error_rule_matcher(settings.error_rules_path)
+        classified_errors = classify_errors(existing_classifications, report_errors, matcher)
     return TFCITestOutput(
         log_paths=log_paths, found_tests=report_tests, classified_errors=classified_errors, found_errors=report_errors
     )
@@ -288,7 +281,9 @@ def parse_test_errors(found_tests: list[GoTestRun]) -> list[GoTestError]:
 
 
 def classify_errors(
-    existing: dict[str, GoTestErrorClassification], errors: list[GoTestError]
+    existing: dict[str, GoTestErrorClassification],
+    errors: list[GoTestError],
+    matcher: ErrorRuleMatcher | None = None,
 ) -> list[GoTestErrorClassification]:
     needs_classification: list[GoTestError] = []
     classified_errors: list[GoTestErrorClassification] = []
@@ -297,7 +292,7 @@ def classify_errors(
             logger.info(f"found existing classification{error.run_name}: {prev_classification}")
             classified_errors.append(prev_classification)
             continue
-        if auto_class := GoTestErrorClass.auto_classification(error.run.output_lines_str):
+        if auto_class := GoTestErrorClass.auto_classification(error.run.output_lines_str, matcher):
             logger.info(f"auto class for {error.run_name}: {auto_class}")
             classified_errors.append(
                 GoTestErrorClassification(
@@ -340,7 +335,9 @@ async def classify(
 
     for cls in needs_classification:
         task.update(advance=1)
-        similars = await dao.read_similar_error_classifications(cls.details, author_filter=ErrorClassAuthor.HUMAN)
+        similars = await dao.read_similar_error_classifications(
+            cls.details, test_output=cls.test_output, author_filter=ErrorClassAuthor.HUMAN
+        )
         if (existing := similars.get(cls.run_id)) and not existing.needs_classification():
             logger.debug(f"found existing classification: {existing}")
             continue
@@ -1,57 +1,29 @@
-from queue import Queue
-from atlas_init.cli_tf.codegen.models import ResourceConfig
-from atlas_init.cli_tf.openapi import OpenapiSchema
-from atlas_init.cli_tf.schema_v2 import SchemaResource
+from atlas_init.cli_tf.codegen.models import ApiResourcesConfig, ResourceConfig
+from atlas_init.cli_tf.openapi import ComponentRefGraph, OpenapiSchema
 
 
-def minimal_api_spec_simplified(resource: ResourceConfig, full_spec: OpenapiSchema) -> OpenapiSchema:
+def minimal_api_spec_simplified(
+    resource: ResourceConfig, full_spec: OpenapiSchema, ref_graph: ComponentRefGraph | None = None
+) -> OpenapiSchema:
+    """The components are the union of the cached `$ref` closures of the paths' refs.
+
+    Pass the same `ref_graph` for every resource of `full_spec` to reuse the closures, see `minimal_api_specs`.
+    """
+    ref_graph = ref_graph or ComponentRefGraph(full_spec)
     minimal_spec = OpenapiSchema(
         openapi=full_spec.openapi,
         info={"description": "minimal spec", "version": full_spec.info["version"], "title": full_spec.info["title"]},
         paths={},
         components={"schemas": {}, "parameters": {}},
     )
-    include_refs: Queue[str] = Queue()
-    seen_refs: set[str] = set()
-
+    root_refs: list[str] = []
     for path in resource.paths:
         path_dict = minimal_spec.paths[path] = full_spec.paths[path]
         remove_non_2xx_responses(path_dict)
-        for ref in full_spec.method_refs(path):
-            minimal_spec.add_schema_ref(ref, full_spec.resolve_ref(ref))
-            include_refs.put(ref)
-        for ref in full_spec.parameter_refs(path):
-            minimal_spec.add_schema_ref(ref, full_spec.resolve_ref(ref))
-            include_refs.put(ref)
-
-    def add_from_resource_ref(ref_resource: SchemaResource) -> None:
-        for attribute in ref_resource.attributes.values():
-            if attribute.schema_ref:
-                minimal_spec.add_schema_ref(attribute.schema_ref, full_spec.resolve_ref(attribute.schema_ref))
-                include_refs.put(attribute.schema_ref)
-            if attribute.parameter_ref:
-                minimal_spec.add_schema_ref(
-                    attribute.parameter_ref,
-                    full_spec.resolve_ref(attribute.parameter_ref),
-                )
-            if ref := attribute.additional_properties_ref:
-                minimal_spec.add_schema_ref(ref, full_spec.resolve_ref(ref))
-                include_refs.put(ref)
-        for ref in ref_resource.extra_refs():
-            minimal_spec.add_schema_ref(ref, full_spec.resolve_ref(ref))
-            include_refs.put(ref)
-
-    while not include_refs.empty():
-        ref = include_refs.get()
-        if ref in seen_refs:
-            continue
-        seen_refs.add(ref)
-        if ref.startswith(full_spec.SCHEMAS_PREFIX):
-            ref_resource = full_spec.schema_ref_component(ref, set())
-            add_from_resource_ref(ref_resource)
-        else:
-            param_name = ref.split("/")[-1]
-            minimal_spec.components["parameters"][param_name] = full_spec.resolve_ref(ref)
+        root_refs.extend(full_spec.method_refs(path))
+        root_refs.extend(full_spec.parameter_refs(path))
+    for ref in ref_graph.closures(root_refs):
+        minimal_spec.add_schema_ref(ref, full_spec.resolve_ref(ref))
     sorted_components = sorted(minimal_spec.components["schemas"].items())
     sorted_parameters = sorted(minimal_spec.components["parameters"].items())
     modify_schema_properties(sorted_components)
@@ -60,6 +32,17 @@ def minimal_api_spec_simplified(resource: ResourceConfig, full_spec: OpenapiSche
     return minimal_spec
 
 
+def minimal_api_specs(
+    config: ApiResourcesConfig, full_spec: OpenapiSchema, names: list[str] | None = None
+) -> dict[str, OpenapiSchema]:
+    """Minimal specs for all (or the `names`) resources in one pass sharing the component closures."""
+    ref_graph = ComponentRefGraph(full_spec)
+    return {
+        name: minimal_api_spec_simplified(config.get_resource(name), full_spec, ref_graph)
+        for name in names or config.list_resources()
+    }
+
+
 def modify_schema_properties(schema_properties: list[tuple[str, dict]]):
     for _, schema_values in schema_properties:
         properties = schema_values.get("properties", {})
@@ -1,10 +1,15 @@
+import json
 import logging
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from functools import total_ordering
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable, NamedTuple
 
+import hcl2
 import typer
+from lark import Tree
 from model_lib import Entity, Event, dump, parse_payload
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -12,11 +17,15 @@ from atlas_init.cli_helper.run import run_binary_command_is_ok
 from atlas_init.cli_tf.hcl.modifier import (
     BLOCK_TYPE_OUTPUT,
     BLOCK_TYPE_VARIABLE,
-    NewDescription,
-    update_descriptions,
+    is_block_type,
+    process_descriptions,
+    read_description_attribute,
+    token_name,
 )
+from atlas_init.cli_tf.hcl.modifier2 import safe_parse
 
 logger = logging.getLogger(__name__)
+DESCRIPTION_BLOCK_TYPES = (BLOCK_TYPE_VARIABLE, BLOCK_TYPE_OUTPUT)
 
 
 class UpdateExamples(BaseModel):
@@ -26,6 +35,12 @@ class UpdateExamples(BaseModel):
     output_descriptions: dict[str, str] = Field(default_factory=dict)
     skip_tf_fmt: bool = False
     new_description_call: Callable[[str, str, Path], str] | None = None  # Protocol not supported for Pydantic
+    # descriptions from `new_description_call` are cached per scope, by default the path (no reuse across files)
+    description_scope: Callable[[Path], str] | None = None
+    dry_run: bool = False
+    # `new_description_call` can prompt, set to False to run the uncached lookups concurrently
+    interactive_description_call: bool = True
+    max_workers: int = 10
 
 
 @total_ordering
@@ -50,40 +65,187 @@ class UpdateExamplesOutput(Entity):
     before_var_descriptions: dict[str, str] = Field(default_factory=dict)
     before_output_descriptions: dict[str, str] = Field(default_factory=dict)
     changes: list[TFConfigDescriptionChange] = Field(default_factory=list)
+    changed_files: list[Path] = Field(default_factory=list)
+    diffs: dict[Path, str] = Field(default_factory=dict)  # only filled on dry run
+
+    def diff_summary(self) -> str:
+        changes_per_file = Counter(change.path for change in self.changes if change.changed)
+        lines = [f"{len(self.changed_files)} files with description changes"]
+        lines.extend(f"{path}: {changes_per_file[path]} descriptions" for path in self.changed_files)
+        lines.extend(self.diffs[path] for path in self.changed_files if path in self.diffs)
+        return "\n".join(lines)
+
+
+class DescriptionKey(NamedTuple):
+    block_type: str
+    scope: str
+    name: str
+    old_description: str
+
+
+@dataclass
+class CachedDescriptions:
+    """Calls `get_description` once per key, the call can prompt the user."""
+
+    get_description: Callable[[str, str, str, Path], str]
+    scope: Callable[[Path], str]
+    calls: int = field(init=False, default=0)
+    _cache: dict[DescriptionKey, str] = field(init=False, default_factory=dict)
+
+    def lookup(self, block_type: str, name: str, old_description: str, path: Path) -> str:
+        key = DescriptionKey(block_type, self.scope(path), name, old_description)
+        if key not in self._cache:
+            self.calls += 1
+            self._cache[key] = self.get_description(block_type, name, old_description, path)
+        return self._cache[key]
+
+    def prefetch(self, lookups: Iterable[tuple[str, str, str, Path]], max_workers: int) -> None:
+        """Calls `get_description` concurrently for the uncached keys, only safe when the call never prompts."""
+        pending: dict[DescriptionKey, tuple[str, str, str, Path]] = {}
+        for block_type, name, old_description, path in lookups:
+            key = DescriptionKey(block_type, self.scope(path), name, old_description)
+            if key not in self._cache:
+                pending.setdefault(key, (block_type, name, old_description, path))
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.get_description, *args): key for key, args in pending.items()}
+            for future in as_completed(futures):
+                self._cache[futures[future]] = future.result()
+        self.calls += len(pending)
+
+
+@dataclass
+class TFFileDescriptions:
+    path: Path
+    tree: Tree | None
+    text: str
+    existing: dict[str, list[tuple[str, str]]] = field(init=False, default_factory=dict)  # block_type -> name, desc
+
+    def __post_init__(self):
+        if self.tree is None:
+            return
+        for block_type in DESCRIPTION_BLOCK_TYPES:
+            self.existing[block_type] = [
+                (token_name(block.children[1]), read_description_attribute(block.children[2]))
+                for block in self.tree.iter_subtrees_topdown()
+                if is_block_type(block, block_type)
+            ]
+
+    def lookups(self) -> Iterable[tuple[str, str, str, Path]]:
+        for block_type, blocks in self.existing.items():
+            for name, description in blocks:
+                yield block_type, name, description, self.path
+
+    def resolve_changes(self, descriptions: CachedDescriptions) -> list[TFConfigDescriptionChange]:
+        return [
+            TFConfigDescriptionChange(
+                path=path,
+                name=name,
+                before=description,
+                after=descriptions.lookup(block_type, name, description, path),
+                block_type=block_type,
+            )
+            for block_type, name, description, path in self.lookups()
+        ]
+
+    def render(self, descriptions: CachedDescriptions) -> str:
+        tree = self.tree
+        assert tree is not None, f"unparsed file {self.path} has no descriptions to update"
+        for block_type in DESCRIPTION_BLOCK_TYPES:
+
+            def get_description(name: str, old_description: str, path: Path, block_type: str = block_type) -> str:
+                return descriptions.lookup(block_type, name, old_description, path)
+
+            tree = process_descriptions(self.path, tree, get_description, defaultdict(list), block_type=block_type)
+        return hcl2.writes(tree)  # type: ignore
+
+
+def parse_tf_file(tf_file: Path) -> TFFileDescriptions:
+    logger.info(f"looking for descriptions in {tf_file}")
+    return TFFileDescriptions(path=tf_file, tree=safe_parse(tf_file), text=tf_file.read_text())
+
+
+def parse_tf_files(tf_files: list[Path], max_workers: int) -> list[TFFileDescriptions]:
+    """Parsing is CPU-bound, the files are parsed in worker processes and the trees are pickled back in order."""
+    if max_workers <= 1 or len(tf_files) <= 1:
+        return [parse_tf_file(tf_file) for tf_file in tf_files]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(tf_files))) as pool:
+        return list(pool.map(parse_tf_file, tf_files))
+
+
+def description_diff(tf_file: Path, changes: list[TFConfigDescriptionChange]) -> str:
+    """Diff of the description attributes only, the rendered file is not compared as `hcl2.writes` loses formatting."""
+    lines = [f"--- {tf_file}", f"+++ {tf_file}"]
+    for change in sorted(changes):
+        if not change.changed:
+            continue
+        lines.append(f' {change.block_type} "{change.name}" {{')
+        if change.before:
+            lines.append(f"-  description = {json.dumps(change.before)}")
+        lines.extend([f"+  description = {json.dumps(change.after)}", " }"])
+    return "\n".join(lines)
 
 
 def update_examples(event_in: UpdateExamples) -> UpdateExamplesOutput:
-    changes = []
+    """Parses the `*.tf` files in parallel, resolves the descriptions in file order and renders the changed files.
 
-    def get_description(name: str, old_description: str, path: Path) -> str:
-        return event_in.var_descriptions.get(name, "")
+    The descriptions are looked up once per block type, name, old description and scope, a file is only rendered and
+    written when at least one of its descriptions changes.
+    """
+    static_descriptions = {
+        BLOCK_TYPE_VARIABLE: event_in.var_descriptions,
+        BLOCK_TYPE_OUTPUT: event_in.output_descriptions,
+    }
 
-    existing_var_descriptions = update_block_descriptions(
-        event_in.examples_base_dir,
-        changes,
-        event_in.new_description_call or get_description,  # type: ignore
-        BLOCK_TYPE_VARIABLE,
-    )
+    def get_description(block_type: str, name: str, old_description: str, path: Path) -> str:
+        if call := event_in.new_description_call:
+            return call(name, old_description, path)
+        return static_descriptions[block_type].get(name, "")
 
-    def get_output_description(name: str, old_description: str, path: Path) -> str:
-        return event_in.output_descriptions.get(name, "")
+    def default_scope(path: Path) -> str:
+        return str(path) if event_in.new_description_call else ""
 
-    existing_output_descriptions = update_block_descriptions(
-        event_in.examples_base_dir,
-        changes,
-        event_in.new_description_call or get_output_description,  # type: ignore
-        BLOCK_TYPE_OUTPUT,
-    )
-    if event_in.skip_tf_fmt:
+    descriptions = CachedDescriptions(get_description, event_in.description_scope or default_scope)
+    in_files = sorted(event_in.examples_base_dir.rglob("*.tf"))
+    tf_files = parse_tf_files(in_files, event_in.max_workers)
+    if event_in.new_description_call and not event_in.interactive_description_call:
+        descriptions.prefetch((lookup for tf_file in tf_files for lookup in tf_file.lookups()), event_in.max_workers)
+    changes: list[TFConfigDescriptionChange] = []
+    existing_descriptions: dict[str, dict[str, list[str]]] = {
+        block_type: defaultdict(list) for block_type in DESCRIPTION_BLOCK_TYPES
+    }
+    changed_files: list[Path] = []
+    diffs: dict[Path, str] = {}
+    for tf_file in tf_files:
+        file_changes = tf_file.resolve_changes(descriptions)
+        for change in file_changes:
+            existing_descriptions[change.block_type][change.name].append(change.before)
+        changes.extend(file_changes)
+        if not any(change.changed for change in file_changes):
+            continue
+        if event_in.dry_run:
+            diffs[tf_file.path] = description_diff(tf_file.path, file_changes)
+        else:
+            new_tf = tf_file.render(descriptions)
+            if new_tf == tf_file.text:
+                logger.debug(f"no description changes for {tf_file.path}")
+                continue
+            tf_file.path.write_text(new_tf)
+        changed_files.append(tf_file.path)
+    logger.info(f"{descriptions.calls} description lookups for {len(changes)} blocks in {len(tf_files)} files")
+    if event_in.skip_tf_fmt or event_in.dry_run:
         logger.info("skipping terraform fmt")
     else:
         assert run_binary_command_is_ok("terraform", "fmt -recursive", cwd=event_in.examples_base_dir, logger=logger), (
             "terraform fmt failed"
         )
     return UpdateExamplesOutput(
-        before_var_descriptions=flatten_descriptions(existing_var_descriptions),
-        before_output_descriptions=flatten_descriptions(existing_output_descriptions),
+        before_var_descriptions=flatten_descriptions(existing_descriptions[BLOCK_TYPE_VARIABLE]),
+        before_output_descriptions=flatten_descriptions(existing_descriptions[BLOCK_TYPE_OUTPUT]),
         changes=sorted(changes),
+        changed_files=changed_files,
+        diffs=diffs,
     )
 
 
@@ -94,38 +256,6 @@ def flatten_descriptions(descriptions: dict[str, list[str]]) -> dict[str, str]:
     }
 
 
-def update_block_descriptions(
-    base_dir: Path,
-    changes: list[TFConfigDescriptionChange],
-    get_description: NewDescription,
-    block_type: str,
-):
-    all_existing_descriptions = defaultdict(list)
-    in_files = sorted(base_dir.rglob("*.tf"))
-    for tf_file in in_files:
-        logger.info(f"looking for {block_type} in {tf_file}")
-        new_tf, existing_descriptions = update_descriptions(tf_file, get_description, block_type=block_type)
-        if not existing_descriptions:  # probably no variables in the file
-            continue
-        for name, descriptions in existing_descriptions.items():
-            changes.extend(
-                TFConfigDescriptionChange(
-                    path=tf_file,
-                    name=name,
-                    before=description,
-                    after=get_description(name, description, tf_file),
-                    block_type=block_type,
-                )
-                for description in descriptions
-            )
-            all_existing_descriptions[name].extend(descriptions)
-        if tf_file.read_text() == new_tf:
-            logger.debug(f"no {block_type} changes for {tf_file}")
-            continue
-        tf_file.write_text(new_tf)
-    return all_existing_descriptions
-
-
 def update_example_cmd(
     examples_base_dir: Path = typer.Argument(
         ..., help="Directory containing *.tf files (can have many subdirectories)"
@@ -134,6 +264,7 @@ def update_example_cmd(
     output_descriptions: Path = typer.Option("", "--outputs", help="Path to a JSON/yaml file with output descriptions"),
     skip_log_existing: bool = typer.Option(False, help="Log existing descriptions"),
     skip_log_changes: bool = typer.Option(False, help="Log variable updates"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Log a diff of the changes without writing the files"),
 ):
     var_descriptions_dict = parse_payload(var_descriptions) if var_descriptions else {}
     output_descriptions_dict = parse_payload(output_descriptions) if output_descriptions else {}
@@ -141,8 +272,11 @@ def update_example_cmd(
         examples_base_dir=examples_base_dir,
         var_descriptions=var_descriptions_dict,  # type: ignore
         output_descriptions=output_descriptions_dict,  # type: ignore
+        dry_run=dry_run,
     )
     output = update_examples(event)
+    if dry_run:
+        logger.info(f"Dry run, no files written:\n{output.diff_summary()}")
     if not skip_log_changes:
         for change in output.changes:
             if change.changed:
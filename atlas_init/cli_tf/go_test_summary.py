@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 from collections import Counter
 from dataclasses import dataclass, field
@@ -9,12 +10,14 @@ from enum import StrEnum
 from functools import reduce, total_ordering
 from pathlib import Path
 import re
-from typing import Callable, ClassVar, TypeVar
+from tempfile import TemporaryFile
+from typing import IO, AsyncIterator, Callable, ClassVar, Iterable, TypeVar
 
 from ask_shell.rich_progress import new_task
 from model_lib import Entity
 from pydantic import Field, model_validator
 from zero_3rdparty import datetime_utils, file_utils
+from zero_3rdparty.str_utils import ensure_suffix
 from zero_3rdparty.iter_utils import group_by_once
 
 from atlas_init.cli_tf.github_logs import summary_dir
@@ -438,11 +441,6 @@ class MonthlyReportIn(Entity):
         return not any(run.is_failure for runs in test.last_env_runs.values() for run in runs)
 
 
-class MonthlyReportOut(Entity):
-    summary_md: str
-    test_details_md: dict[str, str] = Field(default_factory=dict)
-
-
 class ErrorRowColumns(StrEnum):
     GROUP_NAME = "Group with Package"
     TEST = "Test"
@@ -460,6 +458,10 @@ class ErrorRowColumns(StrEnum):
         envs = set()
         for row in rows:
             envs.update(row.last_env_runs.keys())
+        return cls.columns_for_envs(envs, skip_columns)
+
+    @classmethod
+    def columns_for_envs(cls, envs: Iterable[str], skip_columns: set[ErrorRowColumns]) -> list[str]:
         columns: list[str] = [cls.GROUP_NAME, cls.TEST, cls.ERROR_CLASS, cls.DETAILS_SUMMARY]
         for env in sorted(envs):
             columns.extend(f"{env_col} ({env})" for env_col in cls.__ENV_BASED__ if env_col not in skip_columns)
@@ -514,63 +516,111 @@ class TestRow(Entity):
             )
         return "No error classes"
 
-    def as_row(self, columns: list[str]) -> list[str]:
-        values = []
+    def column_values(self) -> dict[str, str]:
+        """Values of the row's columns, the pass rate and time since pass of each env are computed once.
+
+        Env columns for envs without runs in this row are missing, see `missing_column_value`.
+        """
+        group_part = self.full_name.removesuffix(self.test_name).rstrip("/")
+        values: dict[str, str] = {
+            ErrorRowColumns.GROUP_NAME: group_part or "Unknown Group",
+            ErrorRowColumns.TEST: self.test_name,
+            ErrorRowColumns.ERROR_CLASS: self.error_classes_str,
+            ErrorRowColumns.DETAILS_SUMMARY: self.details_summary,
+        }
         pass_rates = self.pass_rates
-        time_since_pass = self.time_since_pass
-        for col in columns:
-            match col:
-                case ErrorRowColumns.GROUP_NAME:
-                    group_part = self.full_name.removesuffix(self.test_name).rstrip("/")
-                    values.append(group_part or "Unknown Group")
-                case ErrorRowColumns.TEST:
-                    values.append(self.test_name)
-                case ErrorRowColumns.ERROR_CLASS:
-                    values.append(self.error_classes_str)
-                case ErrorRowColumns.DETAILS_SUMMARY:
-                    values.append(self.details_summary)
-                case s if s.startswith(ErrorRowColumns.PASS_RATE):
-                    env = s.split(" (")[-1].rstrip(")")
-                    env_pass_rate = pass_rates.get(env, 0.0)
-                    env_run_count = len(self.last_env_runs.get(env, []))
-                    pass_rate_pct = f"{env_pass_rate:.2%} ({env_run_count} runs)" if env in pass_rates else "N/A"
-                    if pass_rate_pct.startswith("100.00%"):
-                        values.append("always")  # use always to avoid sorting errors, 100% showing before 2%
-                    else:
-                        values.append(pass_rate_pct)
-                case s if s.startswith(ErrorRowColumns.TIME_SINCE_PASS):
-                    env = s.split(" (")[-1].rstrip(")")
-                    values.append(time_since_pass.get(env, "never passed"))
-                case _:
-                    logger.warning(f"Unknown column: {col}, skipping")
-                    values.append("N/A")
+        for env, time_since_pass in self.time_since_pass.items():
+            values[f"{ErrorRowColumns.TIME_SINCE_PASS} ({env})"] = time_since_pass
+            if (pass_rate := pass_rates.get(env)) is None:
+                continue
+            pass_rate_pct = f"{pass_rate:.2%} ({len(self.last_env_runs[env])} runs)"
+            # use always to avoid sorting errors, 100% showing before 2%
+            values[f"{ErrorRowColumns.PASS_RATE} ({env})"] = (
+                "always" if pass_rate_pct.startswith("100.00%") else pass_rate_pct
+            )
         return values
 
+    def as_row(self, columns: list[str]) -> list[str]:
+        values = self.column_values()
+        return [values[col] if col in values else missing_column_value(col) for col in columns]
+
 
-def create_monthly_report(settings: AtlasInitSettings, event: MonthlyReportIn) -> MonthlyReportOut:
-    with new_task(f"Monthly Report for {event.name} on {event.branch}"):
-        test_rows, detail_files_md = asyncio.run(_collect_monthly_test_rows_and_summaries(settings, event))
-        assert test_rows, "No error rows found for monthly report"
-    columns = ErrorRowColumns.column_names(test_rows, event.skip_columns)
-    skip_rows = (
+def missing_column_value(column: str) -> str:
+    if column.startswith(ErrorRowColumns.PASS_RATE):
+        return "N/A"
+    if column.startswith(ErrorRowColumns.TIME_SINCE_PASS):
+        return "never passed"
+    logger.warning(f"Unknown column: {column}, skipping")
+    return "N/A"
+
+
+def _monthly_title_lines(
+    event: MonthlyReportIn, skip_rows: list[Callable[[TestRow], bool]], row_count: int
+) -> list[str]:
+    skip_rows_lines = (
         []
-        if event.skip_rows == []
+        if skip_rows == []
         else [
             "",
             "## Skip Test Filters",
-            *[f"- {method.__name__}" for method in event.skip_rows],
+            *[f"- {method.__name__}" for method in skip_rows],
             "",
         ]
     )
-    summary_md = [
-        f"# Monthly Report for {event.name} on {event.branch} from {event.history_filter.run_history_start:%Y-%m-%d} to {event.history_filter.run_history_end:%Y-%m-%d} Found {len(test_rows)} unique Tests",
-        *skip_rows,
-        *markdown_table_lines("Test Run Table", test_rows, columns, lambda row: row.as_row(columns)),
+    return [
+        f"# Monthly Report for {event.name} on {event.branch} from {event.history_filter.run_history_start:%Y-%m-%d} to {event.history_filter.run_history_end:%Y-%m-%d} Found {row_count} unique Tests",
+        *skip_rows_lines,
     ]
-    return MonthlyReportOut(
-        summary_md="\n".join(summary_md),
-        test_details_md=detail_files_md,
-    )
+
+
+def write_monthly_reports(settings: AtlasInitSettings, event: MonthlyReportIn) -> list[Path]:
+    """Writes the summary, the error-only summary and the test details in a single pass over the tests.
+
+    Each row's statistics are computed once and the rows are streamed to the reports.
+    The details are written to a staging dir that replaces `details_dir` only when tests were found.
+    """
+    paths = event.report_paths
+    error_only_skip_rows = [*event.skip_rows, MonthlyReportIn.skip_if_no_failures]
+    reports = [
+        MarkdownReportStream(
+            path=paths.summary_path,
+            table_header="Test Run Table",
+            title_lines=lambda count: _monthly_title_lines(event, event.skip_rows, count),
+            skip_columns=event.skip_columns,
+        ),
+        MarkdownReportStream(
+            path=paths.error_only_path,
+            table_header="Test Run Table",
+            title_lines=lambda count: _monthly_title_lines(event, error_only_skip_rows, count),
+            skip_columns=event.skip_columns,
+            include_row=lambda row: not MonthlyReportIn.skip_if_no_failures(row),
+        ),
+    ]
+    details_dir = paths.details_dir
+    staging_dir = details_dir.with_name(f".{details_dir.name}.tmp")
+    file_utils.clean_dir(staging_dir, recreate=True)
+    try:
+        with new_task(f"Monthly Report for {event.name} on {event.branch}"):
+            asyncio.run(_stream_monthly_test_rows(settings, event, reports, staging_dir))
+        assert reports[0].row_count, "No error rows found for monthly report"
+        file_utils.clean_dir(details_dir, recreate=False)
+        staging_dir.rename(details_dir)
+        return [report.finish() for report in reports]
+    finally:
+        file_utils.clean_dir(staging_dir, recreate=False)
+        for report in reports:
+            report.close()
+
+
+async def _stream_monthly_test_rows(
+    settings: AtlasInitSettings, event: MonthlyReportIn, reports: list[MarkdownReportStream], details_dir: Path
+) -> None:
+    async for test_row, name_with_group, details_md in _iter_monthly_test_rows(settings, event):
+        values = test_row.column_values()
+        for report in reports:
+            report.add(test_row, values)
+        if details_md is not None:
+            file_utils.ensure_parents_write_text(details_dir / ensure_suffix(name_with_group, ".md"), details_md)
 
 
 class DailyReportIn(Entity):
@@ -583,8 +633,8 @@ class DailyReportIn(Entity):
 
 
 class DailyReportOut(Entity):
-    summary_md: str
-    details_md: str
+    path: Path
+    summary_md: str = Field(default="", description="Only read back from `path` when it is printed or copied")
 
 
 T = TypeVar("T")
@@ -605,59 +655,113 @@ def markdown_table_lines(
     ]
 
 
-def create_daily_report(output: TFCITestOutput, settings: AtlasInitSettings, event: DailyReportIn) -> DailyReportOut:
-    errors = output.found_errors
-    error_classes = {cls.run_id: cls.error_class for cls in output.classified_errors}
+@dataclass
+class MarkdownReportStream:
+    """A markdown report with a single `TestRow` table, rows are spooled to a temporary file as they are added.
+
+    The columns depend on the envs of all rows and the title on the row count, so `finish` writes the report by
+    reading the spool line by line, only one row is kept in memory.
+    """
+
+    path: Path
+    table_header: str
+    title_lines: Callable[[int], list[str]]
+    skip_columns: set[ErrorRowColumns] = field(default_factory=set)
+    include_row: Callable[[TestRow], bool] | None = None
+    row_modifier: Callable[[TestRow, dict[str, str]], dict[str, str]] | None = None
+    row_count: int = field(init=False, default=0)
+    _envs: set[str] = field(init=False, default_factory=set)
+    _spool: IO[str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._spool = TemporaryFile("w+")
+
+    def add(self, row: TestRow, values: dict[str, str]) -> None:
+        if self.include_row and not self.include_row(row):
+            return
+        self._envs.update(row.last_env_runs.keys())
+        # the row is only needed by `row_modifier`, which is called once all columns are known
+        row_json = row.model_dump(mode="json") if self.row_modifier else None
+        self._spool.write(json.dumps({"values": values, "row": row_json}) + "\n")
+        self.row_count += 1
+
+    def close(self) -> None:
+        """Only needed when `finish` is not called, closing twice is a no-op."""
+        self._spool.close()
+
+    def finish(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        columns = ErrorRowColumns.columns_for_envs(self._envs, self.skip_columns)
+        with self._spool, self.path.open("w") as report_file:
+            report_file.write("\n".join(self.title_lines(self.row_count)))
+            if not self.row_count:
+                return self.path
+            header_lines = [f"## {self.table_header}", "", " | ".join(columns), " | ".join("---" for _ in columns)]
+            report_file.write("\n" + "\n".join(header_lines))
+            self._spool.seek(0)
+            for line in self._spool:
+                spooled = json.loads(line)
+                values = spooled["values"]
+                row_dict = {col: values[col] if col in values else missing_column_value(col) for col in columns}
+                if self.row_modifier:
+                    row_dict = self.row_modifier(TestRow.model_validate(spooled["row"]), row_dict)
+                report_file.write("\n" + " | ".join(row_dict[col] for col in columns))
+            report_file.write("\n")
+        return self.path
+
+
+def write_daily_report(output: TFCITestOutput, settings: AtlasInitSettings, event: DailyReportIn, path: Path) -> Path:
+    """Writes the daily errors table to `path`, the rows are streamed as they are collected."""
     one_line_summary = summary_line(output.found_tests)
 
+    def title_lines(row_count: int) -> list[str]:
+        if not row_count:
+            return [f"🎉All tests passed\n{one_line_summary}"]
+        return [f"# Daily Report on {event.report_date:%Y-%m-%d}", one_line_summary, ""]
+
+    report = MarkdownReportStream(
+        path=path,
+        table_header="Errors Table",
+        title_lines=title_lines,
+        skip_columns=event.skip_columns,
+        row_modifier=event.row_modifier,
+    )
+    error_classes = {cls.run_id: cls.error_class for cls in output.classified_errors}
+
+    async def stream_rows(task: new_task) -> None:
+        rows = _iter_daily_error_rows(output.found_errors, error_classes, settings, event.history_filter, task)
+        async for row in rows:
+            report.add(row, row.column_values())
+
     with new_task("Daily Report"):
         with new_task("Collecting error rows") as task:
-            failure_rows = asyncio.run(
-                _collect_daily_error_rows(errors, error_classes, settings, event.history_filter, task)
-            )
-        if not failure_rows:
-            return DailyReportOut(summary_md=f"🎉All tests passed\n{one_line_summary}", details_md="")
-    columns = ErrorRowColumns.column_names(failure_rows, event.skip_columns)
-
-    def as_md_row(row: TestRow) -> list[str]:
-        if row_modifier := event.row_modifier:
-            row_dict = dict(zip(columns, row.as_row(columns)))
-            row_dict = row_modifier(row, row_dict)
-            return [row_dict[col] for col in columns]
-        return row.as_row(columns)
-
-    summary_md = [
-        f"# Daily Report on {event.report_date:%Y-%m-%d}",
-        one_line_summary,
-        "",
-        *markdown_table_lines("Errors Table", failure_rows, columns, as_md_row),
-    ]
-    return DailyReportOut(summary_md="\n".join(summary_md), details_md="TODO")
+            asyncio.run(stream_rows(task))
+    return report.finish()
 
 
-async def _collect_daily_error_rows(
+async def _iter_daily_error_rows(
     errors: list[GoTestError],
     error_classes: dict[str, GoTestErrorClass],
     settings: AtlasInitSettings,
     event: RunHistoryFilter,
     task: new_task,
-) -> list[TestRow]:
-    error_rows: list[TestRow] = []
+) -> AsyncIterator[TestRow]:
+    """Rows in `TestRow` order, the errors are sorted before their run history is read."""
     dao = await init_mongo_dao(settings)
-    for error in errors:
+    for error in sorted(errors, key=lambda error: (error.run.group_name, error.run.name)):
         test_run = error.run
         error_class = error_classes[error.run_id]
         summary = error.short_description
         error_row, _ = await _create_test_row(event, dao, test_run, error_class, summary)
-        error_rows.append(error_row)
+        yield error_row
         task.update(advance=1)
-    return sorted(error_rows)
 
 
-async def _collect_monthly_test_rows_and_summaries(
+async def _iter_monthly_test_rows(
     settings: AtlasInitSettings,
     event: MonthlyReportIn,
-) -> tuple[list[TestRow], dict[str, str]]:
+) -> AsyncIterator[tuple[TestRow, str, str | None]]:
+    """Rows in `TestRow` order with their name and details markdown, `None` when the details already exist."""
     dao = await init_mongo_dao(settings)
     branch = event.branch
     history_filter = event.history_filter
@@ -665,10 +769,9 @@ async def _collect_monthly_test_rows_and_summaries(
     skip_rows = event.skip_rows
     last_day_test_names = await dao.read_tf_tests_for_day(branch, history_filter.run_history_end)
     test_runs_by_name: dict[str, GoTestRun] = {run.full_name: run for run in last_day_test_names}
-    test_rows = []
-    detail_files_md: dict[str, str] = {}
+    sorted_runs = sorted(test_runs_by_name.items(), key=lambda item: (item[1].group_name, item[1].name))
     with new_task("Collecting monthly error rows", total=len(last_day_test_names)) as task:
-        for name_with_group, test_run in test_runs_by_name.items():
+        for name_with_group, test_run in sorted_runs:
             test_row, runs = await _create_test_row(
                 history_filter,
                 dao,
@@ -676,20 +779,18 @@ async def _collect_monthly_test_rows_and_summaries(
             )
             if any(skip(test_row) for skip in skip_rows):
                 continue
-            test_rows.append(test_row)
             run_ids = [run.id for run in runs]
             classifications = await dao.read_error_classifications(run_ids)
             test_row.error_classes = [cls.error_class for cls in classifications.values()]
             test_row.details_summary = (
                 f"[{run_statuses(runs)}]({settings.github_ci_summary_details_rel_path(summary_name, name_with_group)})"
             )
+            details_md = None
             if name_with_group not in event.existing_details_md:
                 summary = GoTestSummary(name=name_with_group, results=runs, classifications=classifications)
-                detail_files_md[name_with_group] = test_detail_md(
-                    summary, history_filter.run_history_start, history_filter.run_history_end
-                )
+                details_md = test_detail_md(summary, history_filter.run_history_start, history_filter.run_history_end)
+            yield test_row, name_with_group, details_md
             task.update(advance=1)
-    return sorted(test_rows), detail_files_md
 
 
 async def _create_test_row(
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
+import hashlib
 import re
 from dataclasses import dataclass
 from enum import StrEnum
-from functools import total_ordering
+from functools import cache, total_ordering
+from pathlib import Path
 from typing import ClassVar, Literal, NamedTuple, Self, TypeAlias
 
 import humanize
-from model_lib import Entity, utc_datetime_ms
+from model_lib import Entity, parse_model, utc_datetime_ms
 from pydantic import Field, model_validator
 from zero_3rdparty import iter_utils
 from zero_3rdparty.datetime_utils import utc_now
 from zero_3rdparty.str_utils import instance_repr
 
 from atlas_init.cli_tf.go_test_run import GoTestRun
+from atlas_init.cli_tf.keyword_matcher import KeywordMatcher
 from atlas_init.repos.go_sdk import ApiSpecPaths
 
 
@@ -58,20 +61,79 @@ class GoTestErrorClass(StrEnum):
     }
 
     @classmethod
-    def auto_classification(cls, output: str) -> GoTestErrorClass | None:
-        def contains(output: str, contains_part: str) -> bool:
-            if " " in contains_part:
-                return all(part in output for part in contains_part.split())
-            return contains_part in output
-
-        return next(
-            (
-                error_class
-                for error_class, contains_list in cls.__CONTAINS_MAPPING__.items()
-                if any(contains(output, contains_part) for contains_part in contains_list)
-            ),
-            None,
-        )  # type: ignore
+    def auto_classification(cls, output: str, matcher: ErrorRuleMatcher | None = None) -> GoTestErrorClass | None:
+        matcher = matcher or default_error_rule_matcher()
+        if hit := matcher.first_hit(output):
+            return hit.error_class
+        return None
+
+
+class ErrorRule(Entity):
+    """A pattern with spaces fires when each of its words is found in the output, in any order."""
+
+    error_class: GoTestErrorClass
+    contains: str
+
+    @property
+    def words(self) -> list[str]:
+        return self.contains.split() if " " in self.contains else [self.contains]
+
+
+class ErrorRules(Entity):
+    rules: list[ErrorRule] = Field(default_factory=list)
+
+
+class RuleHit(NamedTuple):
+    rule: ErrorRule
+    positions: dict[str, int]
+
+    @property
+    def error_class(self) -> GoTestErrorClass:
+        return self.rule.error_class
+
+    @property
+    def position(self) -> int:
+        return min(self.positions.values())
+
+
+class ErrorRuleMatcher:
+    """Evaluates all rules with a single pass over the output, earlier rules win in `first_hit`."""
+
+    def __init__(self, rules: list[ErrorRule]):
+        self.rules = rules
+        self._keywords = KeywordMatcher(word for rule in rules for word in rule.words)
+
+    @classmethod
+    def from_contains_mapping(cls, extra_rules: list[ErrorRule] | None = None) -> ErrorRuleMatcher:
+        rules = [
+            ErrorRule(error_class=GoTestErrorClass(error_class), contains=contains)
+            for error_class, contains_list in GoTestErrorClass.__CONTAINS_MAPPING__.items()
+            for contains in contains_list
+        ]
+        return cls(rules + (extra_rules or []))
+
+    def hits(self, output: str) -> list[RuleHit]:
+        positions = self._keywords.first_positions(output)
+        return [
+            RuleHit(rule, {word: positions[word] for word in rule.words})
+            for rule in self.rules
+            if all(word in positions for word in rule.words)
+        ]
+
+    def first_hit(self, output: str) -> RuleHit | None:
+        return next(iter(self.hits(output)), None)
+
+
+@cache
+def default_error_rule_matcher() -> ErrorRuleMatcher:
+    return ErrorRuleMatcher.from_contains_mapping()
+
+
+def load_error_rule_matcher(rules_path: Path) -> ErrorRuleMatcher:
+    """Built-in rules followed by the user-defined rules in `rules_path` (if it exists)."""
+    if not rules_path.exists():
+        return default_error_rule_matcher()
+    return ErrorRuleMatcher.from_contains_mapping(parse_model(rules_path, t=ErrorRules).rules)
 
 
 API_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH"]
@@ -194,6 +256,24 @@ class GoTestDefaultError(Entity):
 ErrorDetailsT: TypeAlias = GoTestAPIError | GoTestResourceCheckError | GoTestDefaultError | GoTestGeneralCheckError
 
 
+def error_fingerprint(details: ErrorDetailsT) -> str:
+    """Stable hash of the fields used by `GoTestError.match`, empty for details that never match across runs."""
+    match details:
+        case GoTestAPIError():
+            parts = ["api", details.api_method, details.api_path_normalized, str(details.api_response_code)]
+        case GoTestResourceCheckError():
+            parts = [
+                "check",
+                details.tf_resource_type,
+                details.tf_resource_name,
+                str(details.step_nr),
+                details.check_numbers_str,
+            ]
+        case _:
+            return ""
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
 class ErrorClassified(NamedTuple):
     classified: dict[GoTestErrorClass, list[GoTestError]]
     unclassified: list[GoTestError]
@@ -252,6 +332,10 @@ class GoTestError(Entity):
     def run_name(self) -> str:
         return self.run.name
 
+    @property
+    def fingerprint(self) -> str:
+        return error_fingerprint(self.details)
+
     @property
     def classifications(self) -> tuple[GoTestErrorClass, GoTestErrorClass] | None:
         if (
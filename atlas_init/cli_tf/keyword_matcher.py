@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def node_pattern(node: dict) -> str:
+        alternatives = [re.escape(char) + node_pattern(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return node_pattern(trie)
+
+
+class KeywordMatcher:
+    """Finds the first position of each keyword in a single pass over the text.
+
+    The keywords are compiled into one trie-shaped regex (the goto function of Aho-Corasick), which is tried at every
+    position inside a lookahead so overlapping keywords are found. The regex returns the longest keyword at a position,
+    any shorter keyword at the same position is a prefix of it and is reported from a precomputed prefix table.
+    The cost per position depends on the trie depth, not on the number of keywords.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({keyword for keyword in keywords if keyword})
+        self._prefixes = {
+            keyword: [other for other in self.keywords if other != keyword and keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+        self._pattern = re.compile(f"(?=({_trie_pattern(self.keywords)}))") if self.keywords else None
+
+    def first_positions(self, text: str) -> dict[str, int]:
+        positions: dict[str, int] = {}
+        if self._pattern is None:
+            return positions
+        total = len(self.keywords)
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            start = match.start()
+            positions.setdefault(keyword, start)
+            for prefix in self._prefixes[keyword]:
+                positions.setdefault(prefix, start)
+            if len(positions) == total:
+                break
+        return positions
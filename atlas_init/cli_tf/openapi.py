@@ -4,6 +4,7 @@ import datetime
 import logging
 import re
 from collections.abc import Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
 from queue import Queue
 from typing import ClassVar, NamedTuple
@@ -235,6 +236,70 @@ class OpenapiSchema(Entity):
         raise ValueError(err_msg)
 
 
+@dataclass
+class ComponentRefGraph:
+    """Component `$ref` dependency graph of a spec with the transitive closure of each ref cached.
+
+    The direct refs of a schema are its attributes' schema/parameter refs, and with `include_extra_refs` also the
+    `additionalProperties` and `oneOf`/`allOf` refs. Parameters have no outgoing refs.
+    """
+
+    spec: OpenapiSchema
+    attributes_skip: set[str] = field(default_factory=set)
+    include_extra_refs: bool = True
+    _direct_refs: dict[str, tuple[str, ...]] = field(init=False, default_factory=dict)
+    _closures: dict[str, frozenset[str]] = field(init=False, default_factory=dict)
+
+    def direct_refs(self, ref: str) -> tuple[str, ...]:
+        if (refs := self._direct_refs.get(ref)) is not None:
+            return refs
+        if not ref.startswith(OpenapiSchema.SCHEMAS_PREFIX):
+            refs = ()
+        else:
+            ref_resource = self.spec.schema_ref_component(ref, set(self.attributes_skip))
+            found: list[str] = []
+            for attribute in ref_resource.attributes.values():
+                found.extend(
+                    attr_ref
+                    for attr_ref in (
+                        attribute.schema_ref,
+                        attribute.parameter_ref,
+                        attribute.additional_properties_ref if self.include_extra_refs else "",
+                    )
+                    if attr_ref
+                )
+            if self.include_extra_refs:
+                found.extend(sorted(ref_resource.extra_refs()))
+            refs = tuple(dict.fromkeys(found))
+        self._direct_refs[ref] = refs
+        return refs
+
+    def closure(self, ref: str) -> frozenset[str]:
+        """Returns `ref` and every ref reachable from it, closures of already visited refs are reused."""
+        if (cached := self._closures.get(ref)) is not None:
+            return cached
+        reachable: set[str] = set()
+        stack = [ref]
+        while stack:
+            current = stack.pop()
+            if current in reachable:
+                continue
+            if (current_closure := self._closures.get(current)) is not None:
+                reachable |= current_closure
+                continue
+            reachable.add(current)
+            stack.extend(self.direct_refs(current))
+        closure = self._closures[ref] = frozenset(reachable)
+        return closure
+
+    def closures(self, refs: Iterable[str]) -> set[str]:
+        reachable: set[str] = set()
+        for ref in refs:
+            if ref not in reachable:
+                reachable |= self.closure(ref)
+        return reachable
+
+
 def parse_api_spec_param(api_spec: OpenapiSchema, param: dict, resource: SchemaResource) -> SchemaAttribute | None:
     match param:
         case {"$ref": ref} if ref.startswith(OpenapiSchema.PARAMETERS_PREFIX):
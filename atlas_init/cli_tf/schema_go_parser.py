@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import heapq
 import logging
 import re
+from bisect import bisect_right
 from collections import defaultdict
+from dataclasses import dataclass, field
 from typing import NamedTuple
 
 from model_lib import Entity
@@ -17,34 +20,91 @@ from atlas_init.cli_tf.schema_table_models import (
 logger = logging.getLogger(__name__)
 
 
-def parse_attribute_ref(
-    name: str, rest: str, go_code: str, code_lines: list[str], ref_line_nr: int
-) -> TFSchemaAttribute | None:
+_schema_assignment_go_regex = re.compile(r"(?P<var>\w+)\s=\sschema\.\w+\{$")
+_func_def_go_regex = re.compile(r"^func (?P<name>\w+)\(.*\) \*?schema\.\w+ \{$")
+_closing_go_regex = re.compile(r"^\t*\},?$")
+_schema_attribute_go_regex = re.compile(
+    r'^\s+"(?P<name>[^"]+)":\s(?P<rest>.+)$',
+)
+
+
+class GoSchemaLine(NamedTuple):
+    line_nr: int
+    name: str
+    rest: str
+
+
+@dataclass
+class GoCodeIndex:
+    """Symbol table of a go schema file built in a single pass over its lines.
+
+    `lines` starts with an empty line so a line number can be used as index.
+    """
+
+    go_code: str
+    lines: list[str] = field(init=False)
+    attribute_lines: list[GoSchemaLine] = field(init=False, default_factory=list)
+    _assignments: dict[str, int] = field(init=False, default_factory=dict)
+    _functions: dict[str, int] = field(init=False, default_factory=dict)
+    _closing_lines: dict[str, list[int]] = field(init=False, default_factory=lambda: defaultdict(list))
+    _func_end_lines: list[int] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        self.lines = ["", *self.go_code.splitlines()]
+        for line_nr, line in enumerate(self.lines):
+            if match := _schema_attribute_go_regex.match(line):
+                self.attribute_lines.append(GoSchemaLine(line_nr, match.group("name"), match.group("rest")))
+            if _closing_go_regex.match(line):
+                self._closing_lines[line].append(line_nr)
+            if match := _schema_assignment_go_regex.search(line):
+                var = match.group("var")
+                for i in range(len(var)):  # a reference also matches the end of a longer variable name
+                    self._assignments.setdefault(var[i:], line_nr)
+            if match := _func_def_go_regex.match(line):
+                self._functions.setdefault(match.group("name"), line_nr)
+            if line.rstrip() == "}":
+                self._func_end_lines.append(line_nr)
+
+    def assignment_line(self, var: str) -> int | None:
+        """Line of the first `var = schema.X{` statement."""
+        return self._assignments.get(var)
+
+    def function_line(self, name: str) -> int | None:
+        """Line of the first `func name(...) schema.X {` definition."""
+        return self._functions.get(name)
+
+    def next_line(self, line_nr: int, closing_line: str) -> int | None:
+        """First line after `line_nr` equal to `closing_line`, only lines of tabs and a closing brace are indexed."""
+        line_nrs = self._closing_lines.get(closing_line, [])
+        i = bisect_right(line_nrs, line_nr)
+        return line_nrs[i] if i < len(line_nrs) else None
+
+    def function_end(self, line_nr: int) -> int | None:
+        i = bisect_right(self._func_end_lines, line_nr)
+        return self._func_end_lines[i] if i < len(self._func_end_lines) else None
+
+
+def parse_attribute_ref(name: str, rest: str, index: GoCodeIndex, ref_line_nr: int) -> TFSchemaAttribute | None:
     attr_ref = rest.lstrip("&").rstrip(",").strip()
     if not attr_ref.isidentifier():
         return None
-    try:
-        _instantiate_regex = re.compile(rf"{attr_ref}\s=\sschema\.\w+\{{$", re.M)
-    except re.error:
-        return None
-    instantiate_match = _instantiate_regex.search(go_code)
-    if not instantiate_match:
+    line_start_nr = index.assignment_line(attr_ref)
+    if line_start_nr is None:
         return None
-    line_start_nr = go_code[: instantiate_match.start()].count("\n") + 1
-    line_start = code_lines[line_start_nr]
-    attribute = parse_attribute_lines(code_lines, line_start_nr, line_start, name, is_attr_ref=True)
+    line_start = index.lines[line_start_nr]
+    attribute = parse_attribute_lines(index, line_start_nr, line_start, name, is_attr_ref=True)
     attribute.attr_ref_line = AttrRefLine(line_nr=ref_line_nr, attr_ref=attr_ref)
     return attribute
 
 
-def parse_func_call_line(
-    name: str, rest: str, lines: list[str], go_code: str, call_line_nr: int
-) -> TFSchemaAttribute | None:
-    func_def_line = _function_line(rest, go_code)
-    if not func_def_line:
+def parse_func_call_line(name: str, rest: str, index: GoCodeIndex, call_line_nr: int) -> TFSchemaAttribute | None:
+    func_name, _, args = rest.partition("(")
+    func_start = index.function_line(func_name.strip())
+    if func_start is None:
         return None
-    func_name, args = rest.split("(", maxsplit=1)
-    func_start, func_end = _func_lines(name, lines, func_def_line)
+    func_end = index.function_end(func_start)
+    if func_end is None:
+        raise ValueError(f"no end line found for {name} on line {func_start}: {index.lines[func_start]}")
     call = FuncCallLine(
         call_line_nr=call_line_nr,
         func_name=func_name.strip(),
@@ -52,6 +112,7 @@ def parse_func_call_line(
         func_line_start=func_start,
         func_line_end=func_end,
     )
+    lines = index.lines
     return TFSchemaAttribute(
         name=name,
         lines=lines[func_start:func_end],
@@ -62,25 +123,8 @@ def parse_func_call_line(
     )
 
 
-def _func_lines(name: str, lines: list[str], func_def_line: str) -> tuple[int, int]:
-    start_line = lines.index(func_def_line)
-    for line_nr, line in enumerate(lines[start_line + 1 :], start=start_line + 1):
-        if line.rstrip() == "}":
-            return start_line, line_nr
-    raise ValueError(f"no end line found for {name} on line {start_line}: {func_def_line}")
-
-
-def _function_line(rest: str, go_code: str) -> str:
-    function_name = rest.split("(")[0].strip()
-    pattern = re.compile(rf"func {function_name}\(.*\) \*?schema\.\w+ \{{$", re.M)
-    match = pattern.search(go_code)
-    if not match:
-        return ""
-    return go_code[match.start() : match.end()]
-
-
 def parse_attribute_lines(
-    lines: list[str],
+    index: GoCodeIndex,
     line_nr: int,
     line: str,
     name: str,
@@ -90,40 +134,30 @@ def parse_attribute_lines(
     indents = len(line) - len(line.lstrip())
     indent = indents * "\t"
     end_line = f"{indent}}}" if is_attr_ref else f"{indent}}},"
-    for extra_lines, next_line in enumerate(lines[line_nr + 1 :], start=1):
-        if next_line == end_line:
-            return TFSchemaAttribute(
-                name=name,
-                lines=lines[line_nr : line_nr + extra_lines],
-                line_start=line_nr,
-                line_end=line_nr + extra_lines,
-                indent=indent,
-            )
-    raise ValueError(f"no end line found for {name}, starting on line {line_nr}")
-
-
-_schema_attribute_go_regex = re.compile(
-    r'^\s+"(?P<name>[^"]+)":\s(?P<rest>.+)$',
-)
+    end_line_nr = index.next_line(line_nr, end_line)
+    if end_line_nr is None:
+        raise ValueError(f"no end line found for {name}, starting on line {line_nr}")
+    return TFSchemaAttribute(
+        name=name,
+        lines=index.lines[line_nr:end_line_nr],
+        line_start=line_nr,
+        line_end=end_line_nr,
+        indent=indent,
+    )
 
 
 def find_attributes(go_code: str) -> list[TFSchemaAttribute]:
-    lines = ["", *go_code.splitlines()]  # support line_nr indexing
+    index = GoCodeIndex(go_code)
     attributes = []
-    for line_nr, line in enumerate(lines):
-        match = _schema_attribute_go_regex.match(line)
-        if not match:
-            continue
-        name = match.group("name")
-        rest = match.group("rest")
+    for line_nr, name, rest in index.attribute_lines:
         if rest.endswith("),"):
-            if attr := parse_func_call_line(name, rest, lines, go_code, line_nr):
+            if attr := parse_func_call_line(name, rest, index, line_nr):
                 attributes.append(attr)
-        elif attr := parse_attribute_ref(name, rest, go_code, lines, line_nr):
+        elif attr := parse_attribute_ref(name, rest, index, line_nr):
             attributes.append(attr)
         else:
             try:
-                attr = parse_attribute_lines(lines, line_nr, line, name)
+                attr = parse_attribute_lines(index, line_nr, index.lines[line_nr], name)
             except ValueError as e:
                 logger.warning(e)
                 continue
@@ -149,12 +183,36 @@ class StartEnd(NamedTuple):
         return self.start > other.start and self.end < other.end
 
 
+def _parents(start_stops: list[StartEnd]) -> list[list[StartEnd]]:
+    """Same result as calling `has_parent` for every pair, but only the attributes open on the line are compared.
+
+    The attributes are visited in line order (the call line for function calls) while a heap tracks the open ones.
+    """
+    queries = sorted(
+        (start_stop.func_call_line.call_line_nr if start_stop.func_call_line else start_stop.start, i)
+        for i, start_stop in enumerate(start_stops)
+    )
+    by_start = sorted(range(len(start_stops)), key=lambda i: start_stops[i].start)
+    open_ends: list[tuple[int, int]] = []
+    open_indexes: set[int] = set()
+    next_start = 0
+    parents: list[list[StartEnd]] = [[] for _ in start_stops]
+    for line_nr, i in queries:
+        while next_start < len(by_start) and start_stops[by_start[next_start]].start < line_nr:
+            j = by_start[next_start]
+            open_indexes.add(j)
+            heapq.heappush(open_ends, (start_stops[j].end, j))
+            next_start += 1
+        while open_ends and open_ends[0][0] <= line_nr:
+            open_indexes.discard(heapq.heappop(open_ends)[1])
+        start_stop = start_stops[i]
+        parents[i] = [start_stops[j] for j in sorted(open_indexes) if start_stop.has_parent(start_stops[j])]
+    return parents
+
+
 def set_attribute_paths(attributes: list[TFSchemaAttribute]) -> list[TFSchemaAttribute]:
     start_stops = [StartEnd(a.line_start, a.line_end, a.name, a.func_call) for a in attributes]
-    overlaps = [
-        (attribute, [other for other in start_stops if start_stop.has_parent(other)])
-        for attribute, start_stop in zip(attributes, start_stops, strict=False)
-    ]
+    overlaps = list(zip(attributes, _parents(start_stops), strict=True))
     for attribute, others in overlaps:
         if not others:
             attribute.attribute_path = attribute.name
@@ -214,8 +272,13 @@ def find_schema_functions(attributes: list[TFSchemaAttribute]) -> list[GoSchemaF
         )
         for name, func_attributes in function_call_attributes.items()
     ]
+    call_name_functions: dict[str, list[int]] = defaultdict(list)
+    for i, func in enumerate(functions):
+        for name in func.attribute_names:
+            call_name_functions[name].append(i)
     for attribute in attributes:
-        if match_functions := [func for func in functions if func.contains_attribute(attribute)]:
+        func_indexes = {i for parent in attribute.parent_attribute_names() for i in call_name_functions.get(parent, [])}
+        if match_functions := [functions[i] for i in sorted(func_indexes)]:
             func_names = [func.name for func in match_functions]
             err_msg = f"multiple functions found for {attribute.name}, {func_names}"
             assert len(match_functions) == 1, err_msg
@@ -7,7 +7,6 @@ from collections.abc import Iterable
 from fnmatch import fnmatch
 from pathlib import Path
 from queue import Queue
-from tempfile import TemporaryDirectory
 from typing import Any, Literal, TypeAlias
 
 from model_lib import Entity, copy_and_validate, parse_model
@@ -15,7 +14,7 @@ from pydantic import ConfigDict, Field, model_validator
 from zero_3rdparty.enum_utils import StrEnum
 from zero_3rdparty.iter_utils import flat_map
 
-from atlas_init.cli_helper.run import run_binary_command_is_ok
+from atlas_init.cli_helper.batch_fmt import format_go_sources, raise_on_errors
 from atlas_init.humps import decamelize, pascalize
 
 logger = logging.getLogger(__name__)
@@ -305,9 +304,11 @@ def generate_resource_go_resource_schema(schema: SchemaV2, resource_name: str) -
 
 
 def generate_resource_go_schemas(schema: SchemaV2) -> Iterable[str]:
+    unformatted = {}
     for name, resource in schema.resources.items():
         logger.info(f"Generating Go schema for {name}")
-        yield generate_go_resource_schema(schema, resource)
+        unformatted[name] = go_resource_schema_unformatted(schema, resource)
+    yield from raise_on_errors(format_go_sources(unformatted)).values()
 
 
 def package_name(resource_name: str) -> str:
@@ -385,6 +386,10 @@ def import_lines(import_urls: set[str]) -> list[str]:
 
 
 def generate_go_resource_schema(schema: SchemaV2, resource: SchemaResource) -> str:
+    return go_fmt(resource.name, go_resource_schema_unformatted(schema, resource))
+
+
+def go_resource_schema_unformatted(schema: SchemaV2, resource: SchemaResource) -> str:
     func_lines = resource_schema_func(schema, resource)
     object_type_lines = resource_object_type_lines(schema, resource)
     import_urls = set()
@@ -401,18 +406,11 @@ def generate_go_resource_schema(schema: SchemaV2, resource: SchemaResource) -> s
             *object_type_lines,
         ]
     )
-    return go_fmt(resource.name, unformatted)
+    return unformatted
 
 
 def go_fmt(name: str, unformatted: str) -> str:
-    with TemporaryDirectory() as temp_dir:
-        filename = f"{name}.go"
-        result_file = Path(temp_dir) / filename
-        result_file.write_text(unformatted)
-        if not run_binary_command_is_ok("go", f"fmt {filename}", cwd=Path(temp_dir), logger=logger):
-            logger.warning(f"go file unformatted:\n{unformatted}")
-            raise ValueError(f"Failed to format {result_file}")
-        return result_file.read_text()
+    return raise_on_errors(format_go_sources({name: unformatted}))[name]
 
 
 def resource_schema_func(schema: SchemaV2, resource: SchemaResource) -> list[str]:
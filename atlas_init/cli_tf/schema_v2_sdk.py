@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from functools import total_ordering
 from pathlib import Path
 from queue import Queue
+from threading import RLock
 from typing import NamedTuple
 
+from ask_shell import run_and_wait
 from model_lib import Entity
 from pydantic import Field
 from zero_3rdparty.enum_utils import StrEnum
@@ -144,24 +148,106 @@ json_attribute_line = re.compile(
 )
 
 _ignored_sdk_attributes = {"href", "links"}
+MODEL_FILE_PREFIX = "model_"
+
+
+class SDKField(NamedTuple):
+    struct_name: str
+    go_type: str
+    json_name: str
+
+
+def parse_sdk_model_fields(model_path: Path) -> list[SDKField]:
+    return [
+        SDKField(match.group("struct_name"), match.group("go_type"), match.group("json_name"))
+        for match in json_attribute_line.finditer(model_path.read_text())
+        if match.group("json_name") not in _ignored_sdk_attributes
+    ]
+
+
+@dataclass
+class SDKModelIndex:
+    """Fields of every `admin/model_*.go` file of an SDK checkout, parsed once.
+
+    Models are built on first lookup and shared between lookups (including nested attributes), don't mutate them.
+    """
+
+    repo_path: Path
+    version_key: str
+    model_fields: dict[str, list[SDKField]]
+    _models: dict[str, SDKModel] = field(init=False, default_factory=dict)
+    _building: set[str] = field(init=False, default_factory=set)
+    _lock: RLock = field(init=False, default_factory=RLock)
+
+    @classmethod
+    def parse(cls, repo_path: Path, version_key: str = "", max_workers: int = 8) -> SDKModelIndex:
+        model_paths = sorted((repo_path / "admin").glob(f"{MODEL_FILE_PREFIX}*.go"))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_fields = list(executor.map(parse_sdk_model_fields, model_paths))
+        model_fields = {
+            path.stem.removeprefix(MODEL_FILE_PREFIX): fields
+            for path, fields in zip(model_paths, all_fields, strict=True)
+        }
+        logger.info(f"parsed {len(model_fields)} sdk models in {repo_path} @ {version_key or 'no version'}")
+        return cls(repo_path=repo_path, version_key=version_key, model_fields=model_fields)
+
+    def model_path(self, model_name: str) -> Path:
+        return self.repo_path / "admin" / f"{MODEL_FILE_PREFIX}{decamelize(model_name)}.go"
+
+    def model(self, model_name: str) -> SDKModel:
+        if cached := self._models.get(model_name):
+            return cached
+        with self._lock:
+            return self._build_model(model_name)
+
+    def _build_model(self, model_name: str) -> SDKModel:
+        if cached := self._models.get(model_name):
+            return cached
+        fields = self.model_fields.get(decamelize(model_name))
+        if fields is None:
+            raise FileNotFoundError(f"no sdk model file found @ {self.model_path(model_name)}")
+        if model_name in self._building:
+            raise ValueError(f"sdk model {model_name} references itself")
+        self._building.add(model_name)
+        try:
+            model = SDKModel(name=model_name)
+            for struct_name, go_type, json_name in fields:
+                sdk_attribute = model.attributes[struct_name] = SDKAttribute(
+                    go_type=go_type, json_name=json_name, struct_name=struct_name
+                )
+                if sdk_attribute.is_nested:
+                    sdk_attribute.nested_attributes = self._build_model(sdk_attribute.struct_type_name).attributes
+        finally:
+            self._building.discard(model_name)
+        self._models[model_name] = model
+        return model
+
+
+def sdk_version_key(repo_path: Path) -> str:
+    """The checked out commit, empty when the path is not a git checkout."""
+    if not (repo_path / ".git").exists():
+        return ""
+    return run_and_wait("git rev-parse HEAD", cwd=repo_path).stdout_one_line
+
+
+_sdk_model_indexes: dict[tuple[Path, str], SDKModelIndex] = {}
+_sdk_model_indexes_lock = RLock()
+
+
+def load_sdk_model_index(repo_path: Path, version_key: str = "") -> SDKModelIndex:
+    """Shared in-process cache of the parsed SDK models keyed by the SDK commit."""
+    repo_path = repo_path.resolve()
+    version_key = version_key or sdk_version_key(repo_path)
+    cache_key = (repo_path, version_key)
+    with _sdk_model_indexes_lock:
+        if cached := _sdk_model_indexes.get(cache_key):
+            return cached
+        index = _sdk_model_indexes[cache_key] = SDKModelIndex.parse(repo_path, version_key)
+        return index
 
 
 def parse_sdk_model(repo_path: Path, model_name: str) -> SDKModel:
-    model_path = repo_path / "admin" / f"model_{decamelize(model_name)}.go"
-    model = SDKModel(name=model_name)
-    for match in json_attribute_line.finditer(model_path.read_text()):
-        struct_name = match.group("struct_name")
-        go_type = match.group("go_type")
-        json_name = match.group("json_name")
-        if json_name in _ignored_sdk_attributes:
-            continue
-        sdk_attribute = model.attributes[struct_name] = SDKAttribute(
-            go_type=go_type, json_name=json_name, struct_name=struct_name
-        )
-        if sdk_attribute.is_nested:
-            nested_model = parse_sdk_model(repo_path, sdk_attribute.struct_type_name)
-            sdk_attribute.nested_attributes = nested_model.attributes
-    return model
+    return load_sdk_model_index(repo_path).model(model_name)
 
 
 def generate_model_go(schema: SchemaV2, resource: SchemaResource, sdk_model: SDKModel) -> str:
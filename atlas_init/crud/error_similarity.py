@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, NamedTuple
+
+DEFAULT_AUTO_APPLY_SCORE = 0.8
+_EMPTY_BIN = 1 << 64
+_DENSIFY_OFFSET = 1 << 58
+_SHINGLE_SIZE = 3
+_mask_patterns: list[tuple[re.Pattern, str]] = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"), " <uuid> "),
+    (
+        re.compile(r"\b\d{4}[-/]\d{2}[-/]\d{2}([t ]\d{2}:\d{2}:\d{2}(\.\d+)?(z|[+-]\d{2}:?\d{2})?)?"),
+        " <ts> ",
+    ),
+    (re.compile(r"\b\d{2}:\d{2}:\d{2}(\.\d+)?\b"), " <ts> "),
+    (re.compile(r"\b[0-9a-f]{24}\b"), " <id> "),
+    (re.compile(r"\b(?=[a-z-]*\d)[a-z0-9-]{12,}\b"), " <id> "),
+    (re.compile(r"\b\d+(\.\d+)?(ms|s|m|h)\b"), " <duration> "),
+    (re.compile(r"\b\d{4,}\b"), " <n> "),
+]
+_token_pattern = re.compile(r"<\w+>|[a-z_]+|\d+")
+
+
+def normalize_error_output(output: str) -> str:
+    """Masks ids, timestamps, uuids and durations so outputs from different runs of the same failure compare equal."""
+    normalized = output.lower()
+    for pattern, replacement in _mask_patterns:
+        normalized = pattern.sub(replacement, normalized)
+    return " ".join(_token_pattern.findall(normalized))
+
+
+def _shingle_hashes(normalized: str) -> set[int]:
+    tokens = normalized.split()
+    if len(tokens) < _SHINGLE_SIZE:
+        tokens = tokens + [""] * (_SHINGLE_SIZE - len(tokens))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[i : i + _SHINGLE_SIZE]).encode(), digest_size=8).digest())
+        for i in range(len(tokens) - _SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(output: str, num_bins: int) -> tuple[int, ...]:
+    """One-permutation MinHash: a single hash per shingle, bins filled by rotation densification."""
+    bins = [_EMPTY_BIN] * num_bins
+    for shingle_hash in _shingle_hashes(normalize_error_output(output)):
+        bin_nr, value = divmod(shingle_hash, 1 << 58)
+        bin_nr %= num_bins
+        if value < bins[bin_nr]:
+            bins[bin_nr] = value
+    if all(value == _EMPTY_BIN for value in bins):
+        return tuple(bins)
+    for i, value in enumerate(bins):
+        if value != _EMPTY_BIN:
+            continue
+        distance = 1
+        while (donor := bins[(i + distance) % num_bins]) == _EMPTY_BIN or donor >= _DENSIFY_OFFSET:
+            distance += 1
+        bins[i] = donor + distance * _DENSIFY_OFFSET
+    return tuple(bins)
+
+
+class SimilarError(NamedTuple):
+    doc_id: str
+    score: float
+
+
+@dataclass
+class ErrorOutputIndex:
+    """In-memory MinHash/LSH index over normalized error outputs.
+
+    Documents can be added incrementally, a query only scores the documents sharing at least one LSH band.
+    """
+
+    num_bins: int = 64
+    bands: int = 16
+    _signatures: dict[str, tuple[int, ...]] = field(init=False, default_factory=dict)
+    _buckets: dict[tuple[int, tuple[int, ...]], set[str]] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        if self.num_bins % self.bands:
+            raise ValueError(f"num_bins={self.num_bins} must be divisible by bands={self.bands}")
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._signatures
+
+    @property
+    def rows(self) -> int:
+        return self.num_bins // self.bands
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+        rows = self.rows
+        return [(band, signature[band * rows : (band + 1) * rows]) for band in range(self.bands)]
+
+    def add(self, doc_id: str, output: str) -> None:
+        self.remove(doc_id)
+        signature = minhash_signature(output, self.num_bins)
+        self._signatures[doc_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        if (signature := self._signatures.pop(doc_id, None)) is None:
+            return
+        for key in self._band_keys(signature):
+            if bucket := self._buckets.get(key):
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(
+        self,
+        output: str,
+        *,
+        top_k: int = 5,
+        min_score: float = 0.0,
+        accept: Callable[[str], bool] | None = None,
+    ) -> list[SimilarError]:
+        """Returns up to `top_k` documents sorted by estimated Jaccard similarity of their shingles."""
+        signature = minhash_signature(output, self.num_bins)
+        candidates: set[str] = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        matches = []
+        for doc_id in candidates:
+            if accept and not accept(doc_id):
+                continue
+            other = self._signatures[doc_id]
+            score = sum(a == b for a, b in zip(signature, other)) / self.num_bins
+            if score >= min_score:
+                matches.append(SimilarError(doc_id, score))
+        matches.sort(key=lambda match: (-match.score, match.doc_id))
+        return matches[:top_k]
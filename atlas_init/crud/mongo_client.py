@@ -29,7 +29,11 @@ CollectionConfigsT: TypeAlias = dict[type, CollectionConfig]
 def default_document_models() -> CollectionConfigsT:
     return {
         GoTestErrorClassification: CollectionConfig(
-            indexes=[index_dec("ts"), IndexModel(["error_class"]), IndexModel(["test_name"])]
+            indexes=[
+                index_dec("ts"),
+                IndexModel(["error_class"]),
+                IndexModel(["test_name"]),
+            ]
         ),
         GoTestRun: CollectionConfig(indexes=[index_dec("ts"), IndexModel(["branch"]), IndexModel(["status"])]),
     }
@@ -6,11 +6,11 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from functools import cached_property
 from pathlib import Path
-from typing import ClassVar, Self
+from typing import ClassVar, Self, TypeAlias
 
 from model_lib import Entity, dump, field_names, parse_model
 from motor.motor_asyncio import AsyncIOMotorCollection
-from pydantic import model_validator
+from pydantic import Field, PrivateAttr, model_validator
 from zero_3rdparty.file_utils import ensure_parents_write_text
 from zero_3rdparty.iter_utils import ignore_falsy
 
@@ -19,12 +19,16 @@ from atlas_init.cli_tf.go_test_tf_error import (
     ErrorClassAuthor,
     ErrorDetailsT,
     GoTestAPIError,
+    GoTestDefaultError,
     GoTestError,
     GoTestErrorClass,
     GoTestErrorClassification,
+    GoTestGeneralCheckError,
     GoTestResourceCheckError,
 )
+from atlas_init.crud.error_similarity import DEFAULT_AUTO_APPLY_SCORE, ErrorOutputIndex, SimilarError
 from atlas_init.crud.mongo_client import get_collection, init_mongo
+from atlas_init.crud.tf_error_store import TFErrorStore
 from atlas_init.crud.mongo_utils import MongoQueryOperation, create_or_replace, dump_with_id
 from atlas_init.repos.path import TFResoure, terraform_resources
 from atlas_init.settings.env_vars import AtlasInitSettings
@@ -53,27 +57,105 @@ def read_tf_resources(settings: AtlasInitSettings, repo_path: Path, branch: str)
     return TFResources(resources=terraform_resources(repo_path))
 
 
+ErrorClassificationsT: TypeAlias = tuple[GoTestErrorClass, GoTestErrorClass]
+
+
+class ErrorFingerprintIndex(Entity):
+    """Persisted classifications of the stored errors, keyed the same way `GoTestError.match` compares them.
+
+    `runs` holds run_id -> (bot, human) for every classified error, `fingerprints` holds
+    `GoTestError.fingerprint` -> run_id -> (bot, human) for the errors that can match across runs.
+    `store_version` is the `TFErrorStore.version` the index was built from, a different version means it is stale.
+    """
+
+    runs: dict[str, ErrorClassificationsT] = Field(default_factory=dict)
+    fingerprints: dict[str, dict[str, ErrorClassificationsT]] = Field(default_factory=dict)
+    store_version: str = ""
+
+    def add(self, error: GoTestError) -> None:
+        if not (classifications := error.classifications):
+            return
+        self.runs[error.run_id] = classifications
+        if fingerprint := error.fingerprint:
+            self.fingerprints.setdefault(fingerprint, {})[error.run_id] = classifications
+
+    def remove(self, error: GoTestError) -> None:
+        self.runs.pop(error.run_id, None)
+        run_classifications = self.fingerprints.get(error.fingerprint, {})
+        run_classifications.pop(error.run_id, None)
+        if not run_classifications:
+            self.fingerprints.pop(error.fingerprint, None)
+
+    def look_for_existing_classifications(self, error: GoTestError) -> ErrorClassificationsT | None:
+        if classifications := self.runs.get(error.run_id):
+            return classifications
+        if run_classifications := self.fingerprints.get(error.fingerprint):
+            return next(iter(run_classifications.values()))
+        return None
+
+
 class TFErrors(Entity):
     errors: list[GoTestError] = field(default_factory=list)
+    _index: ErrorFingerprintIndex | None = PrivateAttr(default=None)
+    _index_key: int | None = PrivateAttr(default=None)
 
     @model_validator(mode="after")
     def sort_errors(self) -> TFErrors:
         self.errors.sort()
         return self
 
-    def look_for_existing_classifications(self, error: GoTestError) -> tuple[GoTestErrorClass, GoTestErrorClass] | None:
-        for candidate in self.errors:
-            if error.match(candidate) and (classifications := candidate.classifications):
-                logger.info(f"found existing classification for {error.run.name}: {classifications}")
-                return classifications
+    def _content_key(self) -> int:
+        # a replaced record, replaced details or a new classification changes the key
+        return hash(
+            tuple(
+                (id(error), id(error.details), error.bot_error_class, error.human_error_class) for error in self.errors
+            )
+        )
+
+    def look_for_existing_classifications(self, error: GoTestError) -> ErrorClassificationsT | None:
+        content_key = self._content_key()
+        if self._index is None or self._index_key != content_key:
+            self._index, self._index_key = self.fingerprint_index(), content_key
+        if classifications := self._index.look_for_existing_classifications(error):
+            logger.info(f"found existing classification for {error.run.name}: {classifications}")
+        return classifications
+
+    def fingerprint_index(self) -> ErrorFingerprintIndex:
+        index = ErrorFingerprintIndex()
+        for error in self.errors:
+            index.add(error)
+        return index
 
     def classified_errors(self) -> list[GoTestError]:
         return [error for error in self.errors if error.classifications is not None]
 
 
+def tf_errors_path(settings: AtlasInitSettings) -> Path:
+    """Legacy single-file store, migrated to `tf_errors_store_dir` on first access."""
+    return crud_dir(settings) / "tf_errors.yaml"
+
+
+def tf_errors_store_dir(settings: AtlasInitSettings) -> Path:
+    return crud_dir(settings) / "tf_errors"
+
+
+def tf_error_fingerprints_path(settings: AtlasInitSettings) -> Path:
+    return crud_dir(settings) / "tf_error_fingerprints.json"
+
+
+def open_tf_error_store(settings: AtlasInitSettings) -> TFErrorStore:
+    store = TFErrorStore(root=tf_errors_store_dir(settings))
+    legacy_path = tf_errors_path(settings)
+    if legacy_path.exists():
+        errors = parse_model(legacy_path, t=TFErrors).errors
+        store.put_many(errors)
+        legacy_path.rename(legacy_path.with_name(f"{legacy_path.stem}.migrated{legacy_path.suffix}"))
+        logger.info(f"migrated {len(errors)} errors from {legacy_path} to {store.root}")
+    return store
+
+
 def read_tf_errors(settings: AtlasInitSettings) -> TFErrors:
-    path = crud_dir(settings) / "tf_errors.yaml"
-    return parse_model(path, TFErrors) if path.exists() else TFErrors()
+    return TFErrors(errors=open_tf_error_store(settings).read_all())
 
 
 def read_tf_errors_for_day(settings: AtlasInitSettings, branch: str, date: datetime) -> list[GoTestError]:
@@ -81,17 +163,46 @@ def read_tf_errors_for_day(settings: AtlasInitSettings, branch: str, date: datet
 
 
 def store_or_update_tf_errors(settings: AtlasInitSettings, errors: list[GoTestError]) -> None:
-    existing = read_tf_errors(settings)
-    new_error_ids = {error.run.id for error in errors}
-    existing_without_new = [error for error in existing.errors if error.run.id not in new_error_ids]
-    all_errors = existing_without_new + errors
-    yaml_dump = dump(TFErrors(errors=all_errors), "yaml")
-    ensure_parents_write_text(crud_dir(settings) / "tf_errors.yaml", yaml_dump)
+    store = open_tf_error_store(settings)
+    fingerprint_index = read_tf_error_fingerprint_index(settings, store)
+    for error in errors:
+        if previous := store.get(error.run_id):
+            fingerprint_index.remove(previous)
+        fingerprint_index.add(error)
+    store.put_many(errors)
+    _store_fingerprint_index(settings, fingerprint_index, store)
+
+
+def _store_fingerprint_index(settings: AtlasInitSettings, index: ErrorFingerprintIndex, store: TFErrorStore) -> None:
+    index.store_version = store.version
+    ensure_parents_write_text(tf_error_fingerprints_path(settings), dump(index, "json"))
+
+
+def read_tf_error_fingerprint_index(
+    settings: AtlasInitSettings, store: TFErrorStore | None = None
+) -> ErrorFingerprintIndex:
+    """Avoids parsing all the stored errors, the index is rebuilt when the store was written without updating it."""
+    store = store or open_tf_error_store(settings)
+    path = tf_error_fingerprints_path(settings)
+    if path.exists():
+        index = parse_model(path, t=ErrorFingerprintIndex)
+        if index.store_version == store.version:
+            return index
+        logger.info(f"fingerprint index {path} is stale, rebuilding it from {store.root}")
+    index = TFErrors(errors=store.read_all()).fingerprint_index()
+    _store_fingerprint_index(settings, index, store)
+    return index
+
+
+def look_for_existing_classifications(settings: AtlasInitSettings, error: GoTestError) -> ErrorClassificationsT | None:
+    """Same as `TFErrors.look_for_existing_classifications` without reading all the stored errors."""
+    if classifications := read_tf_error_fingerprint_index(settings).look_for_existing_classifications(error):
+        logger.info(f"found existing classification for {error.run.name}: {classifications}")
+    return classifications
 
 
 def read_tf_error_by_run(settings: AtlasInitSettings, run: GoTestRun) -> GoTestError | None:
-    errors = read_tf_errors(settings)
-    return next((error for error in errors.errors if error.run.id == run.id), None)
+    return open_tf_error_store(settings).get(run.id)
 
 
 class TFTestRuns(Entity):
@@ -131,10 +242,23 @@ class GoTestRunNotFound(Exception):
         super().__init__(run_id)
 
 
+def error_output(details: ErrorDetailsT, test_output: str = "") -> str:
+    """Only errors without structured details are matched on their output, the others have exact queries."""
+    match details:
+        case GoTestDefaultError(error_str=error_str):
+            return error_str or test_output
+        case GoTestGeneralCheckError(error_check_str=error_check_str):
+            return error_check_str
+    return ""
+
+
 @dataclass
 class MongoDao:
     settings: AtlasInitSettings
     property_keys_run: ClassVar[list[str]] = ["group_name"]
+    _output_index: ErrorOutputIndex = field(init=False, default_factory=ErrorOutputIndex, repr=False)
+    _output_classifications: dict[str, GoTestErrorClassification] = field(init=False, default_factory=dict, repr=False)
+    _output_index_ts: datetime | None = field(init=False, default=None, repr=False)
 
     @cached_property
     def runs(self) -> AsyncIOMotorCollection:
@@ -200,7 +324,7 @@ class MongoDao:
         return classifications
 
     async def read_similar_error_classifications(
-        self, details: ErrorDetailsT, *, author_filter: ErrorClassAuthor | None = None
+        self, details: ErrorDetailsT, *, test_output: str = "", author_filter: ErrorClassAuthor | None = None
     ) -> dict[str, GoTestErrorClassification]:
         query = {}
         if author_filter:
@@ -238,14 +362,63 @@ class MongoDao:
                     if isinstance(classification.details, GoTestResourceCheckError)
                     and classification.details.check_errors_match(check_errors)
                 }
+            case GoTestDefaultError() | GoTestGeneralCheckError():
+                if not (output := error_output(details, test_output)):
+                    return {}
+                matches = await self.search_similar_error_output(output, author_filter=author_filter)
+                return {
+                    classification.run_id: classification
+                    for similar, classification in matches
+                    if similar.score >= DEFAULT_AUTO_APPLY_SCORE
+                }
             case _:
-                return {}  # todo: vector search to match on error output
+                return {}
         return await self._find_classifications(query)
 
+    async def refresh_error_output_index(self) -> ErrorOutputIndex:
+        """Adds the classifications stored since the last refresh, the first call indexes the whole collection."""
+        query = {}
+        if self._output_index_ts:
+            query["ts"] = {MongoQueryOperation.gte: self._output_index_ts}
+        for run_id, classification in (await self._find_classifications(query)).items():
+            self._index_error_output(run_id, classification)
+            if self._output_index_ts is None or classification.ts > self._output_index_ts:
+                self._output_index_ts = classification.ts
+        return self._output_index
+
+    def _index_error_output(self, run_id: str, classification: GoTestErrorClassification) -> None:
+        if output := error_output(classification.details, classification.test_output):
+            self._output_index.add(run_id, output)
+            self._output_classifications[run_id] = classification
+        else:
+            self._output_index.remove(run_id)
+            self._output_classifications.pop(run_id, None)
+
+    async def search_similar_error_output(
+        self,
+        output: str,
+        *,
+        top_k: int = 5,
+        min_score: float = 0.0,
+        author_filter: ErrorClassAuthor | None = None,
+    ) -> list[tuple[SimilarError, GoTestErrorClassification]]:
+        index = await self.refresh_error_output_index()
+        classifications = self._output_classifications
+
+        def accept(run_id: str) -> bool:
+            return author_filter is None or classifications[run_id].author == author_filter
+
+        matches = index.query(output, top_k=top_k, min_score=min_score, accept=accept)
+        return [(similar, classifications[similar.doc_id]) for similar in matches]
+
     async def add_classification(self, classification: GoTestErrorClassification) -> bool:
         """Returns is_new"""
         raw = dump_with_id(classification, id=classification.run_id, dt_keys=["ts"])
-        return await create_or_replace(self.classifications, raw)
+        is_new = await create_or_replace(self.classifications, raw)
+        if self._output_index_ts is not None:
+            # only refresh_error_output_index moves the watermark, a local ts can be ahead of writes from other clients
+            self._index_error_output(classification.run_id, classification)
+        return is_new
 
     async def read_tf_test_run(self, run_id: str) -> GoTestRun:
         raw = await self.runs.find_one({"_id": run_id})
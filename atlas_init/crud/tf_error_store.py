@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from atlas_init.cli_tf.go_test_tf_error import GoTestError
+
+logger = logging.getLogger(__name__)
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+
+class RecordRef(NamedTuple):
+    segment: int
+    offset: int
+    length: int
+
+
+def _segment_name(segment: int) -> str:
+    return f"{segment:06d}"
+
+
+@dataclass
+class TFErrorStore:
+    """Append-only store of `GoTestError`s, one json record per line in numbered segment files.
+
+    Each segment has an `.idx` sidecar with `[run_id, offset, length]` lines, loading the store only reads the sidecars.
+    A later record for the same run id replaces the earlier one, `compact` rewrites the live records into a new segment
+    once the replaced bytes outweigh the live ones.
+    """
+
+    root: Path
+    max_segment_bytes: int = 16 * 1024 * 1024
+    min_compact_bytes: int = 1024 * 1024
+    _index: dict[str, RecordRef] = field(init=False, default_factory=dict)
+    _segment_bytes: dict[int, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        for index_path in sorted(self.root.glob(f"*{INDEX_SUFFIX}")):
+            segment = int(index_path.stem)
+            self._segment_bytes[segment] = self._segment_path(segment).stat().st_size
+            for line in index_path.read_text().splitlines():
+                run_id, offset, length = json.loads(line)
+                self._index[run_id] = RecordRef(segment, offset, length)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, run_id: str) -> bool:
+        return run_id in self._index
+
+    @property
+    def run_ids(self) -> list[str]:
+        return list(self._index)
+
+    @property
+    def version(self) -> str:
+        """Changes with every write, a replaced record gets a new offset, used to invalidate derived indexes."""
+        refs = sorted((run_id, *ref) for run_id, ref in self._index.items())
+        return hashlib.sha256(json.dumps(refs).encode()).hexdigest()[:16]
+
+    @property
+    def live_bytes(self) -> int:
+        return sum(ref.length for ref in self._index.values())
+
+    @property
+    def dead_bytes(self) -> int:
+        return sum(self._segment_bytes.values()) - self.live_bytes
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.root / f"{_segment_name(segment)}{SEGMENT_SUFFIX}"
+
+    def _index_path(self, segment: int) -> Path:
+        return self.root / f"{_segment_name(segment)}{INDEX_SUFFIX}"
+
+    def _active_segment(self) -> int:
+        if not self._segment_bytes:
+            return 0
+        last = max(self._segment_bytes)
+        return last if self._segment_bytes[last] < self.max_segment_bytes else last + 1
+
+    def _append(self, segment: int, records: list[tuple[str, bytes]]) -> None:
+        offset = self._segment_bytes.get(segment, 0)
+        index_lines = []
+        with self._segment_path(segment).open("ab") as segment_file:
+            for run_id, raw in records:
+                segment_file.write(raw)
+                ref = RecordRef(segment, offset, len(raw))
+                index_lines.append(json.dumps([run_id, ref.offset, ref.length]) + "\n")
+                self._index[run_id] = ref
+                offset += len(raw)
+        with self._index_path(segment).open("a") as index_file:
+            index_file.writelines(index_lines)
+        self._segment_bytes[segment] = offset
+
+    def put_many(self, errors: Iterable[GoTestError]) -> None:
+        records = [(error.run_id, (error.model_dump_json() + "\n").encode()) for error in errors]
+        if not records:
+            return
+        segment = self._active_segment()
+        self._append(segment, records)
+        if self.dead_bytes > max(self.live_bytes, self.min_compact_bytes):
+            self.compact()
+
+    def _read_raw(self, refs: list[RecordRef]) -> list[bytes]:
+        by_segment: dict[int, list[tuple[int, RecordRef]]] = defaultdict(list)
+        for i, ref in enumerate(refs):
+            by_segment[ref.segment].append((i, ref))
+        raws: list[bytes] = [b""] * len(refs)
+        for segment, segment_refs in by_segment.items():
+            with self._segment_path(segment).open("rb") as segment_file:
+                for i, ref in sorted(segment_refs, key=lambda item: item[1].offset):
+                    segment_file.seek(ref.offset)
+                    raws[i] = segment_file.read(ref.length)
+        return raws
+
+    def get(self, run_id: str) -> GoTestError | None:
+        if (ref := self._index.get(run_id)) is None:
+            return None
+        [raw] = self._read_raw([ref])
+        return GoTestError.model_validate_json(raw)
+
+    def read_all(self) -> list[GoTestError]:
+        return [GoTestError.model_validate_json(raw) for raw in self._read_raw(list(self._index.values()))]
+
+    def compact(self) -> None:
+        old_segments = sorted(self._segment_bytes)
+        if not old_segments:
+            return
+        run_ids = list(self._index)
+        raws = self._read_raw([self._index[run_id] for run_id in run_ids])
+        new_segment = old_segments[-1] + 1
+        self._append(new_segment, list(zip(run_ids, raws)))
+        for segment in old_segments:
+            self._index_path(segment).unlink()
+            self._segment_path(segment).unlink()
+            del self._segment_bytes[segment]
+        logger.info(f"compacted {len(old_segments)} tf error segments into {self._segment_path(new_segment)}")
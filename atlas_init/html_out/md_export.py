@@ -9,6 +9,7 @@ from ask_shell.models import ShellRunEventT, ShellRunStdOutput
 from zero_3rdparty import str_utils
 from zero_3rdparty.file_utils import copy, ensure_parents_write_text
 from zero_3rdparty.future import chain_future
+from atlas_init.html_out.static_site import INDEX_MD_FILENAME, html_rel_path, publish_static_pages
 from atlas_init.settings.env_vars import AtlasInitSettings
 from pathlib import Path
 from model_lib import Event
@@ -26,12 +27,18 @@ class MonthlyReportPaths(Event):
     ERROR_ONLY_SUFFIX: ClassVar[str] = "_error-only.md"
     DAILY_SUFFIX: ClassVar[str] = "_daily.md"
 
-    def export_to_dir(self, out_dir: Path) -> None:
+    def export_to_dir(self, out_dir: Path) -> list[Path]:
+        """Returns the exported markdown files."""
+        exported: list[Path] = []
         for path in [self.summary_path, self.error_only_path, self.daily_path]:
             if path.exists():
                 ensure_parents_write_text(out_dir / path.name, path.read_text())
+                exported.append(out_dir / path.name)
         if self.details_dir.exists():
-            copy(self.details_dir, out_dir / self.details_dir.name, clean_dest=True)
+            details_out = out_dir / self.details_dir.name
+            copy(self.details_dir, details_out, clean_dest=True)
+            exported.extend(sorted(details_out.rglob("*.md")))
+        return exported
 
     @classmethod
     def from_settings(cls, settings: AtlasInitSettings, summary_name: str) -> MonthlyReportPaths:
@@ -47,17 +54,23 @@ class MonthlyReportPaths(Event):
 
 
 CI_TESTS_DIR_NAME = "ci-tests"
+STATIC_SITE_DIR_NAME = "static-site"
 MKDOCS_SERVE_TIMEOUT = 120
 MKDOCS_SERVE_URL = "http://127.0.0.1:8000"
 
 
-def export_ci_tests_markdown_to_html(settings: AtlasInitSettings, report_paths: MonthlyReportPaths) -> None:
+def export_ci_tests_markdown_to_html(
+    settings: AtlasInitSettings, report_paths: MonthlyReportPaths, *, incremental: bool = False
+) -> None:
     html_out = settings.atlas_init_static_html_path
     if not html_out or not html_out.exists():
         return
     ci_tests_dir = html_out / CI_TESTS_DIR_NAME
     docs_out_dir = ci_tests_dir / "docs"
-    report_paths.export_to_dir(docs_out_dir)
+    exported_md = report_paths.export_to_dir(docs_out_dir)
+    if incremental:
+        publish_incremental(ci_tests_dir, report_paths, exported_md)
+        return
     index_md_content = create_index_md(docs_out_dir)
     ensure_parents_write_text(docs_out_dir / "index.md", index_md_content)
     server_url, run_event = start_mkdocs_serve(ci_tests_dir)
@@ -74,6 +87,17 @@ def export_ci_tests_markdown_to_html(settings: AtlasInitSettings, report_paths:
         build_and_push(ci_tests_dir, report_paths.summary_name)
 
 
+def publish_incremental(ci_tests_dir: Path, report_paths: MonthlyReportPaths, exported_md: list[Path]) -> None:
+    """Renders only the exported report pages into the static site dir, no mkdocs build or serve needed."""
+    site_dir = ci_tests_dir / STATIC_SITE_DIR_NAME
+    publish_static_pages(ci_tests_dir / "docs", site_dir, exported_md, index_md_from_names)
+    index_path = site_dir / html_rel_path(INDEX_MD_FILENAME)
+    if confirm(f"do you want to open the html docs? {index_path}", default=False):
+        run_and_wait(f'open -a "Google Chrome" {index_path}')
+    if confirm("Are docs ok to push?", default=False):
+        build_and_push(ci_tests_dir, report_paths.summary_name, skip_build=True)
+
+
 def create_index_md(docs_out_dir: Path) -> str:
     """
     tree -L 1 docs
@@ -86,11 +110,15 @@ def create_index_md(docs_out_dir: Path) -> str:
     ├── javascript
     └── stylesheets
     """
-    md_files = {f.name: f for f in docs_out_dir.glob("*.md") if f.name != "index.md"}
+    return index_md_from_names([f.name for f in docs_out_dir.glob("*.md")])
+
+
+def index_md_from_names(md_names: list[str]) -> str:
+    md_files = {name for name in md_names if name != INDEX_MD_FILENAME}
     parsed_dates = []
-    for md_file in md_files.values():
+    for md_name in md_files:
         with suppress(ValueError):
-            parsed_dates.append(datetime.strptime(md_file.stem, "%Y-%m-%d"))
+            parsed_dates.append(datetime.strptime(Path(md_name).stem, "%Y-%m-%d"))
     parsed_dates.sort(reverse=True)
 
     def date_row(date: datetime) -> str:
@@ -136,8 +164,9 @@ def start_mkdocs_serve(ci_tests_dir: Path) -> tuple[str, ShellRun]:
     return MKDOCS_SERVE_URL, run_event
 
 
-def build_and_push(ci_tests_dir: Path, summary_name: str) -> None:
-    run_and_wait("uv run mkdocs build", cwd=ci_tests_dir, print_prefix="build")
+def build_and_push(ci_tests_dir: Path, summary_name: str, *, skip_build: bool = False) -> None:
+    if not skip_build:
+        run_and_wait("uv run mkdocs build", cwd=ci_tests_dir, print_prefix="build")
     run_and_wait("git add .", cwd=ci_tests_dir, print_prefix="add")
     run_and_wait(f"git commit -m 'update ci tests {summary_name}'", cwd=ci_tests_dir, print_prefix="commit")
     run_and_wait("git push", cwd=ci_tests_dir, print_prefix="push")
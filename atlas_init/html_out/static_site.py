@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import html
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Iterable
+
+from markdown_it import MarkdownIt
+from markdown_it.rules_core import StateCore
+from model_lib import Entity, dump, parse_model
+from pydantic import Field
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+logger = logging.getLogger(__name__)
+SITE_MANIFEST_FILENAME = ".site_manifest.yaml"
+INDEX_MD_FILENAME = "index.md"
+_md_link_pattern = re.compile(r"\.md(?=$|#)")
+_page_style = """\
+body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; margin: 0 auto; max-width: 80rem; padding: 1rem; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #ddd; padding: 0.25rem 0.5rem; text-align: left; vertical-align: top; }
+pre { background: #f6f8fa; overflow-x: auto; padding: 0.5rem; }
+"""
+_page_template = """\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+{style}</style>
+</head>
+<body>
+<nav><a href="{index_href}">CI Tests</a></nav>
+<main>
+{body}</main>
+</body>
+</html>
+"""
+
+
+def heading_id(heading: str) -> str:
+    """Same anchor as `header_to_markdown_link` (without the `#`) so the links in the reports resolve."""
+    anchor = re.sub(r"[^a-z0-9 \-]", "", heading.strip().lower())
+    return anchor.replace(" ", "-")
+
+
+def _site_links(state: StateCore) -> None:
+    tokens = state.tokens
+    for i, token in enumerate(tokens):
+        if token.type == "heading_open" and i + 1 < len(tokens):
+            token.attrSet("id", heading_id(tokens[i + 1].content))
+        for child in token.children or []:
+            if child.type == "link_open" and isinstance(href := child.attrGet("href"), str) and "://" not in href:
+                child.attrSet("href", _md_link_pattern.sub(".html", href))
+
+
+def markdown_renderer() -> MarkdownIt:
+    md = MarkdownIt("commonmark").enable(["table", "strikethrough"])
+    md.core.ruler.push("site_links", _site_links)
+    return md
+
+
+def html_rel_path(md_rel_path: str) -> str:
+    return _md_link_pattern.sub(".html", md_rel_path)
+
+
+def render_page(md: MarkdownIt, md_rel_path: str, md_content: str) -> str:
+    tokens = md.parse(md_content)
+    title = next(
+        (
+            tokens[i + 1].content
+            for i, token in enumerate(tokens)
+            if token.type == "heading_open" and i + 1 < len(tokens)
+        ),
+        Path(md_rel_path).stem,
+    )
+    depth = md_rel_path.count("/")
+    return _page_template.format(
+        title=html.escape(title),
+        style=_page_style,
+        index_href="../" * depth + html_rel_path(INDEX_MD_FILENAME),
+        body=md.renderer.render(tokens, md.options, {}),
+    )
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class SiteManifest(Entity):
+    """Content hash of every rendered page, keys are the markdown paths relative to the docs dir.
+
+    The index is built from these keys, so publishing never has to list the previously rendered pages.
+    """
+
+    pages: dict[str, str] = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> SiteManifest:
+        if path.exists():
+            return parse_model(path, t=cls)
+        return cls()
+
+    def store(self, path: Path) -> None:
+        self.pages = dict(sorted(self.pages.items()))
+        ensure_parents_write_text(path, dump(self, "yaml"))
+
+    def top_level_names(self) -> list[str]:
+        return [name for name in self.pages if "/" not in name]
+
+
+def publish_static_pages(
+    docs_dir: Path,
+    site_dir: Path,
+    md_paths: Iterable[Path],
+    index_md: Callable[[list[str]], str],
+    *,
+    force: bool = False,
+) -> list[Path]:
+    """Renders the `md_paths` (inside `docs_dir`) that are new or changed since the last publish into `site_dir`.
+
+    The work is proportional to the pages passed in, the index is re-rendered from the manifest on every publish.
+    Returns the html paths written, the index included.
+    """
+    manifest_path = site_dir / SITE_MANIFEST_FILENAME
+    manifest = SiteManifest.load(manifest_path)
+    md = markdown_renderer()
+    written: list[Path] = []
+    for md_path in md_paths:
+        rel_path = md_path.relative_to(docs_dir).as_posix()
+        if rel_path == INDEX_MD_FILENAME:
+            continue
+        md_content = md_path.read_text()
+        content_hash = _content_hash(md_content)
+        html_path = site_dir / html_rel_path(rel_path)
+        if not force and manifest.pages.get(rel_path) == content_hash and html_path.exists():
+            continue
+        ensure_parents_write_text(html_path, render_page(md, rel_path, md_content))
+        manifest.pages[rel_path] = content_hash
+        written.append(html_path)
+    index_content = index_md(manifest.top_level_names())
+    ensure_parents_write_text(docs_dir / INDEX_MD_FILENAME, index_content)
+    index_path = site_dir / html_rel_path(INDEX_MD_FILENAME)
+    ensure_parents_write_text(index_path, render_page(md, INDEX_MD_FILENAME, index_content))
+    written.append(index_path)
+    manifest.store(manifest_path)
+    logger.info(f"published {len(written) - 1} changed pages and the index to {site_dir}")
+    return written
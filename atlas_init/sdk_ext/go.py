@@ -1,12 +1,15 @@
-from contextlib import suppress
 import logging
+import time
+from functools import lru_cache
 from pathlib import Path
+from typing import TextIO
 from ask_shell import confirm, run_and_wait
-from model_lib import dump, parse_model
+from model_lib import parse_dict
 import typer
-from zero_3rdparty.file_utils import clean_dir, copy, ensure_parents_write_text
+import yaml
+from zero_3rdparty.file_utils import clean_dir, copy
 from atlas_init.cli_args import ParsedPaths, option_sdk_repo_path, option_mms_repo_path
-from atlas_init.cli_tf.openapi import OpenapiSchema
+from atlas_init.cli_tf.openapi import extract_api_version_content_header
 
 _go_mod_line = "replace go.mongodb.org/atlas-sdk/v20250312005 v20250312005.0.0 => ../atlas-sdk-go"
 logger = logging.getLogger(__name__)
@@ -32,39 +35,126 @@ def go(
 
 
 def transform_openapi(old: Path, dest_path: Path) -> Path:
-    api_spec = parse_model(old, t=OpenapiSchema)
-    new_api_spec = api_spec.model_dump()
-    for path in api_spec.paths.keys():
-        for method_name, method in api_spec.methods_with_name(path):
-            responses = method.get("responses", {})
-            for code, multi_responses in responses.items():
-                with suppress(AlreadySingleVersion):
-                    new_api_spec["paths"][path][method_name]["responses"][code]["content"] = use_a_single_version(
-                        multi_responses, api_spec, path
-                    )
-            if request_body := method.get("requestBody", {}):
-                with suppress(AlreadySingleVersion):
-                    new_api_spec["paths"][path][method_name]["requestBody"]["content"] = use_a_single_version(
-                        request_body, api_spec, path
-                    )
-    dest_yaml = dump(new_api_spec, "yaml")
-    ensure_parents_write_text(dest_path, dest_yaml)
+    """Keeps only the latest api version of each multi-version response and request body.
+
+    The spec is transformed in place in a single pass and the yaml is written path by path,
+    the full spec is never copied or dumped to a string.
+    """
+    timings: dict[str, float] = {}
+    start = time.monotonic()
+    api_spec = parse_dict(old)
+    timings["load"] = time.monotonic() - start
+    start = time.monotonic()
+    single_versioned = 0
+    for path, path_item in api_spec.get("paths", {}).items():
+        for method_name in _TRANSFORMED_METHODS:
+            if not (method := path_item.get(method_name)):
+                continue
+            for response in method.get("responses", {}).values():
+                if content := latest_version_content(response, path):
+                    response["content"] = content
+                    single_versioned += 1
+            if (request_body := method.get("requestBody", {})) and (
+                content := latest_version_content(request_body, path)
+            ):
+                request_body["content"] = content
+                single_versioned += 1
+    timings["transform"] = time.monotonic() - start
+    start = time.monotonic()
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    with dest_path.open("w") as dest_file:
+        dump_openapi_yaml(api_spec, dest_file)
+    timings["write"] = time.monotonic() - start
+    stage_timings = ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items())
+    logger.info(f"kept the latest version of {single_versioned} contents in {dest_path} ({stage_timings})")
     return dest_path
 
 
-class AlreadySingleVersion(Exception):
-    pass
+_TRANSFORMED_METHODS = ("post", "get", "delete", "patch", "put")
+
+
+@lru_cache
+def content_header_version(header: str) -> str | None:
+    """The spec repeats a handful of content headers, each is only matched once."""
+    return extract_api_version_content_header(header)
+
+
+def latest_version_content(multi_content: dict, path: str) -> dict[str, dict] | None:
+    """Same versions as `OpenapiSchema._unpack_schema_versions`, `None` when there is at most one version."""
+    content = multi_content.get("content")
+    if not isinstance(content, dict):
+        return None
+    versions = []
+    for header, media in content.items():
+        if not isinstance(media, dict) or not header.endswith("json"):
+            continue
+        if version := media.get("x-xgen-version") or content_header_version(header):
+            versions.append(version)
+    if len(versions) <= 1:
+        return None
+    last_header = f"application/vnd.atlas.{max(versions)}+json"
+    assert last_header in content, f"failed to find {last_header} for {path} in {content.keys()}"
+    return {last_header: content[last_header]}
+
+
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _emit_node(dumper: yaml.SafeDumper, node: yaml.Node) -> None:
+    """`Serializer.serialize_node` without aliases (a parsed spec shares no objects), usable with the libyaml emitter."""
+    if isinstance(node, yaml.ScalarNode):
+        implicit = (
+            node.tag == dumper.resolve(yaml.ScalarNode, node.value, (True, False)),
+            node.tag == dumper.resolve(yaml.ScalarNode, node.value, (False, True)),
+        )
+        dumper.emit(yaml.ScalarEvent(None, node.tag, implicit, node.value, style=node.style))
+    elif isinstance(node, yaml.SequenceNode):
+        implicit = node.tag == dumper.resolve(yaml.SequenceNode, node.value, True)
+        dumper.emit(yaml.SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+        for item in node.value:
+            _emit_node(dumper, item)
+        dumper.emit(yaml.SequenceEndEvent())
+    elif isinstance(node, yaml.MappingNode):
+        implicit = node.tag == dumper.resolve(yaml.MappingNode, node.value, True)
+        dumper.emit(yaml.MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+        for key, value in node.value:
+            _emit_node(dumper, key)
+            _emit_node(dumper, value)
+        dumper.emit(yaml.MappingEndEvent())
+    else:
+        raise TypeError(f"unexpected yaml node {node!r}")
+
+
+def _emit_data(dumper: yaml.SafeDumper, data: object) -> None:
+    _emit_node(dumper, dumper.represent_data(data))
+    # same reset as `Representer.represent`, only the current chunk is kept in memory
+    dumper.represented_objects = {}
+    dumper.object_keeper = []
 
 
-def use_a_single_version(multi_content: dict, api_spec: OpenapiSchema, path: str) -> dict[str, dict]:
-    if api_versions := api_spec._unpack_schema_versions(multi_content):
-        if len(api_versions) > 1:
-            latest_version = max(api_versions)
-            last_header = f"application/vnd.atlas.{latest_version}+json"
-            old_content = multi_content["content"]
-            assert last_header in old_content, f"failed to find {last_header} for {path} in {old_content.keys()}"
-            return {last_header: old_content[last_header]}
-    raise AlreadySingleVersion
+def dump_openapi_yaml(api_spec: dict, stream: TextIO) -> None:
+    """Same output as `dump(api_spec, "yaml")`, each path is represented and emitted on its own."""
+    dumper = _YamlDumper(stream, default_flow_style=False, width=1000, allow_unicode=True, sort_keys=False)
+    map_tag = "tag:yaml.org,2002:map"
+    try:
+        dumper.open()
+        dumper.emit(yaml.DocumentStartEvent(explicit=False))
+        dumper.emit(yaml.MappingStartEvent(None, map_tag, True, flow_style=False))
+        for key, value in api_spec.items():
+            _emit_data(dumper, key)
+            if key != "paths" or not isinstance(value, dict) or not value:
+                _emit_data(dumper, value)
+                continue
+            dumper.emit(yaml.MappingStartEvent(None, map_tag, True, flow_style=False))
+            for path, path_item in value.items():
+                _emit_data(dumper, path)
+                _emit_data(dumper, path_item)
+            dumper.emit(yaml.MappingEndEvent())
+        dumper.emit(yaml.MappingEndEvent())
+        dumper.emit(yaml.DocumentEndEvent(explicit=False))
+        dumper.close()
+    finally:
+        dumper.dispose()
 
 
 def generate_openapi_spec(mms_path: Path, mms_branch: str) -> Path:
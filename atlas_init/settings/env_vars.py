@@ -156,6 +156,18 @@ class AtlasInitSettings(StaticSettings):
     def atlas_atlas_api_transformed_yaml(self) -> Path:
         return self.cache_root / "atlas_api_transformed.yaml"
 
+    @property
+    def error_rules_path(self) -> Path:
+        return self.static_root / "error_rules.yaml"
+
+    @property
+    def cfn_type_registry_path(self) -> Path:
+        return self.cache_root / "cfn_type_registry.yaml"
+
+    @property
+    def cfn_template_index_path(self) -> Path:
+        return self.cache_root / "cfn_template_index.json"
+
     def cfn_region(self, default: str) -> str:
         return self.atlas_init_cfn_region or default
 
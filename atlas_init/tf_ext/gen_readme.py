@@ -1,10 +1,17 @@
 from __future__ import annotations
+import hashlib
 import logging
+import os
+from concurrent.futures import Future
 from enum import StrEnum
 from pathlib import Path
+from threading import RLock
 from typing import Callable, TypeAlias
 
-from ask_shell import run_and_wait
+import typer
+from ask_shell import run_and_wait, run_pool
+from model_lib import Entity, dump, parse_model
+from pydantic import Field, PrivateAttr
 from zero_3rdparty.file_utils import ensure_parents_write_text, update_between_markers
 
 from atlas_init.tf_ext.gen_examples import read_example_dirs
@@ -47,22 +54,24 @@ class ReadmeMarkers(StrEnum):
         return "\n".join(cls.marker_lines(marker_name) for marker_name in list(cls))
 
     @classmethod
-    def readme_generators(cls) -> ReadmeGenerators:
+    def readme_generators(cls, *, skip_tf_fmt: bool = False) -> ReadmeGenerators:
         return [
             (cls.DISCLAIMER, lambda _: _readme_disclaimer),
-            (cls.EXAMPLE, lambda workspace: read_examples(workspace / EXAMPLES_DIRNAME)),
+            (cls.EXAMPLE, lambda workspace: read_examples(workspace / EXAMPLES_DIRNAME, skip_tf_fmt=skip_tf_fmt)),
         ]
 
 
 ReadmeGenerators: TypeAlias = list[tuple[ReadmeMarkers, Callable[[Path], str]]]
 
 
-def read_examples(examples_dir: Path) -> str:
+def read_examples(examples_dir: Path, *, skip_tf_fmt: bool = False) -> str:
     example_dirs = read_example_dirs(examples_dir)
     if not example_dirs:
         return ""
-    # ensure the examples are formatted first
-    run_and_wait("terraform fmt -recursive .", cwd=examples_dir.parent, allow_non_zero_exit=True, ansi_content=False)
+    if not skip_tf_fmt:  # ensure the examples are formatted first
+        run_and_wait(
+            "terraform fmt -recursive .", cwd=examples_dir.parent, allow_non_zero_exit=True, ansi_content=False
+        )
     content = ["# Examples"]
     for example_dir in example_dirs:
         example_name = example_dir.name
@@ -149,3 +158,154 @@ def _default_link_updater(readme_content: str) -> str:  # can be a global replac
     }.items():
         readme_content = readme_content.replace(replace_in, replace_out)
     return readme_content
+
+
+README_MANIFEST_FILENAME = ".readme_manifest.yaml"
+_readme_input_suffixes = {".tf", ".yaml", ".yml", ".json", ".py"}
+_readme_input_skip_dirs = {".terraform", "__pycache__"}
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def readme_inputs_hash(module_dir: Path) -> str:
+    """Hash of the files a README is generated from: tf files, examples and config files, the README itself is excluded."""
+    digest = hashlib.sha256()
+    paths = sorted(
+        path
+        for path in module_dir.rglob("*")
+        if path.suffix in _readme_input_suffixes
+        and path.is_file()
+        and not _readme_input_skip_dirs.intersection(path.relative_to(module_dir).parts)
+    )
+    for path in paths:
+        digest.update(f"{path.relative_to(module_dir).as_posix()}\0{_file_hash(path)}\0".encode())
+    return digest.hexdigest()
+
+
+class ReadmeHashes(Entity):
+    inputs: str
+    readme: str
+
+
+class ReadmeManifest(Entity):
+    """Content hashes of each module's README inputs and output from the last generation, keys are relative to the manifest."""
+
+    modules: dict[str, ReadmeHashes] = Field(default_factory=dict)
+    _lock: RLock = PrivateAttr(default_factory=RLock)
+
+    @classmethod
+    def load(cls, path: Path) -> ReadmeManifest:
+        if path.exists():
+            return parse_model(path, t=cls)
+        return cls()
+
+    def store(self, path: Path) -> None:
+        with self._lock:
+            self.modules = dict(sorted(self.modules.items()))
+            ensure_parents_write_text(path, dump(self, "yaml"))
+
+    def is_up_to_date(self, key: str, module_dir: Path) -> bool:
+        with self._lock:
+            hashes = self.modules.get(key)
+        readme_path = module_dir / README_FILENAME
+        return (
+            hashes is not None
+            and readme_path.exists()
+            and hashes.readme == _file_hash(readme_path)
+            and hashes.inputs == readme_inputs_hash(module_dir)
+        )
+
+    def update(self, key: str, module_dir: Path) -> None:
+        hashes = ReadmeHashes(inputs=readme_inputs_hash(module_dir), readme=_file_hash(module_dir / README_FILENAME))
+        with self._lock:
+            self.modules[key] = hashes
+
+
+class ReadmeBatchError(Exception):
+    def __init__(self, failed: dict[Path, Exception]) -> None:
+        self.failed = failed
+        details = "\n".join(f"{module_dir}: {error}" for module_dir, error in failed.items())
+        super().__init__(f"failed to generate {len(failed)} READMEs:\n{details}")
+
+
+def find_readme_module_dirs(root: Path) -> list[Path]:
+    """Directories with a README.md and tf files, examples and `.terraform` directories are not modules."""
+    return sorted(
+        readme_path.parent
+        for readme_path in root.rglob(README_FILENAME)
+        if not {EXAMPLES_DIRNAME, *_readme_input_skip_dirs}.intersection(readme_path.relative_to(root).parts)
+        and any(readme_path.parent.glob("*.tf"))
+    )
+
+
+def generate_and_write_readmes(
+    module_dirs: list[Path],
+    *,
+    manifest_path: Path | None = None,
+    force: bool = False,
+    max_concurrent: int = 4,
+) -> list[Path]:
+    """Regenerates the READMEs of the modules that changed since the last run, returns the regenerated module dirs.
+
+    `terraform fmt` runs once for all changed modules, the generators and `terraform-docs` run concurrently per module.
+    The manifest defaults to `README_MANIFEST_FILENAME` in the common directory of the modules.
+    """
+    if not module_dirs:
+        return []
+    root = Path(os.path.commonpath(module_dirs))
+    manifest_path = manifest_path or root / README_MANIFEST_FILENAME
+    manifest = ReadmeManifest.load(manifest_path)
+
+    def manifest_key(module_dir: Path) -> str:
+        return module_dir.resolve().relative_to(manifest_path.parent.resolve(), walk_up=True).as_posix()
+
+    changed = [
+        module_dir
+        for module_dir in module_dirs
+        if force or not manifest.is_up_to_date(manifest_key(module_dir), module_dir)
+    ]
+    logger.info(f"{len(changed)}/{len(module_dirs)} READMEs need an update")
+    if not changed:
+        return []
+    fmt_root = Path(os.path.commonpath(changed))
+    run_and_wait("terraform fmt -recursive .", cwd=fmt_root, allow_non_zero_exit=True, ansi_content=False)
+    generators = ReadmeMarkers.readme_generators(skip_tf_fmt=True)
+
+    def generate(module_dir: Path) -> None:
+        generate_and_write_readme(module_dir, generators=generators)
+        manifest.update(manifest_key(module_dir), module_dir)
+
+    failed: dict[Path, Exception] = {}
+    with run_pool(
+        f"Generating {len(changed)} READMEs", total=len(changed), max_concurrent_submits=max_concurrent
+    ) as pool:
+        futures: dict[Path, Future] = {module_dir: pool.submit(generate, module_dir) for module_dir in changed}
+    for module_dir, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.exception(f"failed to generate README for {module_dir}")
+            failed[module_dir] = e
+    manifest.store(manifest_path)
+    if failed:
+        raise ReadmeBatchError(failed)
+    return changed
+
+
+def tf_readmes(
+    modules_dir: Path = typer.Option(
+        ..., "-d", "--modules-dir", help="Directory with the modules to update", default_factory=Path.cwd
+    ),
+    force: bool = typer.Option(False, "--force", help="Regenerate READMEs with unchanged inputs"),
+    max_concurrent: int = typer.Option(4, "--max-concurrent", help="Modules generated concurrently"),
+):
+    module_dirs = find_readme_module_dirs(modules_dir)
+    updated = generate_and_write_readmes(
+        module_dirs,
+        manifest_path=modules_dir / README_MANIFEST_FILENAME,
+        force=force,
+        max_concurrent=max_concurrent,
+    )
+    logger.info(f"updated {len(updated)} READMEs in {modules_dir}")
@@ -7,7 +7,7 @@ from typing import Iterable
 from ask_shell import run_and_wait
 
 from atlas_init.tf_ext.models_module import ModuleGenConfig, ResourceAbs, ResourceGenConfig
-from atlas_init.tf_ext.schema_to_dataclass import ResourceTypePythonModule
+from atlas_init.tf_ext.schema_to_dataclass import ResourceTypePythonModule, use_fast_validator
 
 logger = logging.getLogger(__name__)
 
@@ -45,9 +45,14 @@ def data_external(module: ResourceTypePythonModule, config: ModuleGenConfig) ->
     if extras := config.inputs_json_hcl_extras:
         input_json_parts.extend(extras)
     inputs_json_merge = input_json_parts[0] if len(input_json_parts) == 1 else f"merge({', '.join(input_json_parts)})"
+    if use_fast_validator(module, config):
+        validator_name = config.validator_path(module.resource_type).name
+        program = f'["python3", "-S", "${{path.module}}/{validator_name}"]'
+    else:
+        program = f'["python3", "${{path.module}}/{module.resource_type}.py"]'
     return f"""
 data "external" "{module.resource_type}" {{
-    program = ["python3", "${{path.module}}/{module.resource_type}.py"]
+    program = {program}
     query = {{
         input_json = jsonencode({inputs_json_merge})
     }}
@@ -55,18 +60,38 @@ data "external" "{module.resource_type}" {{
 """
 
 
-def resource_declare_direct(py_module: ResourceTypePythonModule, config: ResourceGenConfig) -> str:
+def required_preconditions(parent_cls: type[ResourceAbs], field_names: list[str], field_base: str) -> str:
+    """Replaces the required checks of the `data "external"` program, no process is started at plan time."""
+    required = [name for name in field_names if name in parent_cls.REQUIRED_ATTRIBUTES]
+    if not required:
+        return ""
+    preconditions = "\n".join(
+        f"""    precondition {{
+      condition     = {field_base}{name} != null
+      error_message = "{name} is required"
+    }}"""
+        for name in required
+    )
+    return f"""  lifecycle {{
+{preconditions}
+  }}
+"""
+
+
+def resource_declare_direct(
+    py_module: ResourceTypePythonModule, config: ResourceGenConfig, *, validate_required: bool = False
+) -> str:
     parent_cls = py_module.resource
     resource_type = py_module.resource_type
     assert parent_cls, f"{resource_type} does not have a resource"
     field_base = f"var.{resource_type}." if config.use_single_variable else "var."
-    field_values = "\n".join(
-        _field_value(parent_cls, name, field_base) for name in py_module.base_field_names_not_computed
-    )
+    field_names = py_module.base_field_names_not_computed
+    field_values = "\n".join(_field_value(parent_cls, name, field_base) for name in field_names)
+    lifecycle = required_preconditions(parent_cls, field_names, field_base) if validate_required else ""
 
     return f"""
 resource "{py_module.resource_type}" "this" {{
-{field_values}
+{lifecycle}{field_values}
 }}
 """
 
@@ -172,9 +197,14 @@ def format_tf_content(content: str) -> str:
 def generate_resource_main(python_module: ResourceTypePythonModule, config: ModuleGenConfig) -> str:
     resource = python_module.resource_ext or python_module.resource
     assert resource, f"{python_module} does not have a resource"
+    uses_python = config.uses_python(python_module)
     resource_hcl = (
-        resource_declare_direct(python_module, config.resource_config(python_module.resource_type))
-        if config.skip_python
+        resource_declare_direct(
+            python_module,
+            config.resource_config(python_module.resource_type),
+            validate_required=not config.skip_python,
+        )
+        if not uses_python
         else resource_declare(
             resource_type=python_module.resource_type,
             required_fields=resource.REQUIRED_ATTRIBUTES,
@@ -185,8 +215,8 @@ def generate_resource_main(python_module: ResourceTypePythonModule, config: Modu
     return format_tf_content(
         "\n".join(
             [
-                *([] if config.skip_python else [locals_def(python_module)]),
-                *([] if config.skip_python else [data_external(python_module, config)]),
+                *([locals_def(python_module)] if uses_python else []),
+                *([data_external(python_module, config)] if uses_python else []),
                 "",
                 resource_hcl,
                 "",
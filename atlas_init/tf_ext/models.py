@@ -105,9 +105,9 @@ class ModuleConfig(Entity):
         has_external_dependencies = len(atlas_graph.external_parents.get(child, [])) > 0
         if self.allow_external_dependencies and has_external_dependencies:
             has_external_dependencies = False
-        is_a_parent = bool(atlas_graph.parent_child_edges.get(child))
+        is_a_parent = bool(atlas_graph.children(child))
         extra_parents = (
-            set(atlas_graph.all_parents(child))
+            atlas_graph.parents(child)
             - self.allowed_multi_parents
             - set(self.root_resource_types)
             - set(self.extra_nested_resource_types)
@@ -102,13 +102,21 @@ class ProviderGenConfig(Entity):
     provider_path: str
     resources: list[ResourceGenConfig] = PydanticField(default_factory=list)
     settings: TfExtSettings = PydanticField(default_factory=TfExtSettings.from_env)
-    last_gen_sha: str = ""
+    last_gen_version_key: str = ""
+
+    @model_validator(mode="before")
+    @classmethod
+    def drop_last_gen_sha(cls, data: Any) -> Any:
+        # older manifests stored the provider repo git sha, the next generation writes the new key
+        if isinstance(data, dict) and "last_gen_sha" in data:
+            data = {key: value for key, value in data.items() if key != "last_gen_sha"}
+        return data
 
     def config_dump(self) -> dict[str, Any]:
         return {
             "provider_path": self.provider_path,
             "resources": [r.model_dump(exclude_defaults=True, exclude_unset=True) for r in self.resources],
-            "last_gen_sha": self.last_gen_sha,
+            "last_gen_version_key": self.last_gen_version_key,
         }
 
     @property
@@ -142,7 +150,9 @@ class ModuleGenConfig(Entity):
     out_dir: Path | None = None
     dataclass_out_dir: Path | None = None
     skip_python: bool = False
+    skip_python_if_simple: bool = False
     debug_json_logs: bool = False
+    fast_validator: bool = False
     example_plan_checks: list[ExamplePlanCheck] = PydanticField(default_factory=list)
     use_descriptions: bool = False
     inputs_json_hcl_extras: list[str] = PydanticField(default_factory=list)
@@ -222,6 +232,20 @@ class ModuleGenConfig(Entity):
             return dataclass_out_dir / f"{resource_type}.py"
         return self.module_out_path / f"{resource_type}.py"
 
+    def uses_python(self, python_module: "ResourceTypePythonModule") -> bool:
+        """Without custom hooks the `data "external"` program only passes the variables through.
+
+        With `skip_python_if_simple` such a resource is declared directly from the variables instead.
+        """
+        if self.skip_python:
+            return False
+        if not self.skip_python_if_simple:
+            return True
+        return python_module.custom_hooks_used or bool(self.inputs_json_hcl_extras)
+
+    def validator_path(self, resource_type: str) -> Path:
+        return self.module_out_path / f"{resource_type}_validator.py"
+
     def main_tf_path(self, resource_type: str) -> Path:
         if len(self.resource_types) > 1:
             return self.module_out_path / f"{resource_type}.tf"
@@ -299,6 +323,10 @@ class ResourceTypePythonModule:
     def modify_out_func_used(self) -> bool:
         return self.module is not None and hasattr(self.module, "modify_out")
 
+    @property
+    def custom_hooks_used(self) -> bool:
+        return self.resource_ext_cls_used or self.errors_func_used or self.modify_out_func_used
+
     @property
     def extra_post_init_lines(self) -> list[str]:
         if self.resource_ext is None:
@@ -5,7 +5,7 @@ from ask_shell.settings import clean_dir
 from model_lib import dump
 from zero_3rdparty import humps
 from zero_3rdparty.file_utils import ensure_parents_write_text
-from atlas_init.tf_ext.provider_schema import AtlasSchemaInfo, parse_atlas_schema
+from atlas_init.tf_ext.provider_schema import AtlasSchemaInfo, load_atlas_schema
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,7 @@ def prepare_newres(path: Path):
     if not path.exists():
         path.parent.mkdir(exist_ok=True, parents=True)
         run_and_wait(f"git clone https://github.com/lonegunmanb/newres.git {path.name}", cwd=path.parent)
-    schema = parse_atlas_schema()
+    schema = load_atlas_schema()
     modify_newres(path, schema)
     run_and_wait("go fmt ./...", cwd=path)
 
@@ -62,7 +62,7 @@ func init() {{
 def modify_newres(new_res_path: Path, schema: AtlasSchemaInfo):
     custom_resource_dir = new_res_path / "pkg/custom"
     clean_dir(custom_resource_dir)
-    for resource_type, resource_type_schema in schema.raw_resource_schema.items():
+    for resource_type, resource_type_schema in schema.iter_resource_schemas():
         schema_json = dump(resource_type_schema, format="pretty_json")
         resource_type_go = _template_resource_go(resource_type, schema_json)
         resource_type_file = custom_resource_dir / f"{resource_type}.go"
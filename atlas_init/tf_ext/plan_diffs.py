@@ -1,9 +1,12 @@
+from __future__ import annotations
+
+import difflib
+import hashlib
 from functools import total_ordering
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any
+from typing import Any, Iterable, Literal
 
-from model_lib import Entity, dump, parse_model
+from model_lib import Entity, dump, parse_model, parse_payload
 from pydantic import Field, field_validator
 from zero_3rdparty.file_utils import ensure_parents_write_text
 
@@ -114,27 +117,178 @@ class ExamplePlanCheck(Entity):
     resource_checks: list[ResourceCheck] = Field(default_factory=list)
     example_name: str
     expected_output_dir_name: str
+    html_diff: bool = Field(default=False, description="Also write a side-by-side html diff of the changed resources")
+
+
+def _plan_resources_by_type_name(plan_output: PlanOutput) -> dict[str, PlannedResource]:
+    resources: dict[str, PlannedResource] = {}
+    for planned_resources in plan_output.planned_values.values():
+        for resource in planned_resources:
+            resource_type_name = resource_type_name_filename(resource.type, resource.name)
+            assert resource_type_name not in resources, f"Duplicate name {resource_type_name} in plan output"
+            resources[resource_type_name] = resource
+    return resources
+
+
+def _expected_resource_path(expected_output_path: Path, check: ResourceCheck) -> Path:
+    expected_file = expected_output_path / resource_type_name_filename(
+        check.expected_resource.type, check.expected_resource.name
+    )
+    if not expected_file.exists():
+        raise ValueError(f"Expected file {expected_file} doesn't exist!")
+    return expected_file
+
+
+def _actual_resource(resources: dict[str, PlannedResource], check: ResourceCheck) -> PlannedResource:
+    actual_name = resource_type_name_filename(check.actual.type, check.actual.name)
+    if actual_name not in resources:
+        raise ValueError(f"Actual resource {check.actual.type}.{check.actual.name} doesn't exist in plan!")
+    return resources[actual_name]
 
 
-def generate_expected_actual(
-    stored_plan_outputs: Path, example_check: ExamplePlanCheck, plan_output: PlanOutput
-) -> tuple[str, str]:
+class AttributeChange(Entity):
+    path: str
+    kind: Literal["added", "removed", "changed"]
+    expected: Any = None
+    actual: Any = None
+
+    def __str__(self) -> str:
+        match self.kind:
+            case "added":
+                return f"+ {self.path}: {self.actual!r}"
+            case "removed":
+                return f"- {self.path}: {self.expected!r}"
+        return f"~ {self.path}: {self.expected!r} -> {self.actual!r}"
+
+
+class ResourceDiff(Entity):
+    check: str
+    expected_address: str
+    actual_address: str
+    changes: list[AttributeChange] = Field(default_factory=list)
+    expected_values: Any = Field(default=None, exclude=True)  # only kept for the html diff
+    actual_values: Any = Field(default=None, exclude=True)
+
+
+class PlanDiff(Entity):
+    example_name: str
+    resources: list[ResourceDiff] = Field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return any(resource.changes for resource in self.resources)
+
+    @property
+    def changed_resources(self) -> list[ResourceDiff]:
+        return [resource for resource in self.resources if resource.changes]
+
+    def summary_json(self) -> str:
+        return dump(self.model_copy(update={"resources": self.changed_resources}), "pretty_json")
+
+    def summary_md(self) -> str:
+        changed = self.changed_resources
+        lines = [
+            f"# Plan diff for {self.example_name}",
+            "",
+            f"{len(changed)}/{len(self.resources)} resources differ",
+        ]
+        for resource in changed:
+            lines.extend(["", f"## {resource.check}", "", "```diff"])
+            lines.extend(str(change) for change in resource.changes)
+            lines.append("```")
+        return "\n".join(lines) + "\n"
+
+    def summary_html(self) -> str:
+        """Side-by-side diff of the changed resources, needs the values kept by `diff_plan_output(keep_values=True)`."""
+        expected_lines, actual_lines = [], []
+        for resource in self.changed_resources:
+            expected_lines.extend(["", resource.check, *dump(resource.expected_values, "yaml").splitlines()])
+            actual_lines.extend(["", resource.check, *dump(resource.actual_values, "yaml").splitlines()])
+        return difflib.HtmlDiff().make_file(expected_lines, actual_lines, "expected", "actual")
+
+
+class _SubtreeDigests:
+    """Memoized digests of nested values, equal digests means the subtrees are equal and can be skipped."""
+
+    def __init__(self):
+        self._digests: dict[int, bytes] = {}
+        self._alive: list[Any] = []  # keeps ids stable while the digests are cached
+
+    def digest(self, value: Any) -> bytes:
+        if not isinstance(value, dict | list):
+            return hashlib.blake2b(repr((type(value).__name__, value)).encode(), digest_size=16).digest()
+        if (cached := self._digests.get(id(value))) is not None:
+            return cached
+        hasher = hashlib.blake2b(digest_size=16)
+        if isinstance(value, dict):
+            hasher.update(b"{")
+            for key in sorted(value):
+                hasher.update(key.encode())
+                hasher.update(self.digest(value[key]))
+        else:
+            hasher.update(b"[")
+            for item in value:
+                hasher.update(self.digest(item))
+        digest = hasher.digest()
+        self._digests[id(value)] = digest
+        self._alive.append(value)
+        return digest
+
+
+def _child_path(path: str, key: str | int) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else key
+
+
+def diff_values(
+    expected: Any, actual: Any, path: str = "", digests: _SubtreeDigests | None = None
+) -> Iterable[AttributeChange]:
+    digests = digests or _SubtreeDigests()
+    if digests.digest(expected) == digests.digest(actual):
+        return
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(expected.keys() | actual.keys()):
+            child_path = _child_path(path, key)
+            if key not in actual:
+                yield AttributeChange(path=child_path, kind="removed", expected=expected[key])
+            elif key not in expected:
+                yield AttributeChange(path=child_path, kind="added", actual=actual[key])
+            else:
+                yield from diff_values(expected[key], actual[key], child_path, digests)
+        return
+    if isinstance(expected, list) and isinstance(actual, list):
+        for index in range(max(len(expected), len(actual))):
+            child_path = _child_path(path, index)
+            if index >= len(actual):
+                yield AttributeChange(path=child_path, kind="removed", expected=expected[index])
+            elif index >= len(expected):
+                yield AttributeChange(path=child_path, kind="added", actual=actual[index])
+            else:
+                yield from diff_values(expected[index], actual[index], child_path, digests)
+        return
+    yield AttributeChange(path=path, kind="changed", expected=expected, actual=actual)
+
+
+def diff_plan_output(
+    stored_plan_outputs: Path, example_check: ExamplePlanCheck, plan_output: PlanOutput, *, keep_values: bool = False
+) -> PlanDiff:
+    """`keep_values` stores the resource values of the changed resources, used by `PlanDiff.summary_html`."""
     expected_output_path = stored_plan_outputs / example_check.expected_output_dir_name
     assert expected_output_path.exists(), f"Expected output directory {expected_output_path} does not exist"
-    expected_content, actual_content = [], []
-    with TemporaryDirectory() as temp_dir:
-        out_dir = Path(temp_dir)
-        dump_plan_output_resources(out_dir, plan_output)
-        for check in sorted(example_check.resource_checks):
-            check_header = str(check)
-            expected_file = expected_output_path / resource_type_name_filename(
-                check.expected_resource.type, check.expected_resource.name
-            )
-            actual_file = out_dir / resource_type_name_filename(check.actual.type, check.actual.name)
-            if not expected_file.exists():
-                raise ValueError(f"Expected file {expected_file} doesn't exist!")
-            if not actual_file.exists():
-                raise ValueError(f"Actual file {actual_file} doesn't exist!")
-            expected_content.append(f"\n{check_header}\n{expected_file.read_text()}")
-            actual_content.append(f"\n{check_header}\n{actual_file.read_text()}")
-    return "\n".join(expected_content), "\n".join(actual_content)
+    resources = _plan_resources_by_type_name(plan_output)
+    plan_diff = PlanDiff(example_name=example_check.example_name)
+    for check in sorted(example_check.resource_checks):
+        expected_values = parse_payload(_expected_resource_path(expected_output_path, check)) or {}
+        actual = _actual_resource(resources, check)
+        resource_diff = ResourceDiff(
+            check=str(check),
+            expected_address=f"{check.expected_resource.type}.{check.expected_resource.name}",
+            actual_address=actual.address,
+            changes=list(diff_values(expected_values, actual.values)),
+        )
+        if keep_values and resource_diff.changes:
+            resource_diff.expected_values = expected_values
+            resource_diff.actual_values = actual.values
+        plan_diff.resources.append(resource_diff)
+    return plan_diff
@@ -1,16 +1,20 @@
 from __future__ import annotations
+import hashlib
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from threading import RLock
+from typing import ClassVar, Iterable
 
 from ask_shell import run_and_wait
-from model_lib import Entity, dump, parse_dict
-from pydantic import BaseModel
+from model_lib import Entity, dump, parse_dict, parse_model
+from pydantic import BaseModel, Field, PrivateAttr
 from zero_3rdparty.file_utils import ensure_parents_write_text
 
 from atlas_init.tf_ext.args import TF_CLI_CONFIG_FILE_ENV_NAME
-from atlas_init.tf_ext.constants import ATLAS_PROVIDER_NAME
+from atlas_init.tf_ext.constants import ATLAS_PROVIDER_BINARY_NAME, ATLAS_PROVIDER_NAME
 from atlas_init.tf_ext.models_module import ProviderGenConfig
 from atlas_init.tf_ext.settings import TfExtSettings
 
@@ -69,9 +73,37 @@ def get_providers_tf(skip_python: bool = True, minimal: bool = False) -> str:
 class AtlasSchemaInfo(Entity):
     resource_types: list[str]
     deprecated_resource_types: list[str]
-    raw_resource_schema: dict[str, dict]
+    raw_resource_schema: dict[str, dict] = Field(default_factory=dict)
     providers_tf: str = _providers_tf
 
+    _store_resources_dir: Path | None = PrivateAttr(default=None)
+    _parsed_schemas: dict[str, ResourceSchema] = PrivateAttr(default_factory=dict)
+    _lock: RLock = PrivateAttr(default_factory=RLock)
+
+    def resource_schema(self, resource_type: str) -> dict:
+        """Loads a single resource schema from the store on first access when the schema was read from the store."""
+        with self._lock:
+            if (raw := self.raw_resource_schema.get(resource_type)) is not None:
+                return raw
+            if resource_type not in self.resource_types:
+                raise KeyError(f"resource type {resource_type} not found in schema")
+            assert self._store_resources_dir, "schema has no store, all resources must be in raw_resource_schema"
+            raw = parse_dict(self._store_resources_dir / f"{resource_type}.json")
+            self.raw_resource_schema[resource_type] = raw
+            return raw
+
+    def parsed_resource_schema(self, resource_type: str) -> ResourceSchema:
+        with self._lock:
+            if (parsed := self._parsed_schemas.get(resource_type)) is None:
+                parsed = self._parsed_schemas[resource_type] = parse_model(
+                    self.resource_schema(resource_type), t=ResourceSchema
+                )
+            return parsed
+
+    def iter_resource_schemas(self) -> Iterable[tuple[str, dict]]:
+        for resource_type in self.resource_types:
+            yield resource_type, self.resource_schema(resource_type)
+
 
 class SchemaAttribute(BaseModel):
     type: str | list | dict | None = None
@@ -137,27 +169,105 @@ SchemaBlockType.model_rebuild()
 SchemaBlock.model_rebuild()
 
 
-def parse_atlas_schema_from_settings(settings: TfExtSettings, provider_config: ProviderGenConfig) -> AtlasSchemaInfo:
+class ProviderSchemaIndex(Entity):
+    version_key: str
+    resource_types: list[str]
+    deprecated_resource_types: list[str]
+
+
+class ProviderSchemaStore(Entity):
+    """Provider schemas split per resource type: `{root}/{version_key}/index.json` + `resources/{resource_type}.json`."""
+
+    root: Path
+
+    INDEX_FILENAME: ClassVar[str] = "index.json"
+
+    def version_dir(self, version_key: str) -> Path:
+        return self.root / version_key
+
+    def index_path(self, version_key: str) -> Path:
+        return self.version_dir(version_key) / self.INDEX_FILENAME
+
+    def resources_dir(self, version_key: str) -> Path:
+        return self.version_dir(version_key) / "resources"
+
+    def exists(self, version_key: str) -> bool:
+        return self.index_path(version_key).exists()
+
+    def write(self, version_key: str, schema: AtlasSchemaInfo) -> None:
+        resources_dir = self.resources_dir(version_key)
+        for resource_type, resource_schema in schema.iter_resource_schemas():
+            ensure_parents_write_text(resources_dir / f"{resource_type}.json", dump(resource_schema, "json"))
+        index = ProviderSchemaIndex(
+            version_key=version_key,
+            resource_types=schema.resource_types,
+            deprecated_resource_types=schema.deprecated_resource_types,
+        )
+        # index is written last, a partially written store is never read
+        ensure_parents_write_text(self.index_path(version_key), dump(index, "json"))
+
+    def read(self, version_key: str) -> AtlasSchemaInfo:
+        index = parse_model(self.index_path(version_key), t=ProviderSchemaIndex)
+        schema = AtlasSchemaInfo(
+            resource_types=index.resource_types, deprecated_resource_types=index.deprecated_resource_types
+        )
+        schema._store_resources_dir = self.resources_dir(version_key)
+        return schema
+
+
+_loaded_schemas: dict[tuple[Path, str], AtlasSchemaInfo] = {}
+_loaded_schemas_lock = RLock()
+
+
+def atlas_provider_binary_path(settings: TfExtSettings) -> Path:
     repo_path = settings.repo_path_atlas_provider
     assert repo_path, "repo_path_atlas_provider is required"
-    current_sha = run_and_wait("git rev-parse HEAD", cwd=repo_path).stdout_one_line
-    cache_dir = settings.provider_cache_dir(provider_config.provider_name)
-    if provider_config.last_gen_sha == current_sha:
-        return read_cached_atlas_schema(cache_dir, current_sha, settings.tf_cli_config_file)
-    schema = parse_atlas_schema()
-    provider_config.last_gen_sha = current_sha
-    provider_yaml = dump(provider_config.config_dump(), "yaml")
-    settings.repo_out.provider_settings_path(provider_config.provider_name).write_text(provider_yaml)
-    return schema
+    return repo_path / "bin" / ATLAS_PROVIDER_BINARY_NAME
 
 
-def read_cached_atlas_schema(cache_dir: Path, sha: str, tf_cli_config_file: Path | None = None) -> AtlasSchemaInfo:
-    json_response_path = cache_dir / f"{sha}.json"
-    if not json_response_path.exists():
-        logger.info(f"Cache miss for sha = {sha}, parsing atlas schema")
-        return parse_atlas_schema(store_path=json_response_path, tf_cli_config_file=tf_cli_config_file)
-    parsed_dict = parse_dict(json_response_path)
-    return _parse_dict_schema(parsed_dict)
+@lru_cache
+def _binary_sha256(binary_path: Path, mtime_ns: int, size: int) -> str:
+    with binary_path.open("rb") as binary_file:
+        return hashlib.file_digest(binary_file, "sha256").hexdigest()
+
+
+def atlas_provider_version_key(settings: TfExtSettings) -> str:
+    """Content hash of the dev override provider binary, a rebuild from uncommitted changes gets a new key.
+
+    Without a local build (e.g., a registry provider) the git sha of the provider repo is used.
+    """
+    binary_path = atlas_provider_binary_path(settings)
+    if not binary_path.exists():
+        logger.info(f"provider binary not found: {binary_path}, using the provider repo git sha as version key")
+        return run_and_wait("git rev-parse HEAD", cwd=settings.repo_path_atlas_provider).stdout_one_line
+    stat = binary_path.stat()
+    return _binary_sha256(binary_path, stat.st_mtime_ns, stat.st_size)
+
+
+def load_atlas_schema(settings: TfExtSettings | None = None, version_key: str = "") -> AtlasSchemaInfo:
+    """Shared in-process cache on top of the on-disk ProviderSchemaStore, only the first miss runs terraform."""
+    settings = settings or TfExtSettings.from_env()
+    version_key = version_key or atlas_provider_version_key(settings)
+    store = ProviderSchemaStore(root=settings.provider_cache_dir(ATLAS_PROVIDER_NAME))
+    cache_key = (store.root, version_key)
+    with _loaded_schemas_lock:
+        if cached := _loaded_schemas.get(cache_key):
+            return cached
+        if not store.exists(version_key):
+            logger.info(f"Cache miss for provider schema version = {version_key}, parsing atlas schema")
+            store.write(version_key, parse_atlas_schema(tf_cli_config_file=settings.tf_cli_config_file))
+        schema = _loaded_schemas[cache_key] = store.read(version_key)
+        return schema
+
+
+def parse_atlas_schema_from_settings(settings: TfExtSettings, provider_config: ProviderGenConfig) -> AtlasSchemaInfo:
+    version_key = atlas_provider_version_key(settings)
+    schema = load_atlas_schema(settings, version_key)
+    if provider_config.last_gen_version_key != version_key:
+        provider_config.last_gen_version_key = version_key
+        provider_yaml = dump(provider_config.config_dump(), "yaml")
+        settings.repo_out.provider_settings_path(provider_config.provider_name).write_text(provider_yaml)
+    return schema
 
 
 def parse_atlas_schema(store_path: Path | None = None, tf_cli_config_file: Path | None = None) -> AtlasSchemaInfo:
@@ -1,9 +1,190 @@
-from ask_shell import new_task, run_and_wait
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from threading import Lock, RLock
+from typing import Iterator
+
+from ask_shell import new_task, run_and_wait
+from model_lib import Entity, dump, parse_model
+from pydantic import Field
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.tf_ext.settings import TfExtSettings
+
+logger = logging.getLogger(__name__)
+TF_LOCK_FILE_NAME = ".terraform.lock.hcl"
+TF_DATA_DIR_ENV_NAME = "TF_DATA_DIR"
+TF_PLUGIN_CACHE_DIR_ENV_NAME = "TF_PLUGIN_CACHE_DIR"
+_module_block = re.compile(r'^\s*module\s+"', re.MULTILINE)
+
+
+def workspace_sha(tf_workdir: Path) -> str:
+    """Hash of the lockfile and every `*.tf` file, a changed provider or module source requires a new init."""
+    lock_path = tf_workdir / TF_LOCK_FILE_NAME
+    if not lock_path.exists():
+        return ""
+    sha = hashlib.sha256(lock_path.read_bytes())
+    for tf_path in sorted(tf_workdir.glob("*.tf")):
+        sha.update(tf_path.name.encode())
+        sha.update(tf_path.read_bytes())
+    return sha.hexdigest()
+
+
+def uses_modules(tf_workdir: Path) -> bool:
+    return any(_module_block.search(tf_path.read_text()) for tf_path in tf_workdir.glob("*.tf"))
+
+
+class TfInitRecord(Entity):
+    workspace_sha: str = ""
+    duration_seconds: float
+
+
+class TfInitManifest(Entity):
+    records: dict[str, TfInitRecord] = Field(default_factory=dict)
+
+
+class TfInitReport(Entity):
+    ran: dict[str, float] = Field(default_factory=dict)
+    skipped: dict[str, float] = Field(default_factory=dict)
+
+    @property
+    def init_seconds(self) -> float:
+        return sum(self.ran.values())
+
+    @property
+    def saved_seconds(self) -> float:
+        return sum(self.skipped.values())
+
+    def __str__(self) -> str:
+        return (
+            f"terraform init ran in {len(self.ran)} dirs ({self.init_seconds:.1f}s), "
+            f"skipped {len(self.skipped)} dirs with unchanged config (saved ~{self.saved_seconds:.1f}s)"
+        )
+
+
+@dataclass
+class TfInitCache:
+    """Shares a terraform plugin cache (and optionally a filesystem mirror) across workspaces.
+
+    A workspace is only re-initialized when its `.terraform.lock.hcl` or `*.tf` files changed since the last successful
+    init or when the providers/modules are missing from its data dir.
+    The plugin cache is not safe for concurrent writes, the first init runs alone to fill it before others can start.
+    """
+
+    plugin_cache_dir: Path
+    manifest_path: Path
+    filesystem_mirror_dir: Path | None = None
+    manifest: TfInitManifest = field(init=False)
+    report: TfInitReport = field(init=False, default_factory=TfInitReport)
+    _lock: RLock = field(init=False, default_factory=RLock, repr=False)
+    _first_init_lock: Lock = field(init=False, default_factory=Lock, repr=False)
+    _cache_filled: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self.plugin_cache_dir.mkdir(parents=True, exist_ok=True)
+        if self.manifest_path.exists():
+            self.manifest = parse_model(self.manifest_path, t=TfInitManifest)
+        else:
+            self.manifest = TfInitManifest()
+
+    @classmethod
+    def from_settings(cls, settings: TfExtSettings, filesystem_mirror_dir: Path | None = None) -> TfInitCache:
+        return cls(
+            plugin_cache_dir=settings.tf_plugin_cache_dir,
+            manifest_path=settings.tf_init_manifest_path,
+            filesystem_mirror_dir=filesystem_mirror_dir,
+        )
+
+    @property
+    def env(self) -> dict[str, str]:
+        return {TF_PLUGIN_CACHE_DIR_ENV_NAME: str(self.plugin_cache_dir)}
+
+    @property
+    def init_command(self) -> str:
+        if mirror := self.filesystem_mirror_dir:
+            return f"terraform init -input=false -plugin-dir={mirror}"
+        return "terraform init -input=false"
+
+    def populate_mirror(self, tf_workdir: Path, env_extra: dict[str, str] | None = None) -> None:
+        """Copies the providers required by `tf_workdir` into the filesystem mirror for offline inits."""
+        mirror = self.filesystem_mirror_dir
+        assert mirror, "filesystem_mirror_dir is required to populate the mirror"
+        run_and_wait(f"terraform providers mirror {mirror}", cwd=tf_workdir, env=self._env(env_extra))
+
+    def _env(self, env_extra: dict[str, str] | None) -> dict[str, str]:
+        return self.env | (env_extra or {})
+
+    @staticmethod
+    def _data_dir(tf_workdir: Path, env: dict[str, str]) -> Path:
+        if data_dir := env.get(TF_DATA_DIR_ENV_NAME):
+            return Path(data_dir)
+        return tf_workdir / ".terraform"
+
+    def is_initialized(self, tf_workdir: Path, env_extra: dict[str, str] | None = None) -> bool:
+        env = self._env(env_extra)
+        data_dir = self._data_dir(tf_workdir, env)
+        with self._lock:
+            record = self.manifest.records.get(str(data_dir))
+        if record is None or not (sha := workspace_sha(tf_workdir)) or sha != record.workspace_sha:
+            return False
+        if not (data_dir / "providers").exists():
+            return False
+        return not uses_modules(tf_workdir) or (data_dir / "modules" / "modules.json").exists()
+
+    def init(self, tf_workdir: Path, env_extra: dict[str, str] | None = None, attempts: int = 3) -> bool:
+        """Returns True if `terraform init` was run, False if it was skipped."""
+        env = self._env(env_extra)
+        key = str(self._data_dir(tf_workdir, env))
+        if self.is_initialized(tf_workdir, env_extra):
+            with self._lock:
+                self.report.skipped[key] = self.manifest.records[key].duration_seconds
+            logger.info(f"terraform init skipped for {tf_workdir}, config unchanged")
+            return False
+        with self._first_init_lock:
+            if not self._cache_filled:
+                self._run_init(tf_workdir, key, env, attempts)
+                self._cache_filled = True
+                return True
+        self._run_init(tf_workdir, key, env, attempts)
+        return True
+
+    def _run_init(self, tf_workdir: Path, key: str, env: dict[str, str], attempts: int) -> None:
+        start = time.monotonic()
+        run_and_wait(self.init_command, cwd=tf_workdir, env=env, attempts=attempts)
+        duration = time.monotonic() - start
+        with self._lock:
+            self.manifest.records[key] = TfInitRecord(
+                workspace_sha=workspace_sha(tf_workdir), duration_seconds=duration
+            )
+            self.report.ran[key] = duration
+
+    def store_manifest(self) -> None:
+        with self._lock:
+            ensure_parents_write_text(self.manifest_path, dump(self.manifest, "yaml"))
+
+
+@contextmanager
+def tf_init_cache(settings: TfExtSettings, filesystem_mirror_dir: Path | None = None) -> Iterator[TfInitCache]:
+    cache = TfInitCache.from_settings(settings, filesystem_mirror_dir)
+    try:
+        yield cache
+    finally:
+        cache.store_manifest()
+        logger.info(str(cache.report))
 
 
 def validate_tf_workspace(
-    tf_workdir: Path, *, tf_cli_config_file: Path | None = None, env_extra: dict[str, str] | None = None
+    tf_workdir: Path,
+    *,
+    tf_cli_config_file: Path | None = None,
+    env_extra: dict[str, str] | None = None,
+    init_cache: TfInitCache | None = None,
 ):
     terraform_commands = [
         "terraform init",
@@ -13,8 +194,13 @@ def validate_tf_workspace(
     env_extra = env_extra or {}
     if tf_cli_config_file:
         env_extra["TF_CLI_CONFIG_FILE"] = str(tf_cli_config_file)
+    if init_cache:
+        env_extra = init_cache.env | env_extra
     with new_task("Terraform Module Validate Checks", total=len(terraform_commands)) as task:
         for command in terraform_commands:
-            attempts = 3 if command == "terraform init" else 1  # terraform init can fail due to network issues
-            run_and_wait(command, cwd=tf_workdir, env=env_extra, attempts=attempts)
+            if command == "terraform init" and init_cache:
+                init_cache.init(tf_workdir, env_extra=env_extra)
+            else:
+                attempts = 3 if command == "terraform init" else 1  # terraform init can fail due to network issues
+                run_and_wait(command, cwd=tf_workdir, env=env_extra, attempts=attempts)
             task.update(advance=1)
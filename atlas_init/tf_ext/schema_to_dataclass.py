@@ -1,21 +1,22 @@
 from __future__ import annotations
 
+import ast
+import json
 import keyword
 import logging
 import re
 from collections import defaultdict
-from dataclasses import fields
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Callable, ClassVar, Self
+from typing import Any, Callable, ClassVar, NamedTuple, Self
 
-from ask_shell import ShellError, run_and_wait
 from inflection import singularize
 from model_lib import Entity
 from pydantic import model_validator
 from zero_3rdparty import humps
 from zero_3rdparty.file_utils import copy, update_between_markers
 
+from atlas_init.cli_helper.batch_fmt import format_python_sources, raise_on_errors
 from atlas_init.tf_ext.models_module import (
     ModuleGenConfig,
     ResourceAbs,
@@ -25,12 +26,10 @@ from atlas_init.tf_ext.models_module import (
 from atlas_init.tf_ext.provider_schema import ResourceSchema, SchemaAttribute, SchemaBlock
 from atlas_init.tf_ext.py_gen import (
     as_set,
-    dataclass_matches,
+    dataclass_pattern,
     ensure_dataclass_use_conversion,
-    import_from_path,
     longest_common_substring_among_all,
     make_post_init_line_optional,
-    module_dataclasses,
     move_main_call_to_end,
     primitive_types,
 )
@@ -368,33 +367,275 @@ if __name__ == "__main__":
     )
 
 
+class ValidatorField(NamedTuple):
+    name: str
+    nested_cls: str
+    container: str
+    """`list` for list and set fields, `map` for dict fields and empty for a single value."""
+    required: bool
+
+
+def _subscript_name(annotation: ast.expr) -> str:
+    if isinstance(annotation, ast.Subscript) and isinstance(annotation.value, ast.Name):
+        return annotation.value.id
+    return ""
+
+
+def _field_container_and_type(annotation: ast.expr) -> tuple[str, ast.expr]:
+    if _subscript_name(annotation) == "Optional":
+        annotation = annotation.slice  # type: ignore[attr-defined]
+    match _subscript_name(annotation):
+        case "List" | "Set":
+            return "list", annotation.slice  # type: ignore[attr-defined]
+        case "Dict":
+            slice_ = annotation.slice  # type: ignore[attr-defined]
+            return "map", slice_.elts[-1] if isinstance(slice_, ast.Tuple) else slice_
+    return "", annotation
+
+
+def _has_default(value: ast.expr | None) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == "field":
+        return any(kw.arg in ("default", "default_factory") for kw in value.keywords)
+    return True
+
+
+def validator_field_table(py_code: str) -> dict[str, list[ValidatorField]]:
+    """Reads the fields of the top-level dataclasses without importing the code, fields of dataclass bases are included."""
+    class_nodes = [
+        node
+        for node in ast.parse(py_code).body
+        if isinstance(node, ast.ClassDef) and any(map(_is_dataclass_decorator, node.decorator_list))
+    ]
+    class_names = {node.name for node in class_nodes}
+    table: dict[str, list[ValidatorField]] = {}
+    for node in class_nodes:
+        fields = [
+            base_field
+            for base in node.bases
+            if isinstance(base, ast.Name) and base.id in table
+            for base_field in table[base.id]
+        ]
+        for stmt in node.body:
+            if not isinstance(stmt, ast.AnnAssign) or not isinstance(stmt.target, ast.Name):
+                continue
+            if _is_class_var(stmt.annotation):
+                continue
+            container, elem_type = _field_container_and_type(stmt.annotation)
+            nested_cls = elem_type.id if isinstance(elem_type, ast.Name) and elem_type.id in class_names else ""
+            fields = [existing for existing in fields if existing.name != stmt.target.id]
+            fields.append(
+                ValidatorField(
+                    name=stmt.target.id,
+                    nested_cls=nested_cls,
+                    container=container if nested_cls else "",
+                    required=not _has_default(stmt.value),
+                )
+            )
+        table[node.name] = fields
+    return table
+
+
+def use_fast_validator(module: ResourceTypePythonModule, config: ModuleGenConfig) -> bool:
+    """The fast validator skips the dataclasses, so the custom hooks of an existing module can't be called."""
+    return config.fast_validator and config.uses_python(module) and not module.custom_hooks_used
+
+
+_fast_validator_functions = """
+FIELD_NAMES = {cls_name: {field[0] for field in fields} for cls_name, fields in FIELDS.items()}
+PRIMITIVE_TYPES = (str, float, bool, int)
+
+
+def format_primitive(value):
+    if value is None:
+        return None
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+
+def convert(cls_name, value, path, errors):
+    \"\"\"Same output as `asdict(Cls(**value))`: the attributes are ordered and missing ones are set to None.\"\"\"
+    if not isinstance(value, dict):
+        errors.append(f"{path or cls_name}: expected an object, got {type(value).__name__}")
+        return value
+    if unexpected := sorted(value.keys() - FIELD_NAMES[cls_name]):
+        errors.append(f"{path or cls_name}: unexpected attributes {', '.join(unexpected)}")
+    converted = {}
+    for name, nested_cls, container, required in FIELDS[cls_name]:
+        field_path = f"{path}.{name}" if path else name
+        if required and name not in value:
+            errors.append(f"{field_path}: missing required attribute")
+        field_value = value.get(name)
+        if field_value is not None and nested_cls:
+            if container == "list" and isinstance(field_value, list):
+                field_value = [
+                    convert(nested_cls, item, f"{field_path}[{i}]", errors) for i, item in enumerate(field_value)
+                ]
+            elif container == "map" and isinstance(field_value, dict):
+                field_value = {
+                    key: convert(nested_cls, item, f"{field_path}.{key}", errors) for key, item in field_value.items()
+                }
+            elif container:
+                errors.append(f"{field_path}: expected a {container}, got {type(field_value).__name__}")
+            else:
+                field_value = convert(nested_cls, field_value, field_path, errors)
+        converted[name] = field_value
+    return converted
+
+
+def resource_output(input_data):
+    errors = []
+    resource = convert("Resource", input_data, "", errors)
+    if not isinstance(resource, dict):
+        return {"error_message": "\\n".join(errors)}
+    output = {
+        key: format_primitive(value) if value is None or isinstance(value, PRIMITIVE_TYPES) else json.dumps(value)
+        for key, value in resource.items()
+    }
+    output["error_message"] = "\\n".join(errors)
+    return output
+
+
+def main():
+    params = json.loads(sys.stdin.read())
+    if "inputs_json" in params:
+        instances = json.loads(params["inputs_json"])
+        output = {key: json.dumps(resource_output(value)) for key, value in instances.items()}
+    else:
+        output = resource_output(json.loads(params["input_json"]))
+    json_str = json.dumps(output)"""
+
+
+def _fields_literal(table: dict[str, list[ValidatorField]]) -> str:
+    lines = ["FIELDS = {"]
+    for cls_name, fields in table.items():
+        if not fields:
+            lines.append(f"    {json.dumps(cls_name)}: (),")
+            continue
+        lines.append(f"    {json.dumps(cls_name)}: (")
+        lines.extend(
+            f"        ({json.dumps(f.name)}, {json.dumps(f.nested_cls)}, {json.dumps(f.container)}, {f.required}),"
+            for f in fields
+        )
+        lines.append("    ),")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def fast_validator_code(resource_type: str, py_code: str, config: ModuleGenConfig) -> str:
+    """A `data "external"` program with the same output as `main_entrypoint` that only imports `json` and `sys`.
+
+    The dataclasses are replaced by a precomputed field table, validation errors are returned in `error_message`.
+    Besides `input_json`, the program accepts `inputs_json`: a map of instance keys to inputs validated in one call,
+    the result maps each key to the json encoded output of that instance.
+    """
+    table = validator_field_table(py_code)
+    assert "Resource" in table, f"no Resource dataclass found for {resource_type}"
+    logs_debug = _debug_logs if config.debug_json_logs else ""
+    return f"""\"\"\"Generated validator for {resource_type}, only imports the standard library to start fast.\"\"\"
+
+import json
+import sys
+
+# class name -> ((field name, nested class, container, required), ...)
+{_fields_literal(table)}
+{_fast_validator_functions}{logs_debug}
+    print(json_str)
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+
 def py_file_validate_and_auto_fixes(code: str, error_hint: str = "") -> str:
-    with TemporaryDirectory() as tmp_dir:
-        tmp_file = Path(tmp_dir) / "dataclass.py"
-        tmp_file.write_text(code)
-        run_fmt_and_fixes(tmp_file)
-        return tmp_file.read_text()
+    name = error_hint or "dataclass"
+    return raise_on_errors(format_python_sources({name: code}))[name]
 
 
-def run_fmt_and_fixes(file_path: Path, error_hint: str = ""):
-    tmp_dir = file_path.parent
-    try:
-        run_and_wait("ruff format . --line-length 120", cwd=tmp_dir)
-    except ShellError as e:
-        logger.exception(f"Failed to format dataclass:\n{file_path.read_text()}\n{error_hint}")
-        raise e
+class DataclassDef(NamedTuple):
+    name: str
+    field_names: list[str]
+    required: set[str]
+    computed_only: set[str]
+    index_start: int
+    """Offset of the `@dataclass` line, -1 when the definition doesn't match `dataclass_pattern`."""
+
+
+def _is_dataclass_decorator(node: ast.expr) -> bool:
+    if isinstance(node, ast.Call):
+        node = node.func
+    return (isinstance(node, ast.Name) and node.id == "dataclass") or (
+        isinstance(node, ast.Attribute) and node.attr == "dataclass"
+    )
+
+
+def _is_class_var(annotation: ast.expr) -> bool:
+    if isinstance(annotation, ast.Subscript):
+        annotation = annotation.value
+    return (isinstance(annotation, ast.Name) and annotation.id == "ClassVar") or (
+        isinstance(annotation, ast.Attribute) and annotation.attr == "ClassVar"
+    )
+
+
+def _literal_names(node: ast.expr | None) -> set[str] | None:
+    if node is None:
+        return None
     try:
-        run_and_wait("ruff check --fix .", cwd=tmp_dir)
-    except ShellError as e:
-        logger.exception(f"Failed to check dataclass:\n{file_path.read_text()}\n{error_hint}")
-        raise e
-    return file_path.read_text()
+        value = ast.literal_eval(node)
+    except ValueError:
+        return None
+    return set(value) if isinstance(value, (set, frozenset, list, tuple)) else None
+
+
+def module_dataclass_defs(py_code: str) -> dict[str, DataclassDef]:
+    """Reads the top-level dataclasses without importing the code, fields of dataclass bases in the module are included."""
+    line_starts = [0]
+    for line in py_code.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+    defs: dict[str, DataclassDef] = {}
+    for node in ast.parse(py_code).body:
+        if not isinstance(node, ast.ClassDef) or not any(map(_is_dataclass_decorator, node.decorator_list)):
+            continue
+        field_names: list[str] = []
+        class_sets: dict[str, set[str]] = {}
+        for base in node.bases:
+            if isinstance(base, ast.Name) and (base_def := defs.get(base.id)):
+                field_names.extend(base_def.field_names)
+                class_sets[ResourceAbs.REQUIRED_ATTRIBUTES_NAME] = base_def.required
+                class_sets[ResourceAbs.COMPUTED_ONLY_ATTRIBUTES_NAME] = base_def.computed_only
+        for stmt in node.body:
+            match stmt:
+                case ast.AnnAssign(target=ast.Name(id=name), annotation=annotation, value=value):
+                    if not _is_class_var(annotation):
+                        if name not in field_names:
+                            field_names.append(name)
+                        continue
+                case ast.Assign(targets=[ast.Name(id=name)], value=value):
+                    pass
+                case _:
+                    continue
+            if (names := _literal_names(value)) is not None:
+                class_sets[name] = names
+        start = line_starts[node.decorator_list[0].lineno - 1]
+        defs[node.name] = DataclassDef(
+            name=node.name,
+            field_names=field_names,
+            required=class_sets.get(ResourceAbs.REQUIRED_ATTRIBUTES_NAME, set()),
+            computed_only=class_sets.get(ResourceAbs.COMPUTED_ONLY_ATTRIBUTES_NAME, set()),
+            index_start=start if dataclass_pattern(node.name).match(py_code, start) else -1,
+        )
+    return defs
 
 
-def dataclass_id(cls: type) -> str:
-    field_names = ",".join(sorted(f.name for f in fields(cls)))
-    computed_only_names = ",".join(sorted(f.name for f in fields(cls) if ResourceAbs.is_computed_only(f.name, cls)))
-    required_only_names = ",".join(sorted(f.name for f in fields(cls) if ResourceAbs.is_required(f.name, cls)))
+def dataclass_id(dc: DataclassDef) -> str:
+    field_names = ",".join(sorted(dc.field_names))
+    computed_only_names = ",".join(sorted(name for name in dc.field_names if name in dc.computed_only))
+    required_only_names = ",".join(sorted(name for name in dc.field_names if name in dc.required))
     id_parts = [field_names]
     if computed_only_names:
         id_parts.append(f"computed={computed_only_names}")
@@ -409,41 +650,56 @@ class NameAlreadyTakenError(Exception):
 
 
 def simplify_classes(py_code: str) -> tuple[str, set[str]]:
-    with TemporaryDirectory() as tmp_dir:
-        tmp_file = Path(tmp_dir) / "dataclass.py"
-        tmp_file.write_text(py_code)
-        module = import_from_path("dataclass", tmp_file)
-        dataclasses = module_dataclasses(module)
-        fields_to_dataclass = defaultdict(list)
-        for name, dc in dataclasses.items():
-            fields_to_dataclass[dataclass_id(dc)].append(name)
-        new_names: set[str] = set()
-
-        def add_new_name(new_name: str) -> None:
-            if new_name in new_names or new_name in dataclasses:
-                raise NameAlreadyTakenError(f"Duplicate new name: {new_name}")
-            new_names.add(new_name)
-
-        if duplicate_classes := {k: v for k, v in fields_to_dataclass.items() if len(v) > 1}:
-            for duplicates in duplicate_classes.values():
-                py_code, new_name = rename_and_remove_duplicates(duplicates, py_code, add_new_name)
-        for old_classes in fields_to_dataclass.values():
-            if len(old_classes) != 1:
-                continue
-            cls_name = old_classes[0]
-            if "_" not in cls_name:
-                continue
-            new_name = extract_last_name_part(cls_name)
-            py_code = _safe_replace(py_code, cls_name, new_name)
-            add_new_name(new_name)
-        return py_code, new_names
+    """Merges dataclasses with the same fields and shortens the nested class names.
+
+    The classes are analyzed statically, all renames are applied in a single pass after the duplicates are removed.
+    """
+    dataclasses = module_dataclass_defs(py_code)
+    fields_to_dataclass = defaultdict(list)
+    for name, dc in dataclasses.items():
+        fields_to_dataclass[dataclass_id(dc)].append(name)
+    new_names: set[str] = set()
+
+    def add_new_name(new_name: str) -> None:
+        if new_name in new_names or new_name in dataclasses:
+            raise NameAlreadyTakenError(f"Duplicate new name: {new_name}")
+        new_names.add(new_name)
+
+    renames: dict[str, str] = {}
+    removed_spans: list[tuple[int, int]] = []
+    for duplicates in fields_to_dataclass.values():
+        if len(duplicates) == 1:
+            continue
+        new_name = duplicates_new_name(duplicates, add_new_name)
+        renames |= dict.fromkeys(duplicates, new_name)
+        removed_spans.extend(duplicate_spans(py_code, [dataclasses[name] for name in duplicates]))
+    for old_classes in fields_to_dataclass.values():
+        if len(old_classes) != 1:
+            continue
+        cls_name = old_classes[0]
+        if "_" not in cls_name:
+            continue
+        new_name = extract_last_name_part(cls_name)
+        renames[cls_name] = new_name
+        add_new_name(new_name)
+    return _rename_all(_remove_spans(py_code, removed_spans), renames), new_names
+
 
+def _rename_all(text: str, renames: dict[str, str]) -> str:
+    if not renames:
+        return text
+    names = "|".join(sorted(renames, key=len, reverse=True))
+    return re.sub(rf"(?<=\W)(?:{names})(?=\W)", lambda match: renames[match[0]], text)
 
-def _safe_replace(text: str, old: str, new: str) -> str:
-    def replacer(match: re.Match) -> str:
-        return match[0].replace(old, new)
 
-    return re.sub(rf"\W({old})\W", replacer, text)
+def _remove_spans(text: str, spans: list[tuple[int, int]]) -> str:
+    parts = []
+    last_end = 0
+    for start, end in sorted(spans):
+        parts.append(text[last_end:start])
+        last_end = end
+    parts.append(text[last_end:])
+    return "".join(parts)
 
 
 _plural_exception_list = {"Aws"}
@@ -465,9 +721,7 @@ def extract_last_name_part(full_name: str) -> str:
     return _cls_exception_mapping.get(name, name)
 
 
-def rename_and_remove_duplicates(
-    duplicates: list[str], py_code: str, add_new_name: Callable[[str], None]
-) -> tuple[str, str]:
+def duplicates_new_name(duplicates: list[str], add_new_name: Callable[[str], None]) -> str:
     duplicates_short = [extract_last_name_part(d) for d in duplicates]
     new_name = longest_common_substring_among_all(duplicates_short)
     try:
@@ -475,19 +729,19 @@ def rename_and_remove_duplicates(
     except NameAlreadyTakenError:
         new_name += "2"
         add_new_name(new_name)
-    for replace in duplicates:
-        py_code = _safe_replace(py_code, replace, new_name)
-    py_code = remove_duplicates(py_code, new_name)
-    return py_code, new_name
+    return new_name
 
 
-def remove_duplicates(py_code: str, new_name) -> str:
-    matches = list(dataclass_matches(py_code, new_name))
-    logger.info(f"found {len(matches)} matches for {new_name}")
-    while len(matches) > 1:
-        next_match = matches.pop()
-        py_code = py_code[: next_match.index_start] + py_code[next_match.index_end :]
-    return py_code
+def duplicate_spans(py_code: str, duplicates: list[DataclassDef]) -> list[tuple[int, int]]:
+    """Spans of the duplicate definitions to remove, the first definition in the code is kept."""
+    starts = sorted(dc.index_start for dc in duplicates if dc.index_start >= 0)
+    logger.info(f"found {len(starts)} matches for {', '.join(dc.name for dc in duplicates)}")
+    spans = []
+    for start in starts[1:]:
+        end = py_code.find("\n\n\n", start)
+        assert end > 0, f"unable to find end of dataclass at {start}"
+        spans.append((start, end + 3))
+    return spans
 
 
 SKIP_FILTER = {"Resource", "ResourceExt"}
@@ -501,7 +755,7 @@ def generate_python_from_schema(
     return f"{dataclass_unformatted}\n{main_entrypoint(py_module, config)}"
 
 
-def convert_and_format(
+def convert_unformatted(
     resource_type: str,
     schema: ResourceSchema,
     config: ModuleGenConfig,
@@ -516,7 +770,31 @@ def convert_and_format(
             update_between_markers(tmp_file, dataclass_unformatted, MARKER_START, MARKER_END)
             move_main_call_to_end(tmp_file)
             ensure_dataclass_use_conversion(py_module.dataclasses, tmp_file, SKIP_FILTER)
-            return run_fmt_and_fixes(tmp_file)
+            return tmp_file.read_text()
     existing = ResourceTypePythonModule(resource_type)
     dataclass_unformatted = generate_python_from_schema(existing, schema, config, resource_type)
-    return py_file_validate_and_auto_fixes(f"{MARKER_START}\n{dataclass_unformatted}\n{MARKER_END}\n")
+    return f"{MARKER_START}\n{dataclass_unformatted}\n{MARKER_END}\n"
+
+
+def convert_and_format(
+    resource_type: str,
+    schema: ResourceSchema,
+    config: ModuleGenConfig,
+    existing_path: Path | None = None,
+) -> str:
+    unformatted = convert_unformatted(resource_type, schema, config, existing_path)
+    return py_file_validate_and_auto_fixes(unformatted, error_hint=resource_type)
+
+
+def convert_and_format_all(
+    schemas: dict[str, ResourceSchema],
+    config: ModuleGenConfig,
+    existing_paths: dict[str, Path] | None = None,
+) -> dict[str, str]:
+    """Same as `convert_and_format` for each resource type, but runs the formatters once for all of them."""
+    existing_paths = existing_paths or {}
+    unformatted = {
+        resource_type: convert_unformatted(resource_type, schema, config, existing_paths.get(resource_type))
+        for resource_type, schema in schemas.items()
+    }
+    return raise_on_errors(format_python_sources(unformatted))
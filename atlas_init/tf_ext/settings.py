@@ -175,6 +175,14 @@ class TfExtSettings(StaticSettings):
     def provider_cache_dir(self, provider_name: str) -> Path:
         return self.cache_root / "provider_cache" / provider_name
 
+    @property
+    def tf_plugin_cache_dir(self) -> Path:
+        return self.cache_root / "tf_plugin_cache"
+
+    @property
+    def tf_init_manifest_path(self) -> Path:
+        return self.cache_root / "tf_init_manifest.yaml"
+
     @property
     def variable_plan_resolvers_file_path(self) -> Path:
         return self.static_root / "variable_plan_resolvers.yaml"
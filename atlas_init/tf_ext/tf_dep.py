@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from functools import total_ordering
+import heapq
 import logging
+from functools import total_ordering
 from collections import defaultdict
 from pathlib import Path
 from threading import RLock
@@ -12,7 +13,7 @@ from ask_shell import ShellError, new_task, run_and_wait
 from ask_shell._run import stop_runs_and_pool
 from ask_shell.run_pool import run_pool
 from model_lib import Entity, dump
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
 from typer import Typer
 from zero_3rdparty.file_utils import ensure_parents_write_text
@@ -22,6 +23,7 @@ from atlas_init.settings.rich_utils import configure_logging
 from atlas_init.tf_ext.args import REPO_PATH_ATLAS_ARG, SKIP_EXAMPLES_DIRS_OPTION
 from atlas_init.tf_ext.constants import ATLAS_PROVIDER_NAME
 from atlas_init.tf_ext.paths import find_variable_resource_type_usages, find_variables, get_example_directories
+from atlas_init.tf_ext.run_tf import TF_LOCK_FILE_NAME, TfInitCache, tf_init_cache
 from atlas_init.tf_ext.settings import TfExtSettings
 
 logger = logging.getLogger(__name__)
@@ -58,22 +60,22 @@ def tf_dep_graph(
     logger.info(f"Using output directory: {output_dir}")
     example_dirs = get_example_directories(repo_path, skip_names)
     logger.info(f"example_dirs: \n{'\n'.join(str(d) for d in sorted(example_dirs))}")
-    with new_task("Find terraform graphs", total=len(example_dirs)) as task:
-        atlas_graph = create_atlas_graph(example_dirs, task)
+    with tf_init_cache(settings) as init_cache, new_task("Find terraform graphs", total=len(example_dirs)) as task:
+        atlas_graph = create_atlas_graph(example_dirs, task, init_cache)
     with new_task("Dump graph"):
         graph_yaml = atlas_graph.dump_yaml()
         ensure_parents_write_text(settings.atlas_graph_path, graph_yaml)
         logger.info(f"Atlas graph dumped to {settings.atlas_graph_path}")
 
 
-def create_atlas_graph(example_dirs: list[Path], task: new_task) -> AtlasGraph:
+def create_atlas_graph(example_dirs: list[Path], task: new_task, init_cache: TfInitCache | None = None) -> AtlasGraph:
     atlas_graph = AtlasGraph()
 
     def on_graph(example_dir: Path, graph: pydot.Dot):
         atlas_graph.add_edges(graph.get_edges())
         atlas_graph.add_variable_edges(example_dir)
 
-    parse_graphs(on_graph, example_dirs, task)
+    parse_graphs(on_graph, example_dirs, task, init_cache=init_cache)
 
     return atlas_graph
 
@@ -215,21 +217,120 @@ def skip_variable_edge(src: str, dst: str) -> bool:
     return False
 
 
+class GraphCycleError(ValueError):
+    def __init__(self, nodes: list[str]):
+        self.nodes = nodes
+        super().__init__(f"graph has a cycle between: {', '.join(nodes)}")
+
+
 class AtlasGraph(Entity):
+    """Dependency graph of the atlas resource types.
+
+    Only the edges are serialized, the reverse index, node sets, closures and the topological order are derived lazily.
+    Add edges with `add_internal_edge`/`add_external_parent` to keep the derived indexes in sync.
+    """
+
     # atlas_resource_type -> set[atlas_resource_type]
     parent_child_edges: dict[str, set[str]] = Field(default_factory=lambda: defaultdict(set))
     # atlas_resource_type -> set[external_resource_type]
     external_parents: dict[str, set[str]] = Field(default_factory=lambda: defaultdict(set))
     deprecated_resource_types: set[str] = Field(default_factory=set)
 
+    _child_parents: dict[str, set[str]] | None = PrivateAttr(default=None)
+    _internal_nodes: set[str] | None = PrivateAttr(default=None)
+    _external_nodes: set[str] | None = PrivateAttr(default=None)
+    _descendants: dict[str, frozenset[str]] = PrivateAttr(default_factory=dict)
+    _ancestors: dict[str, frozenset[str]] = PrivateAttr(default_factory=dict)
+    _topological_order: list[str] | None = PrivateAttr(default=None)
+
+    def _clear_derived(self) -> None:
+        self._internal_nodes = None
+        self._external_nodes = None
+        self._descendants.clear()
+        self._ancestors.clear()
+        self._topological_order = None
+
+    def add_internal_edge(self, parent: str, child: str) -> None:
+        children = self.parent_child_edges.setdefault(parent, set())
+        if child in children:
+            return
+        children.add(child)
+        if self._child_parents is not None:
+            self._child_parents.setdefault(child, set()).add(parent)
+        self._clear_derived()
+
+    def add_external_parent(self, child: str, parent: str) -> None:
+        parents = self.external_parents.setdefault(child, set())
+        if parent in parents:
+            return
+        parents.add(parent)
+        self._external_nodes = None
+
+    @property
+    def child_parents(self) -> dict[str, set[str]]:
+        """Reverse index of `parent_child_edges`, built on first use."""
+        if self._child_parents is None:
+            child_parents: dict[str, set[str]] = defaultdict(set)
+            for parent, child in self.iterate_internal_edges():
+                child_parents[child].add(parent)
+            self._child_parents = dict(child_parents)
+        return self._child_parents
+
+    def children(self, parent: str) -> set[str]:
+        return self.parent_child_edges.get(parent, set())
+
+    def parents(self, child: str) -> set[str]:
+        return self.child_parents.get(child, set())
+
     def all_parents(self, child: str) -> Iterable[str]:
-        for parent, children in self.parent_child_edges.items():
-            if child in children:
-                yield parent
+        return self.parents(child)
+
+    def _reachable(self, node: str, neighbors: Callable[[str], set[str]]) -> frozenset[str]:
+        seen: set[str] = set()
+        stack = list(neighbors(node))
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(neighbors(current) - seen)
+        return frozenset(seen)
+
+    def descendants(self, node: str) -> frozenset[str]:
+        if (cached := self._descendants.get(node)) is None:
+            cached = self._descendants[node] = self._reachable(node, self.children)
+        return cached
+
+    def ancestors(self, node: str) -> frozenset[str]:
+        if (cached := self._ancestors.get(node)) is None:
+            cached = self._ancestors[node] = self._reachable(node, self.parents)
+        return cached
+
+    def topological_order(self) -> list[str]:
+        """Parents before children, ties are broken by name so the order is stable between runs."""
+        if self._topological_order is not None:
+            return self._topological_order
+        in_degree = {node: len(self.parents(node)) for node in self.all_internal_nodes}
+        ready = [node for node, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        order: list[str] = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(node)
+            for child in self.children(node):
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    heapq.heappush(ready, child)
+        if len(order) != len(in_degree):
+            raise GraphCycleError(sorted(node for node, degree in in_degree.items() if degree > 0))
+        self._topological_order = order
+        return order
 
     def dump_yaml(self) -> str:
-        parent_child_edges = {name: sorted(children) for name, children in sorted(self.parent_child_edges.items())}
-        external_parents = {name: sorted(parents) for name, parents in sorted(self.external_parents.items())}
+        parent_child_edges = {
+            name: sorted(children) for name, children in sorted(self.parent_child_edges.items()) if children
+        }
+        external_parents = {name: sorted(parents) for name, parents in sorted(self.external_parents.items()) if parents}
         return dump(
             {
                 "parent_child_edges": parent_child_edges,
@@ -240,7 +341,9 @@ class AtlasGraph(Entity):
 
     @property
     def all_internal_nodes(self) -> set[str]:
-        return set(flat_map([src] + list(dsts) for src, dsts in self.parent_child_edges.items()))
+        if self._internal_nodes is None:
+            self._internal_nodes = set(flat_map([src] + list(dsts) for src, dsts in self.parent_child_edges.items()))
+        return self._internal_nodes
 
     def iterate_internal_edges(self) -> Iterable[tuple[str, str]]:
         for parent, children in self.parent_child_edges.items():
@@ -249,7 +352,9 @@ class AtlasGraph(Entity):
 
     @property
     def all_external_nodes(self) -> set[str]:
-        return set(flat_map([src] + list(dsts) for src, dsts in self.external_parents.items()))
+        if self._external_nodes is None:
+            self._external_nodes = set(flat_map([src] + list(dsts) for src, dsts in self.external_parents.items()))
+        return self._external_nodes
 
     def iterate_external_edges(self) -> Iterable[tuple[str, str]]:
         for child, parents in self.external_parents.items():
@@ -262,12 +367,12 @@ class AtlasGraph(Entity):
             parent = parsed.parent
             child = parsed.child
             if parsed.is_internal_atlas_edge:
-                self.parent_child_edges[parent.resource_type].add(child.resource_type)
+                self.add_internal_edge(parent.resource_type, child.resource_type)
                 # edges shows from child --> parent, so we reverse the order
             elif parsed.is_external_to_internal_edge:
                 if parent.provider_name in {"random", "cedar"}:
                     continue  # skip random provider edges
-                self.external_parents[child.resource_type].add(parent.resource_type)
+                self.add_external_parent(child.resource_type, parent.resource_type)
 
     def add_variable_edges(self, example_dir: Path) -> None:
         """Use the variables to find the resource dependencies."""
@@ -281,15 +386,19 @@ class AtlasGraph(Entity):
                         continue
                     if child_type.startswith(ATLAS_PROVIDER_NAME):
                         logger.info(f"Adding variable edge: {parent_type} -> {child_type}")
-                        self.parent_child_edges[parent_type].add(child_type)
+                        self.add_internal_edge(parent_type, child_type)
 
 
 def parse_graphs(
-    on_graph: Callable[[Path, pydot.Dot], None], example_dirs: list[Path], task: new_task, max_dirs: int = 1_000
+    on_graph: Callable[[Path, pydot.Dot], None],
+    example_dirs: list[Path],
+    task: new_task,
+    max_dirs: int = 1_000,
+    init_cache: TfInitCache | None = None,
 ) -> None:
     with run_pool("parse example graphs", total=len(example_dirs)) as executor:
         futures = {
-            executor.submit(parse_graph, example_dir): example_dir
+            executor.submit(parse_graph, example_dir, init_cache): example_dir
             for i, example_dir in enumerate(example_dirs)
             if i < max_dirs
         }
@@ -346,13 +455,16 @@ class EmptyGraphOutputError(Exception):
     retry=retry_if_exception_type((EmptyGraphOutputError, GraphParseError)),
     reraise=True,
 )
-def parse_graph(example_dir: Path) -> tuple[Path, pydot.Dot]:
+def parse_graph(example_dir: Path, init_cache: TfInitCache | None = None) -> tuple[Path, pydot.Dot]:
     env_vars = {
         "MONGODB_ATLAS_PREVIEW_PROVIDER_V2_ADVANCED_CLUSTER": "true" if is_v2_example_dir(example_dir) else "false",
     }
-    lock_file = example_dir / ".terraform.lock.hcl"
-    if not lock_file.exists():
-        run_and_wait("terraform init", cwd=example_dir, env=env_vars)
+    if not (example_dir / TF_LOCK_FILE_NAME).exists():
+        if init_cache:
+            env_vars |= init_cache.env
+            init_cache.init(example_dir, env_extra=env_vars)
+        else:
+            run_and_wait("terraform init", cwd=example_dir, env=env_vars)
     run = run_and_wait("terraform graph", cwd=example_dir, env=env_vars)
     if graph_output := run.stdout_one_line:
         graph = parse_graph_output(example_dir, graph_output)  # just to make sure we get no errors
@@ -2,8 +2,8 @@ import logging
 from collections import defaultdict
 from atlas_init.tf_ext.args import TF_CLI_CONFIG_FILE_ARG
 from atlas_init.tf_ext.settings import TfExtSettings
-from atlas_init.tf_ext.provider_schema import ResourceSchema, parse_atlas_schema
-from model_lib import dump, parse_model
+from atlas_init.tf_ext.provider_schema import load_atlas_schema
+from model_lib import dump
 from zero_3rdparty.file_utils import ensure_parents_write_text
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ def tf_desc_gen(
     out_path = settings.attribute_description_file_path
     resource_out_path = settings.attribute_resource_descriptions_file_path
     assert tf_cli_config_file
-    schema = parse_atlas_schema()
+    schema = load_atlas_schema(settings)
     descriptions = {}
     descriptions_by_resource: dict[str, dict[str, str]] = defaultdict(dict)
     attr_desc_resource = {}
@@ -36,9 +36,8 @@ def tf_desc_gen(
         descriptions[attr_name] = description
         attr_desc_resource[attr_name] = resource_type
 
-    for resource_type, resource_schema in schema.raw_resource_schema.items():
-        parsed_schema = parse_model(resource_schema, t=ResourceSchema)
-        schema_block = parsed_schema.block
+    for resource_type in schema.resource_types:
+        schema_block = schema.parsed_resource_schema(resource_type).block
         for name, attribute in (schema_block.attributes or {}).items():
             add_description(resource_type, name, attribute.description)
         for name, block_type in (schema_block.block_types or {}).items():
@@ -1,11 +1,10 @@
-import difflib
 import logging
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 import typer
 from ask_shell import new_task, run_and_wait, run_pool, text
-from model_lib import parse_model, parse_payload
+from model_lib import parse_payload
 from pydantic import DirectoryPath, TypeAdapter
 from zero_3rdparty.file_utils import clean_dir, copy, ensure_parents_write_text
 
@@ -27,13 +26,19 @@ from atlas_init.tf_ext.models_module import (
 from atlas_init.tf_ext.newres import prepare_newres
 from atlas_init.tf_ext.plan_diffs import (
     ExamplePlanCheck,
-    generate_expected_actual,
+    PlanDiff,
+    diff_plan_output,
     parse_plan_output,
     read_variables_path,
 )
-from atlas_init.tf_ext.provider_schema import AtlasSchemaInfo, ResourceSchema, parse_atlas_schema
-from atlas_init.tf_ext.run_tf import validate_tf_workspace
-from atlas_init.tf_ext.schema_to_dataclass import convert_and_format
+from atlas_init.tf_ext.provider_schema import AtlasSchemaInfo, load_atlas_schema
+from atlas_init.tf_ext.run_tf import TfInitCache, tf_init_cache, validate_tf_workspace
+from atlas_init.tf_ext.schema_to_dataclass import (
+    convert_and_format,
+    convert_and_format_all,
+    fast_validator_code,
+    use_fast_validator,
+)
 from atlas_init.tf_ext.settings import TfExtSettings
 
 logger = logging.getLogger(__name__)
@@ -89,27 +94,44 @@ def prepare_out_dir(config: ModuleGenConfig, *, skip_clean_dir: bool = False):
 
 def generate_module(config: ModuleGenConfig) -> Path:
     with new_task("Reading Atlas Schema"):
-        schema = parse_atlas_schema()
+        schema = load_atlas_schema(config.settings)
         assert schema
     resource_types = config.resource_types
+    with new_task(f"Generating and formatting dataclasses for {len(resource_types)} resource types"):
+        dataclass_codes = convert_and_format_all(
+            {resource_type: schema.parsed_resource_schema(resource_type) for resource_type in resource_types},
+            config,
+            existing_paths={resource_type: config.dataclass_path(resource_type) for resource_type in resource_types},
+        )
+    uses_python = False
     with new_task("Generating module files for resource types", total=len(resource_types)) as task:
         for resource_type in resource_types:
-            generate_resource_module(config, resource_type, schema)
+            uses_python |= generate_resource_module(
+                config, resource_type, schema, dataclass_code=dataclass_codes[resource_type]
+            )
             task.update(advance=1)
 
-    return finalize_and_validate_module(config)
+    return finalize_and_validate_module(config, skip_python=not uses_python)
 
 
-def generate_resource_module(config: ModuleGenConfig, resource_type: str, atlas_schema: AtlasSchemaInfo) -> None:
-    resource_type_schema = atlas_schema.raw_resource_schema.get(resource_type)
-    assert resource_type_schema, f"resource type {resource_type} not found in schema"
-    schema_parsed = parse_model(resource_type_schema, t=ResourceSchema)
+def generate_resource_module(
+    config: ModuleGenConfig, resource_type: str, atlas_schema: AtlasSchemaInfo, *, dataclass_code: str = ""
+) -> bool:
+    """Returns True when the resource uses the `data "external"` python program."""
     dataclass_path = config.dataclass_path(resource_type)
-    dataclass_code = convert_and_format(resource_type, schema_parsed, config, existing_path=dataclass_path)
+    if not dataclass_code:
+        schema_parsed = atlas_schema.parsed_resource_schema(resource_type)
+        dataclass_code = convert_and_format(resource_type, schema_parsed, config, existing_path=dataclass_path)
     logger.info(f"Generated dataclass for {resource_type} to {dataclass_path}")
     ensure_parents_write_text(dataclass_path, dataclass_code)
 
     python_module = import_resource_type_python_module(resource_type, dataclass_path)
+    if use_fast_validator(python_module, config):
+        validator_path = config.validator_path(resource_type)
+        ensure_parents_write_text(validator_path, fast_validator_code(resource_type, dataclass_code, config))
+        logger.info(f"Generated fast validator for {resource_type} to {validator_path}")
+    elif config.fast_validator and config.uses_python(python_module):
+        logger.warning(f"{resource_type} has custom hooks, the fast validator is skipped")
     main_tf = generate_resource_main(python_module, config)
     main_path = config.main_tf_path(resource_type)
     ensure_parents_write_text(main_path, main_tf)
@@ -125,12 +147,15 @@ def generate_resource_module(config: ModuleGenConfig, resource_type: str, atlas_
     if output_tf := generate_resource_output(python_module, config):
         output_path = config.output_path(resource_type)
         ensure_parents_write_text(output_path, output_tf)
-    if config.skip_python and dataclass_path.is_relative_to(config.module_out_path):
+    uses_python = config.uses_python(python_module)
+    if not uses_python and dataclass_path.is_relative_to(config.module_out_path):
         dataclass_path.unlink(missing_ok=True)
+    return uses_python
 
 
-def finalize_and_validate_module(config: ModuleGenConfig) -> Path:
-    dump_versions_tf(config.module_out_path, skip_python=config.skip_python)
+def finalize_and_validate_module(config: ModuleGenConfig, *, skip_python: bool | None = None) -> Path:
+    skip_python = config.skip_python if skip_python is None else skip_python
+    dump_versions_tf(config.module_out_path, skip_python=skip_python)
     logger.info(f"Module dumped to {config.module_out_path}, running checks")
     validate_tf_workspace(config.module_out_path, tf_cli_config_file=config.settings.tf_cli_config_file)
     return config.module_out_path
@@ -148,9 +173,12 @@ def module_examples_and_readme(config: ModuleGenConfig, *, example_var_file: Pat
             py_module = import_resource_type_python_module(resource_type, config.dataclass_path(resource_type))
             examples_generated = generate_module_examples(config, py_module, resource_type=resource_type)
         if examples_generated:
-            with run_pool("Validating examples", total=len(examples_generated), exit_wait_timeout=60) as pool:
+            with (
+                tf_init_cache(config.settings) as init_cache,
+                run_pool("Validating examples", total=len(examples_generated), exit_wait_timeout=60) as pool,
+            ):
                 for example_path in examples_generated:
-                    pool.submit(validate_tf_workspace, example_path)
+                    pool.submit(validate_tf_workspace, example_path, init_cache=init_cache)
 
     attribute_descriptions = parse_attribute_descriptions(config.settings)
     settings = config.settings
@@ -172,10 +200,11 @@ def module_examples_and_readme(config: ModuleGenConfig, *, example_var_file: Pat
             examples_base_dir=path,
             skip_tf_fmt=True,
             new_description_call=new_description,
+            description_scope=config.resolve_resource_type,
         )
     )
-    if out_event.changes:
-        logger.info(f"Updated attribute descriptions: {len(out_event.changes)}")
+    if out_event.changed_files:
+        logger.info(f"Updated attribute descriptions: {len(out_event.changes)} in {len(out_event.changed_files)} files")
         run_and_wait("terraform fmt -recursive .", cwd=path, ansi_content=False, allow_non_zero_exit=True)
     with new_task("Generating README.md"):
         generate_and_write_readme(config.module_out_path)
@@ -204,29 +233,35 @@ def example_plan_checks(config: ModuleGenConfig, timeout_all_seconds: int = 60)
     example_checks = config.example_plan_checks
     settings = config.settings
 
-    def run_check(check: ExamplePlanCheck):
+    def run_check(check: ExamplePlanCheck, init_cache: TfInitCache):
         expected_dir = settings.output_plan_dumps / check.expected_output_dir_name
         variables_path = read_variables_path(expected_dir)
         with TemporaryDirectory() as temp_dir:
             stored_plan = Path(temp_dir) / "plan.json"
             tf_dir = config.example_path(check.example_name)
-            validate_tf_workspace(tf_dir)
+            validate_tf_workspace(tf_dir, init_cache=init_cache)
             var_arg = f" -var-file={variables_path}" if variables_path else ""
-            run_and_wait(f"terraform plan -out={OUT_BINARY_PATH}{var_arg}", cwd=tf_dir)
+            run_and_wait(f"terraform plan -out={OUT_BINARY_PATH}{var_arg}", cwd=tf_dir, env=init_cache.env)
             run_and_wait(f"terraform show -json {OUT_BINARY_PATH} > {stored_plan}", cwd=tf_dir)
             plan_output = parse_plan_output(stored_plan)
-        return generate_expected_actual(settings.output_plan_dumps, check, plan_output)
+        return diff_plan_output(settings.output_plan_dumps, check, plan_output, keep_values=check.html_diff)
 
-    with run_pool("Run Examples", total=len(example_checks), exit_wait_timeout=timeout_all_seconds) as pool:
-        futures = {pool.submit(run_check, check): check for check in example_checks}
+    with (
+        tf_init_cache(settings) as init_cache,
+        run_pool("Run Examples", total=len(example_checks), exit_wait_timeout=timeout_all_seconds) as pool,
+    ):
+        futures = {pool.submit(run_check, check, init_cache): check for check in example_checks}
     diff_paths: list[Path] = []
     for future in futures:
         check = futures[future]
         try:
-            expected, actual = future.result(timeout=timeout_all_seconds)
-            if expected != actual:
-                diff_path = settings.plan_diff_output_path / f"{config.name}_{check.example_name}.html"
-                dump_html_diff(expected, actual, diff_path)
+            plan_diff: PlanDiff = future.result(timeout=timeout_all_seconds)
+            if plan_diff.has_changes:
+                diff_path = dump_plan_diff(
+                    plan_diff,
+                    settings.plan_diff_output_path / f"{config.name}_{check.example_name}",
+                    html_diff=check.html_diff,
+                )
                 diff_paths.append(diff_path)
                 logger.error(f"Example check failed for {check}")
         except Exception as e:
@@ -235,12 +270,12 @@ def example_plan_checks(config: ModuleGenConfig, timeout_all_seconds: int = 60)
     return diff_paths
 
 
-def dump_html_diff(expected: str, actual: str, diff_path: Path) -> str:
-    html_text = difflib.HtmlDiff().make_file(
-        expected.splitlines(),
-        actual.splitlines(),
-        "expected",
-        "actual",
-    )
-    ensure_parents_write_text(diff_path, html_text)
-    return html_text
+def dump_plan_diff(plan_diff: PlanDiff, diff_path_no_suffix: Path, *, html_diff: bool = False) -> Path:
+    """Returns the markdown summary path, the json summary (and html diff if requested) use the same stem."""
+    out_dir, stem = diff_path_no_suffix.parent, diff_path_no_suffix.name
+    ensure_parents_write_text(out_dir / f"{stem}.json", plan_diff.summary_json())
+    if html_diff:
+        ensure_parents_write_text(out_dir / f"{stem}.html", plan_diff.summary_html())
+    md_path = out_dir / f"{stem}.md"
+    ensure_parents_write_text(md_path, plan_diff.summary_md())
+    return md_path
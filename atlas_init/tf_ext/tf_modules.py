@@ -236,9 +236,9 @@ def parse_atlas_graph(settings: TfExtSettings) -> AtlasGraph:
     atlas_graph = parse_model(settings.atlas_graph_path, t=AtlasGraph)
     deprecated_resources = parse_list(settings.schema_resource_types_deprecated_path, format="yaml")
     atlas_graph.deprecated_resource_types.update(deprecated_resources)
-    atlas_graph.parent_child_edges["mongodbatlas_project"].add("mongodbatlas_auditing")
-    atlas_graph.parent_child_edges["mongodbatlas_project"].add("mongodbatlas_custom_dns_configuration_cluster_aws")
-    atlas_graph.parent_child_edges["mongodbatlas_advanced_cluster"].add("mongodbatlas_global_cluster_config")
+    atlas_graph.add_internal_edge("mongodbatlas_project", "mongodbatlas_auditing")
+    atlas_graph.add_internal_edge("mongodbatlas_project", "mongodbatlas_custom_dns_configuration_cluster_aws")
+    atlas_graph.add_internal_edge("mongodbatlas_advanced_cluster", "mongodbatlas_global_cluster_config")
     return atlas_graph
 
 
@@ -349,13 +349,13 @@ def create_module_graphs(
     child_edges = [
         (root_resource_type, child)
         for root_resource_type in module_config.root_resource_types
-        for child in atlas_graph.parent_child_edges.get(root_resource_type, [])
+        for child in atlas_graph.children(root_resource_type)
         if child not in used_resource_types
     ]
     child_edges.extend(
         (nested_resource_type, child)
         for nested_resource_type in module_config.extra_nested_resource_types
-        for child in atlas_graph.parent_child_edges.get(nested_resource_type, [])
+        for child in atlas_graph.children(nested_resource_type)
         if child not in used_resource_types
     )
     internal_only_edges = [
@@ -18,7 +18,7 @@ from atlas_init.tf_ext.paths import (
     get_example_directories,
     is_variable_name_external,
 )
-from atlas_init.tf_ext.provider_schema import parse_atlas_schema
+from atlas_init.tf_ext.provider_schema import load_atlas_schema
 from atlas_init.tf_ext.settings import TfExtSettings
 
 logger = logging.getLogger(__name__)
@@ -33,7 +33,7 @@ def tf_vars(
     example_dirs = get_example_directories(repo_path, skip_names)
     assert example_dirs, "No example directories found. Please check the repository path and skip names."
     with new_task("Parsing provider schema") as task:
-        atlas_schema = parse_atlas_schema()
+        atlas_schema = load_atlas_schema(settings)
         resource_types = atlas_schema.resource_types
         resource_types_deprecated = atlas_schema.deprecated_resource_types
         ensure_parents_write_text(settings.schema_resource_types_path, dump(sorted(resource_types), format="yaml"))
@@ -18,8 +18,8 @@ from atlas_init.cli_tf.hcl.modifier2 import TFVar
 from atlas_init.settings.env_vars import init_settings
 from atlas_init.settings.env_vars_generated import AtlasSettingsWithProject, AWSSettings
 from atlas_init.tf_ext.paths import find_variables_typed
+from atlas_init.tf_ext.run_tf import TfInitCache, tf_init_cache, validate_tf_workspace
 from atlas_init.tf_ext.settings import TfExtSettings, init_tf_ext_settings
-from atlas_init.tf_ext.tf_mod_gen import validate_tf_workspace
 
 logger = logging.getLogger(__name__)
 LOCKFILE_NAME = ".terraform.tfstate.lock.info"
@@ -236,7 +236,7 @@ def tf_ws(
     run_count = len(run_configs)
     assert run_count > 0, f"No run configs found from {root_path}"
 
-    def run_cmd(run_config: TFWorkspaceRunConfig):
+    def run_cmd(run_config: TFWorkspaceRunConfig, init_cache: TfInitCache):
         tf_vars_str = dump(run_config.resolved_vars, "pretty_json")
         tf_vars_path = run_config.tf_vars_path_json(settings)
         ensure_parents_write_text(tf_vars_path, tf_vars_str)
@@ -248,7 +248,12 @@ def tf_ws(
             logger.warning(f"Lockfile exists for {run_config.path}, skipping: {lockfile}")
             return
 
-        validate_tf_workspace(run_config.path, tf_cli_config_file=settings.tf_cli_config_file, env_extra=env_extra)
+        validate_tf_workspace(
+            run_config.path,
+            tf_cli_config_file=settings.tf_cli_config_file,
+            env_extra=env_extra,
+            init_cache=init_cache,
+        )
         if command == TFWsCommands.VALIDATE:
             return
         command_extra = ""
@@ -258,12 +263,15 @@ def tf_ws(
         run_and_wait(
             f"terraform {command} -var-file={tf_vars_path}{command_extra}",
             cwd=run_config.path,
-            env=env_extra,
+            env=init_cache.env | env_extra,
             user_input=run_count == 1,
         )
 
-    with run_pool(f"{command} in TF Workspaces", total=run_count, max_concurrent_submits=9) as pool:
-        futures = {pool.submit(run_cmd, run_config): run_config for run_config in run_configs}
+    with (
+        tf_init_cache(settings) as init_cache,
+        run_pool(f"{command} in TF Workspaces", total=run_count, max_concurrent_submits=9) as pool,
+    ):
+        futures = {pool.submit(run_cmd, run_config, init_cache): run_config for run_config in run_configs}
         for future, run_config in futures.items():
             try:
                 future.result()
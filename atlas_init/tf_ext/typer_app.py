@@ -1,7 +1,15 @@
 from ask_shell import configure_logging
 from typer import Typer
 
-from atlas_init.tf_ext import api_call, settings, tf_desc_gen, tf_example_readme, tf_mod_gen_provider, tf_ws
+from atlas_init.tf_ext import (
+    api_call,
+    gen_readme,
+    settings,
+    tf_desc_gen,
+    tf_example_readme,
+    tf_mod_gen_provider,
+    tf_ws,
+)
 
 
 def typer_main():
@@ -21,6 +29,7 @@ def typer_main():
     app.command(name="mod-gen-provider")(tf_mod_gen_provider.tf_mod_gen_provider_resource_modules)
     app.command(name="check-env-vars")(settings.init_tf_ext_settings)
     app.command(name="example-readme")(tf_example_readme.tf_example_readme)
+    app.command(name="readmes")(gen_readme.tf_readmes)
     app.command(name="ws")(tf_ws.tf_ws)
     configure_logging(app)
     app()
@@ -4,10 +4,17 @@ from pathlib import Path
 import pytest
 from model_lib import parse_payload
 
+from atlas_init.cli_cfn import cfn_parameter_finder
 from atlas_init.cli_cfn.cfn_parameter_finder import (
+    CfnResource,
+    CfnTemplateIndex,
     CfnTemplateUnknownParametersError,
+    TemplatePathNotFoundError,
     dump_resource_to_file,
     infer_template_parameters,
+    infer_template_path,
+    load_template_index,
+    modify_resource_with_params,
 )
 
 TEST_DATA = Path(__file__).parent / "test_data"
@@ -53,3 +60,66 @@ def test_dump_resource_to_file(tmp_path):
         params,  # type: ignore
     )
     assert '"Ref": ' not in inputs_file.read_text()
+
+
+def test_infer_template_path_refreshes_changed_templates(tmp_path):
+    project_template = (TEST_DATA / "cfn_project_template.json").read_text()
+    examples_dir = tmp_path / "examples"
+    project_path = examples_dir / "project" / "project.json"
+    project_path.parent.mkdir(parents=True)
+    project_path.write_text(project_template)
+    assert infer_template_path(tmp_path, "MongoDB::Atlas::Project", "test-stack") == project_path
+    with pytest.raises(TemplatePathNotFoundError):
+        infer_template_path(tmp_path, "MongoDB::Atlas::Cluster", "test-stack")
+
+    cluster_path = examples_dir / "cluster" / "cluster-self-managed-sharding.json"
+    cluster_path.parent.mkdir(parents=True)
+    cluster_path.write_text((TEST_DATA / "cluster-self-managed-sharding.json").read_text())
+    assert infer_template_path(tmp_path, "MongoDB::Atlas::Cluster", "test-stack") == cluster_path
+
+    project_path.write_text(project_template.replace("MongoDB::Atlas::Project", "MongoDB::Atlas::Team"))
+    stat = project_path.stat()
+    os.utime(project_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    with pytest.raises(TemplatePathNotFoundError):
+        infer_template_path(tmp_path, "MongoDB::Atlas::Project", "test-stack")
+    assert load_template_index(examples_dir).template_paths("MongoDB::Atlas::Team") == [project_path]
+
+    cluster_path.unlink()
+    assert load_template_index(examples_dir).template_paths("MongoDB::Atlas::Cluster") == []
+
+
+def test_template_index_is_reloaded_from_cache_path(tmp_path, monkeypatch):
+    examples_dir = tmp_path / "examples"
+    project_path = examples_dir / "project" / "project.json"
+    project_path.parent.mkdir(parents=True)
+    project_path.write_text((TEST_DATA / "cfn_project_template.json").read_text())
+    cache_path = tmp_path / "cache" / "index.json"
+    index = CfnTemplateIndex(examples_dir, cache_path)
+    assert index.template_paths("MongoDB::Atlas::Project") == [project_path]
+    assert cache_path.exists()
+
+    class NoReads:
+        def findall(self, _: str) -> list[str]:
+            raise AssertionError("unchanged templates must not be read again")
+
+    monkeypatch.setattr(cfn_parameter_finder, "_type_setting_pattern", NoReads())
+    assert CfnTemplateIndex(examples_dir, cache_path).template_paths("MongoDB::Atlas::Project") == [project_path]
+    assert CfnTemplateIndex(tmp_path / "other", cache_path).template_paths("MongoDB::Atlas::Project") == []
+
+
+def test_modify_resource_with_params():
+    resource = CfnResource(
+        type="MongoDB::Atlas::Cluster",
+        properties={
+            "ProjectId": {"Ref": "ProjectId"},
+            "ReplicationSpecs": [{"RegionConfigs": [{"RegionName": {"Ref": "Region"}}]}],
+            "Profile": {"Ref": "Profile"},
+        },
+    )
+    modify_resource_with_params(resource, {"ProjectId": "p1", "Region": "US_EAST_1", "Name": "c1"})
+    assert resource.properties == {
+        "ProjectId": "p1",
+        "ReplicationSpecs": [{"RegionConfigs": [{"RegionName": "US_EAST_1"}]}],
+        "Profile": {"Ref": "Profile"},
+        "Name": "c1",
+    }
@@ -2,7 +2,8 @@ import os
 
 import pytest
 
-from atlas_init.cli_cfn.aws import get_last_cfn_type, print_version_regions
+from atlas_init.cli_cfn.aws import get_last_cfn_type
+from atlas_init.cli_cfn.type_registry import print_version_regions
 
 
 @pytest.mark.skipif(os.environ.get("AWS_PROFILE", "") == "", reason="needs os.environ[AWS_PROFILE]")
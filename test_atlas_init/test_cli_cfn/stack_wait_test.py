@@ -0,0 +1,259 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+from threading import Barrier
+from types import SimpleNamespace
+from typing import Any
+
+import boto3
+import botocore.exceptions
+import pytest
+import typer
+from botocore.stub import Stubber
+from moto import mock_aws
+from zero_3rdparty.datetime_utils import utc_now
+
+from atlas_init.cli_cfn import aws, example
+from atlas_init.cli_cfn.aws import (
+    STATUS_ABORTED,
+    STATUS_DEPLOY_FAILED,
+    StackEvents,
+    StackRef,
+    StackWaitError,
+    StackWaitResult,
+    delete_stacks,
+    deploy_stacks,
+    wait_on_stack_ok,
+    wait_on_stacks_ok,
+)
+from atlas_init.cli_cfn.example import CfnExampleInputs, example_regions_handler, run_example
+from atlas_init.repos.cfn import Operation
+
+_template = json.dumps({"Resources": {"Bucket": {"Type": "AWS::S3::Bucket"}}})
+_regions = ["us-east-1", "eu-west-1"]
+
+
+def _example_inputs(**overrides) -> CfnExampleInputs:
+    kwargs: dict[str, Any] = dict(
+        type_name="MongoDB::Atlas::Project",
+        region_filter=_regions[0],
+        regions=_regions,
+        stack_name="example",
+        operation=Operation.CREATE,
+        example_name="project",
+        stack_timeout_s=5,
+        delete_stack_first=False,
+        force_deregister=False,
+        force_keep=True,
+        execution_role="arn:aws:iam::123456789012:role/cfn-execution",
+        export_example_to_inputs=False,
+        export_example_to_samples=False,
+        register_all_types_in_example=False,
+    )
+    return CfnExampleInputs(**(kwargs | overrides))
+
+
+@pytest.fixture()
+def aws_mock(monkeypatch):
+    for key in ["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"]:
+        monkeypatch.setenv(key, "testing")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    aws.cloud_formation_client.cache_clear()
+    with mock_aws():
+        yield
+    aws.cloud_formation_client.cache_clear()
+
+
+def _event(stack_name: str, logical_id: str, status: str, seconds_ago: int, reason: str = "") -> dict:
+    return {
+        "StackId": stack_name,
+        "EventId": f"{logical_id}-{status}-{seconds_ago}",
+        "StackName": stack_name,
+        "LogicalResourceId": logical_id,
+        "Timestamp": utc_now() - timedelta(seconds=seconds_ago),
+        "ResourceStatus": status,
+        "ResourceStatusReason": reason,
+    }
+
+
+def test_operation_failures_ignores_previous_operations():
+    events = StackEvents.model_validate(
+        {
+            "StackEvents": [
+                _event("s1", "Bucket", "CREATE_FAILED", 100, "old failure"),
+                _event("s1", "s1", "UPDATE_IN_PROGRESS", 10),
+                _event("s1", "Bucket", "UPDATE_FAILED", 5, "new failure"),
+            ]
+        }
+    )
+    [failure] = events.operation_failures("s1")
+    assert failure.resource_status_reason == "new failure"
+
+
+def test_wait_on_stacks_across_regions(aws_mock):
+    refs = [StackRef(f"stack-{i}", region) for region in _regions for i in range(2)]
+    for ref in refs:
+        aws.cloud_formation_client(ref.region).create_stack(StackName=ref.stack_name, TemplateBody=_template)
+    results = wait_on_stacks_ok(refs, timeout_seconds=5, min_poll_seconds=0.01)
+    assert [(r.stack_name, r.region) for r in results] == refs
+    assert all(result.is_ok for result in results)
+    assert {result.status for result in results} == {"CREATE_COMPLETE"}
+
+    deleted = delete_stacks(refs + [StackRef("missing-stack", "us-east-1")], timeout_seconds=5)
+    assert len(deleted) == len(refs)
+    assert all(result.is_ok for result in deleted)
+
+
+def test_wait_on_stacks_fails_fast(monkeypatch):
+    clients = {region: boto3.client("cloudformation", region_name=region) for region in _regions}
+    failing, slow = StackRef("failing", _regions[0]), StackRef("slow", _regions[1])
+    stub_failing = Stubber(clients[failing.region])
+    stub_failing.add_response(
+        "describe_stack_events",
+        {
+            "StackEvents": [
+                _event("failing", "failing", "CREATE_IN_PROGRESS", 10),
+                _event("failing", "Bucket", "CREATE_FAILED", 5, "bucket exists"),
+            ]
+        },
+    )
+    stub_slow = Stubber(clients[slow.region])
+    for _ in range(3):
+        stub_slow.add_response(
+            "describe_stack_events", {"StackEvents": [_event("slow", "slow", "CREATE_IN_PROGRESS", 1)]}
+        )
+    monkeypatch.setattr(aws, "cloud_formation_client", lambda region: clients[region])
+    with stub_failing, stub_slow:
+        slow_result, failed_result = wait_on_stacks_ok([slow, failing], timeout_seconds=60, min_poll_seconds=0.5)
+    assert failed_result.is_error
+    assert failed_result.status_reason == "Bucket: bucket exists"
+    assert slow_result.status == STATUS_ABORTED
+    assert slow_result.duration_seconds < 30
+
+
+def _stack_names(region: str) -> list[str]:
+    return [stack["StackName"] for stack in aws.cloud_formation_client(region).describe_stacks()["Stacks"]]
+
+
+def test_deploy_stacks_keeps_existing_stack_on_failure(aws_mock):
+    regions = [*_regions, "ap-south-1"]
+    aws.cloud_formation_client(regions[1]).create_stack(StackName="example", TemplateBody=_template)
+    refs = [StackRef("example", region) for region in regions]
+    results = deploy_stacks(refs, _template, [], timeout_seconds=5, max_concurrent=2, min_poll_seconds=0.01)
+    assert [(r.region, r.is_deployed) for r in results] == [(regions[0], True), (regions[1], False), (regions[2], True)]
+    assert results[1].status == STATUS_DEPLOY_FAILED
+    assert "already exists" in results[1].status_reason
+    assert all(_stack_names(region) == ["example"] for region in regions)
+
+    updated = deploy_stacks(refs[:1], _template.replace("Bucket", "Bucket2"), [], update=True, min_poll_seconds=0.01)
+    assert updated[0].status == "UPDATE_COMPLETE"
+
+
+def test_deploy_stacks_cleans_up_failed_creates(aws_mock, monkeypatch):
+    wait_on_single_stack = aws._wait_on_single_stack
+
+    def rollback_in_second_region(ref: StackRef, **kwargs) -> StackWaitResult:
+        result = wait_on_single_stack(ref, **kwargs)
+        if ref.region == _regions[1]:
+            result.status = "ROLLBACK_COMPLETE"
+        return result
+
+    monkeypatch.setattr(aws, "_wait_on_single_stack", rollback_in_second_region)
+    refs = [StackRef("example", region) for region in _regions]
+    results = deploy_stacks(refs, _template, [], timeout_seconds=5, min_poll_seconds=0.01)
+    assert [result.is_deployed for result in results] == [True, False]
+    assert all(result.duration_seconds > 0 for result in results)
+    assert _stack_names(_regions[0]) == ["example"]
+    assert _stack_names(_regions[1]) == []
+
+
+def test_example_regions_handler(aws_mock, monkeypatch, tmp_path):
+    template_path = tmp_path / "example.json"
+    template_path.write_text(_template)
+    monkeypatch.setattr(example, "infer_template_path", lambda *_: template_path)
+    monkeypatch.setattr(example, "infer_template_parameters", lambda *_: [])
+    monkeypatch.setattr(example.prompt, "Confirm", lambda *_: lambda: True)
+    inputs = _example_inputs()
+    settings = SimpleNamespace(is_interactive=False, cfn_template_index_path=tmp_path / "index.json")
+    example_regions_handler(inputs, tmp_path, tmp_path, settings)  # type: ignore
+    assert all(_stack_names(region) == ["example"] for region in _regions)
+    example_regions_handler(inputs.model_copy(update={"operation": Operation.DELETE}), tmp_path, tmp_path, settings)  # type: ignore
+    assert all(_stack_names(region) == [] for region in _regions)
+
+
+def test_wait_on_stack_errors_are_raised(monkeypatch):
+    client = boto3.client("cloudformation", region_name=_regions[0])
+    stubber = Stubber(client)
+    stubber.add_client_error("describe_stack_events", service_message="Access denied")
+    stubber.add_response(
+        "describe_stack_events",
+        {
+            "StackEvents": [
+                _event("failing", "failing", "CREATE_IN_PROGRESS", 10),
+                _event("failing", "failing", "CREATE_FAILED", 5, "bucket exists"),
+            ]
+        },
+    )
+    monkeypatch.setattr(aws, "cloud_formation_client", lambda _: client)
+    with stubber:
+        with pytest.raises(botocore.exceptions.ClientError, match="Access denied"):
+            wait_on_stacks_ok([StackRef("failing", _regions[0])], timeout_seconds=5)
+        with pytest.raises(StackWaitError) as exc_info:
+            wait_on_stack_ok("failing", _regions[0], timeout_seconds=5)
+    assert exc_info.value.result.status == "CREATE_FAILED"
+
+
+def test_run_example_exits_on_stack_wait_error(monkeypatch, caplog):
+    failed = StackWaitResult(stack_name="example", region=_regions[0], status="CREATE_FAILED", reasons="bucket exists")
+
+    def example_handler(*_):
+        raise StackWaitError(failed)
+
+    monkeypatch.setattr(example, "example_handler", example_handler)
+    inputs = _example_inputs(regions=[])
+    with pytest.raises(typer.Exit) as exc_info:
+        run_example(inputs, Path(), Path(), None)  # type: ignore
+    assert exc_info.value.exit_code == 1
+    assert "stack error example CREATE_FAILED" in caplog.text
+
+
+def test_example_regions_handler_activates_extra_types_with_force_keep(aws_mock, monkeypatch, tmp_path):
+    template_path = tmp_path / "example.json"
+    template_path.write_text(_template)
+    activated: list[tuple[str, str]] = []
+    monkeypatch.setattr(example, "infer_template_path", lambda *_: template_path)
+    monkeypatch.setattr(example, "infer_template_parameters", lambda *_: [])
+    monkeypatch.setattr(example.prompt, "Confirm", lambda *_: lambda: True)
+    monkeypatch.setattr(
+        example.CfnTemplate,
+        "read_template_types",
+        classmethod(lambda *_: {"MongoDB::Atlas::Project", "MongoDB::Atlas::Cluster"}),
+    )
+    monkeypatch.setattr(
+        example,
+        "ensure_resource_type_activated",
+        lambda type_name, region, *_, **__: activated.append((type_name, region)),
+    )
+    inputs = _example_inputs(register_all_types_in_example=True)
+    settings = SimpleNamespace(is_interactive=False, cfn_template_index_path=tmp_path / "index.json")
+    example_regions_handler(inputs, tmp_path, tmp_path, settings)  # type: ignore
+    assert sorted(activated) == [("MongoDB::Atlas::Cluster", region) for region in sorted(_regions)]
+
+
+def test_example_regions_handler_activates_regions_concurrently(aws_mock, monkeypatch, tmp_path):
+    template_path = tmp_path / "example.json"
+    template_path.write_text(_template)
+    all_regions_waiting = Barrier(len(_regions), timeout=5)
+    activated: list[tuple[str, str]] = []
+
+    def activate(type_name: str, region: str, *_, **__):
+        all_regions_waiting.wait()  # raises BrokenBarrierError if the regions are activated one at a time
+        activated.append((type_name, region))
+
+    monkeypatch.setattr(example, "infer_template_path", lambda *_: template_path)
+    monkeypatch.setattr(example, "infer_template_parameters", lambda *_: [])
+    monkeypatch.setattr(example.prompt, "Confirm", lambda *_: lambda: True)
+    monkeypatch.setattr(example, "ensure_resource_type_activated", activate)
+    settings = SimpleNamespace(is_interactive=False, cfn_template_index_path=tmp_path / "index.json")
+    example_regions_handler(_example_inputs(force_keep=False), tmp_path, tmp_path, settings)  # type: ignore
+    assert sorted(activated) == [("MongoDB::Atlas::Project", region) for region in sorted(_regions)]
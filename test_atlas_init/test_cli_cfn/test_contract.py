@@ -1,6 +1,23 @@
+import re
+import socket
+import sys
+import time
+from pathlib import Path
+from urllib.request import Request, urlopen
+
 import pytest
 
-from atlas_init.cli_cfn.contract import RunContractTest, contract_test
+from atlas_init.cli_cfn import contract
+from atlas_init.cli_cfn.contract import (
+    CONTRACT_SHARDS_DIRNAME,
+    RunContractTest,
+    contract_test,
+    next_free_port,
+    parse_junit_timings,
+    prepare_contract_test_shards,
+    run_sharded_contract_tests,
+    shard_input_files,
+)
 from atlas_init.repos.path import Repo
 from test_atlas_init.conftest import CLIArgs
 
@@ -40,5 +57,137 @@ def test_name_filter(tmp_path):
             cfn_region="us-west-2",
             only_names=["contract_create_create", "contract_update_without_create"],
         ).run_tests_command[1]
-        == "test --function-name TestEntrypoint --verbose --region us-west-2 -- -k contract_create_create -k contract_update_without_create"
+        == 'test --function-name TestEntrypoint --verbose --region us-west-2 -- -k "contract_create_create or contract_update_without_create"'
+    )
+
+
+_fake_lambda_server = """\
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+port = int(sys.argv[1])
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = str(port).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+server = HTTPServer(("127.0.0.1", port), Handler)
+print(f"Running on http://127.0.0.1:{port}", flush=True)
+server.serve_forever()
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_next_free_port_skips_taken_and_bound_ports():
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy_port = busy.getsockname()[1]
+        assert next_free_port(busy_port, set()) > busy_port
+    port = _free_port()
+    assert next_free_port(port, {port}) > port
+
+
+def test_parse_junit_timings_uses_original_input_numbers(tmp_path):
+    resource_path = tmp_path / "resource"
+    resource_path.mkdir()
+    input_files = []
+    for nr in range(1, 4):
+        input_file = tmp_path / f"inputs_{nr}_create.json"
+        input_file.write_text("{}")
+        input_files.append(input_file)
+    _, second = prepare_contract_test_shards(resource_path, input_files, 2, base_port=_free_port())
+    assert [path.name for path in second.input_files] == ["inputs_1_create.json"]
+    assert second.input_numbers == {1: 2}
+    second.junit_path.write_text('<testsuite><testcase name="contract_create_read[inputs_1]" time="1.5"/></testsuite>')
+    [timing] = parse_junit_timings(second.junit_path, second.index, second.input_numbers)
+    assert (timing.name, timing.seconds, timing.shard) == ("contract_create_read[inputs_2]", 1.5, 1)
+
+
+def test_shard_input_files_keeps_input_numbers_together(tmp_path):
+    names = [f"inputs_{nr}_{kind}.json" for nr in range(1, 4) for kind in ["create", "update"]]
+    shards = shard_input_files([tmp_path / name for name in names], 2)
+    assert [[path.name for path in files] for files in shards] == [
+        ["inputs_1_create.json", "inputs_1_update.json", "inputs_3_create.json", "inputs_3_update.json"],
+        ["inputs_2_create.json", "inputs_2_update.json"],
+    ]
+    assert len(shard_input_files([tmp_path / names[0]], 4)) == 1
+
+
+def test_run_sharded_contract_tests_with_fake_lambda(tmp_path, monkeypatch):
+    server_script = tmp_path / "fake_lambda.py"
+    server_script.write_text(_fake_lambda_server)
+    resource_path = tmp_path / "resource"
+    (resource_path / "inputs").mkdir(parents=True)
+    (resource_path / "template.yml").write_text("Resources: {}")
+    input_files = []
+    for nr in range(1, 5):
+        for kind in ["create", "update"]:
+            input_file = resource_path / "inputs" / f"inputs_{nr}_{kind}.json"
+            input_file.write_text(f'{{"Nr": {nr}}}')
+            input_files.append(input_file)
+    monkeypatch.setattr(
+        RunContractTest,
+        "start_lambda_command",
+        lambda self, port=None: (sys.executable, f"{server_script} {port}"),
     )
+    windows: list[tuple[float, float]] = []
+    ports: list[int] = []
+
+    def fake_cfn_test(binary: str, command: str, cwd: Path, **_) -> bool:
+        port = int(re.search(r"--endpoint http://127.0.0.1:(\d+)", command).group(1))  # type: ignore
+        ports.append(port)
+        junit_path = Path(re.search(r"--junitxml=(\S+)", command).group(1))  # type: ignore
+        assert (cwd / "template.yml").is_symlink()
+        start = time.monotonic()
+        cases = []
+        for input_path in sorted((cwd / "inputs").glob("inputs_*_create.json")):
+            with urlopen(Request(f"http://127.0.0.1:{port}/", data=input_path.read_bytes())) as response:
+                assert response.read().decode() == str(port)
+            time.sleep(0.2)
+            cases.append(f'<testcase name="contract_create_{input_path.stem}" time="0.2"/>')
+        junit_path.write_text(f"<testsuites><testsuite>{''.join(cases)}</testsuite></testsuites>")
+        windows.append((start, time.monotonic()))
+        return True
+
+    monkeypatch.setattr(contract, "run_binary_command_is_ok", fake_cfn_test)
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        busy_port = busy.getsockname()[1]
+        event = RunContractTest(
+            resource_path=resource_path,
+            repo_path=tmp_path,
+            aws_profile="test",
+            cfn_region="us-east-1",
+            dry_run=False,
+            shards=2,
+            base_port=busy_port - 1,  # the 2nd shard's default port is taken
+        )
+        result = run_sharded_contract_tests(event, input_files)
+    assert result.contract_test_ok
+    assert len(set(ports)) == 2
+    assert busy_port not in ports
+    assert sorted((timing.shard, timing.name) for timing in result.timings) == [
+        (0, "contract_create_inputs_1_create"),
+        (0, "contract_create_inputs_3_create"),
+        (1, "contract_create_inputs_2_create"),
+        (1, "contract_create_inputs_4_create"),
+    ]
+    assert not (resource_path / CONTRACT_SHARDS_DIRNAME).exists()
+    assert len(windows) == 2
+    assert max(start for start, _ in windows) < min(end for _, end in windows), "shards should run concurrently"
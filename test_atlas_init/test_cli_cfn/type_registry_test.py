@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from zero_3rdparty.datetime_utils import utc_now
+
+from atlas_init.cli_cfn import aws
+from atlas_init.cli_cfn.type_registry import CfnTypeRegistry
+
+_type_name = "MongoDB::Atlas::Cluster"
+_regions = ["us-east-1", "eu-west-1", "ap-south-1"]
+
+
+def _summary(type_name: str, version: str, hours_ago: int) -> dict:
+    return {
+        "TypeName": type_name,
+        "TypeArn": f"arn:aws:cloudformation:::type/resource/{type_name}/{version}",
+        "LatestPublicVersion": version,
+        "LastUpdated": utc_now() - timedelta(hours=hours_ago),
+        "IsActivated": False,
+    }
+
+
+@pytest.fixture()
+def clients(monkeypatch) -> dict[str, Stubber]:
+    boto_clients = {region: boto3.client("cloudformation", region_name=region) for region in _regions}
+    monkeypatch.setattr(aws, "cloud_formation_client", lambda region: boto_clients[region])
+    stubbers = {region: Stubber(client) for region, client in boto_clients.items()}
+    for stubber in stubbers.values():
+        stubber.activate()
+    yield stubbers
+    for stubber in stubbers.values():
+        stubber.assert_no_pending_responses()
+        stubber.deactivate()
+
+
+def _add_list_types(stubber: Stubber, *pages: list[dict]) -> None:
+    for i, summaries in enumerate(pages, start=1):
+        response: dict = {"TypeSummaries": summaries}
+        if i < len(pages):
+            response["NextToken"] = f"page-{i}"
+        stubber.add_response("list_types", response)
+
+
+def test_refresh_only_queries_stale_regions(clients, tmp_path):
+    us, eu, ap = _regions
+    _add_list_types(
+        clients[us],
+        [_summary(_type_name, "00000001", 10), _summary(f"{_type_name}OutageSimulation", "00000009", 1)],
+        [_summary(_type_name, "00000002", 2)],
+    )
+    _add_list_types(clients[eu], [_summary(_type_name, "00000002", 3)])
+    _add_list_types(clients[ap], [])
+    registry = CfnTypeRegistry()
+    assert registry.refresh(_type_name, _regions, max_workers=2) == _regions
+    assert registry.version_regions(_type_name, _regions) == {"00000002": [us, eu], None: [ap]}
+    last_type = registry.last_cfn_type(_type_name, us)
+    assert last_type and last_type.version == "00000002"
+
+    path = tmp_path / "registry.yaml"
+    registry.store(path)
+    reloaded = CfnTypeRegistry.load(path)
+    assert reloaded.refresh(_type_name, _regions) == []
+    assert reloaded.version_regions(_type_name, _regions) == registry.version_regions(_type_name, _regions)
+
+    entry = reloaded.region_types(ap, _type_name)
+    assert entry
+    entry.refreshed = utc_now() - timedelta(days=1)
+    _add_list_types(clients[ap], [_summary(_type_name, "00000003", 0)])
+    assert reloaded.stale_regions(_type_name, _regions) == [ap]
+    assert reloaded.refresh(_type_name, _regions) == [ap]
+    assert reloaded.version_regions(_type_name, _regions) == {"00000002": [us, eu], "00000003": [ap]}
+
+
+def test_refresh_keeps_snapshot_of_failing_region(clients):
+    us, eu, _ = _regions
+    _add_list_types(clients[us], [_summary(_type_name, "00000001", 1)])
+    _add_list_types(clients[eu], [_summary(_type_name, "00000001", 1)])
+    registry = CfnTypeRegistry()
+    registry.refresh(_type_name, [us, eu])
+    _add_list_types(clients[us], [_summary(_type_name, "00000002", 0)])
+    clients[eu].add_client_error("list_types", service_error_code="Throttling")
+    assert registry.refresh(_type_name, [us, eu], force=True) == [us]
+    assert registry.version_regions(_type_name, [us, eu]) == {"00000002": [us], "00000001": [eu]}
@@ -0,0 +1,25 @@
+import shutil
+
+import pytest
+
+from atlas_init.cli_helper.batch_fmt import BatchFormatError, format_go_sources, format_python_sources, raise_on_errors
+
+
+@pytest.mark.skipif(shutil.which("gofmt") is None, reason="needs gofmt binary")
+def test_format_go_sources_reports_errors_per_source():
+    results = format_go_sources({"ok": "package ok\nfunc  X( ) {}\n", "resource/broken": "package b\nfunc ( {\n"})
+    assert results["ok"].source == "package ok\n\nfunc X() {}\n"
+    assert results["ok"].ok
+    broken = results["resource/broken"]
+    assert not broken.ok
+    assert broken.source == "package b\nfunc ( {\n"
+    with pytest.raises(BatchFormatError, match="resource/broken"):
+        raise_on_errors(results)
+
+
+@pytest.mark.skipif(shutil.which("ruff") is None, reason="needs ruff binary")
+def test_format_python_sources_in_one_batch():
+    results = format_python_sources({"a": "x=1\n", "b": "def (:\n", "c": "y = undefined_name\n"})
+    assert raise_on_errors({"a": results["a"]}) == {"a": "x = 1\n"}
+    assert any("SyntaxError" in error or "Failed to parse" in error for error in results["b"].errors)
+    assert any("F821" in error for error in results["c"].errors)
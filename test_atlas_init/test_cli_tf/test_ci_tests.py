@@ -1,8 +1,12 @@
+from types import SimpleNamespace
+
 from zero_3rdparty.datetime_utils import utc_now
 
 from ask_shell.interactive import question_patcher
-from atlas_init.cli_tf.ci_tests import ask_user_to_classify_error
+from atlas_init.cli_tf import ci_tests
+from atlas_init.cli_tf.ci_tests import TFCITestOutput, ask_user_to_classify_error, run_daily_report
 from atlas_init.cli_tf.go_test_run import GoTestRun
+from atlas_init.cli_tf.go_test_summary import RunHistoryFilter
 from atlas_init.cli_tf.go_test_tf_error import (
     ErrorClassAuthor,
     GoTestDefaultError,
@@ -24,3 +28,29 @@ def test_ask_user_to_classify_error():
             error_class=GoTestErrorClass.FLAKY_400,
         )
         assert ask_user_to_classify_error(cls, run) == GoTestErrorClass.FLAKY_400
+
+
+def test_run_daily_report_reads_the_report_only_when_needed(tmp_path, monkeypatch):
+    daily_path = tmp_path / "daily.md"
+    daily_path.write_text("# Daily Report")
+    clipboard: list[str] = []
+
+    async def ci_tests_pipeline(_):
+        return TFCITestOutput()
+
+    def write_daily_report(*_):
+        return daily_path
+
+    monkeypatch.setattr(ci_tests, "ci_tests_pipeline", ci_tests_pipeline)
+    monkeypatch.setattr(ci_tests, "manual_classification", lambda *_: None)
+    monkeypatch.setattr(ci_tests, "write_daily_report", write_daily_report)
+    monkeypatch.setattr(ci_tests, "add_to_clipboard", lambda text, **_: clipboard.append(text))
+    monkeypatch.setattr(ci_tests, "get_live_console", lambda: SimpleNamespace(is_terminal=False))
+    event = SimpleNamespace(summary_name="", report_date=utc_now())
+    paths = SimpleNamespace(daily_path=daily_path)
+    history_filter = RunHistoryFilter(run_history_start=utc_now(), run_history_end=utc_now())
+    not_printed = run_daily_report(event, None, history_filter, False, paths)  # type: ignore
+    assert (not_printed.path, not_printed.summary_md) == (daily_path, "")
+    copied = run_daily_report(event, None, history_filter, True, paths)  # type: ignore
+    assert copied.summary_md == "# Daily Report"
+    assert clipboard == ["# Daily Report"]
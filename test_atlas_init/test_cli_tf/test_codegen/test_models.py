@@ -8,8 +8,9 @@ from model_lib import dump, parse_model
 from pytest_regressions.common import check_text_files
 
 from atlas_init.cli_helper.run import run_command_is_ok
-from atlas_init.cli_tf.codegen.models import ApiResourcesConfig
-from atlas_init.cli_tf.codegen.openapi_minimal import minimal_api_spec_simplified
+from atlas_init.cli_tf.codegen.models import ApiResourcesConfig, OperationConfig, ResourceConfig
+from atlas_init.cli_tf.codegen.openapi_minimal import minimal_api_spec_simplified, minimal_api_specs
+from atlas_init.cli_tf.openapi import ComponentRefGraph, OpenapiSchema
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +94,50 @@ def output_diff_dir() -> tuple[Path, Path]:
     return output_dir, diffs_dir
 
 
+def test_minimal_api_specs_from_merged_spec():
+    """Merges the minimal specs back into one spec and checks each resource gets the same minimal spec."""
+    output_dir, _ = output_diff_dir()
+    merged: OpenapiSchema | None = None
+    config_resources: dict[str, ResourceConfig] = {}
+    for name in resources:
+        spec = parse_model(output_dir / f"api_spec_{name}.yaml", t=OpenapiSchema, format="yaml")
+        operations = [OperationConfig(path=path, method="GET") for path in spec.paths]
+        config_resources[name] = ResourceConfig(**dict(zip(["read", "create", "update", "delete"], operations)))
+        if merged is None:
+            merged = spec
+            continue
+        merged.paths.update(spec.paths)
+        for key, components in spec.components.items():
+            merged.components.setdefault(key, {}).update(components)
+    assert merged
+    specs = minimal_api_specs(ApiResourcesConfig(resources=config_resources), merged)
+    assert list(specs) == resources
+    for name, spec in specs.items():
+        assert dump(spec, format="yaml") == (output_dir / f"api_spec_{name}.yaml").read_text(), name
+
+
+def test_component_ref_graph_closure_with_cycle():
+    prefix = OpenapiSchema.SCHEMAS_PREFIX
+    spec = OpenapiSchema(
+        openapi="3.0.1",
+        info={"version": "2.0", "title": "test"},
+        paths={},
+        components={
+            "schemas": {
+                "A": {"type": "object", "properties": {"b": {"$ref": f"{prefix}B"}}},
+                "B": {"type": "object", "properties": {"a": {"$ref": f"{prefix}A"}, "c": {"$ref": f"{prefix}C"}}},
+                "C": {"type": "object", "properties": {"name": {"type": "string"}}},
+            },
+            "parameters": {},
+        },
+    )
+    graph = ComponentRefGraph(spec)
+    assert graph.direct_refs(f"{prefix}B") == (f"{prefix}A", f"{prefix}C")
+    assert graph.closure(f"{prefix}A") == {f"{prefix}A", f"{prefix}B", f"{prefix}C"}
+    assert graph.closure(f"{prefix}C") == {f"{prefix}C"}
+    assert graph.closures([f"{prefix}C", f"{prefix}B"]) == {f"{prefix}A", f"{prefix}B", f"{prefix}C"}
+
+
 def test_diff_dir():
     _, diff_dir = output_diff_dir()
     html_paths = sorted(f"chrome {path}" for path in diff_dir.glob("*.html"))
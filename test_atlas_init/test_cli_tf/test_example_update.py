@@ -1,8 +1,11 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from threading import Barrier
 
 import pytest
 
+from atlas_init.cli_tf import example_update
 from atlas_init.cli_tf.example_update import (
     TFConfigDescriptionChange,
     UpdateExamples,
@@ -88,6 +91,101 @@ def test_update_example(tmp_path, file_regression):
     file_regression.check(example_variables_tf_path.read_text(), extension=".tf")
 
 
+example_outputs_tf = """output "cluster_name" {
+  value = var.cluster_name
+}
+"""
+
+
+def test_update_examples_dry_run_and_cached_descriptions(tmp_path):
+    unchanged_tf = 'variable "other" {\n  description = "same"\n  type = string\n}\n'
+    files = {
+        "a/variables.tf": example_variables_tf,
+        "a/outputs.tf": example_outputs_tf,
+        "b/variables.tf": example_variables_tf,
+        "c/variables.tf": unchanged_tf,
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    calls: list[tuple[str, str, str]] = []
+
+    def new_description(name: str, old_description: str, path: Path) -> str:
+        calls.append((name, old_description, path.parent.name))
+        return {"cluster_name": "description of cluster name", "other": "same"}.get(name, "")
+
+    event = UpdateExamples(
+        examples_base_dir=tmp_path,
+        new_description_call=new_description,
+        description_scope=lambda _: "",
+        dry_run=True,
+    )
+    output = update_examples(event)
+    assert sorted(calls) == [
+        ("cluster_name", "", "a"),
+        ("cluster_name", "", "a"),  # output block, cached separately from the variable
+        ("other", "same", "c"),
+        ("provider_name", "", "a"),
+        ("replication_specs", "List of replication specifications in legacy mongodbatlas_cluster format", "a"),
+    ]
+    assert output.changed_files == [tmp_path / "a/outputs.tf", tmp_path / "a/variables.tf", tmp_path / "b/variables.tf"]
+    b_variables = tmp_path / "b/variables.tf"
+    assert output.diffs[b_variables].splitlines() == [
+        f"--- {b_variables}",
+        f"+++ {b_variables}",
+        ' variable "cluster_name" {',
+        '+  description = "description of cluster name"',
+        " }",
+    ]
+    assert output.diff_summary().startswith("3 files with description changes")
+    assert output.before_output_descriptions == {"cluster_name": ""}
+    assert {rel_path: (tmp_path / rel_path).read_text() for rel_path in files} == files
+
+    calls.clear()
+    output = update_examples(event.model_copy(update={"dry_run": False, "skip_tf_fmt": True}))
+    assert len(calls) == 5  # noqa: PLR2004
+    assert output.diffs == {}
+    assert "description of cluster name" in (tmp_path / "b/variables.tf").read_text()
+    assert (tmp_path / "c/variables.tf").read_text() == unchanged_tf
+
+
+def test_update_examples_parallel_parse_and_concurrent_lookups(tmp_path, monkeypatch):
+    pools: list[ProcessPoolExecutor] = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(example_update, "ProcessPoolExecutor", RecordingPool)
+    for rel_path, content in {"a/variables.tf": example_variables_tf, "b/outputs.tf": example_outputs_tf}.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True)
+        path.write_text(content)
+    # the variable and the output are different keys, a serial lookup would break the barrier
+    both_cluster_names = Barrier(2, timeout=5)
+
+    def new_description(name: str, old_description: str, path: Path) -> str:
+        if name == "cluster_name":
+            both_cluster_names.wait()
+            return "description of cluster name"
+        return old_description
+
+    output = update_examples(
+        UpdateExamples(
+            examples_base_dir=tmp_path,
+            new_description_call=new_description,
+            description_scope=lambda _: "",
+            interactive_description_call=False,
+            skip_tf_fmt=True,
+        )
+    )
+    assert len(pools) == 1
+    assert output.changed_files == [tmp_path / "a/variables.tf", tmp_path / "b/outputs.tf"]
+    assert "description of cluster name" in (tmp_path / "b/outputs.tf").read_text()
+
+
 @pytest.mark.skipif(os.environ.get("TF_FILE", "") == "", reason="needs os.environ[TF_FILE]")
 def test_parsing_tf_file():
     file = Path(os.environ["TF_FILE"])
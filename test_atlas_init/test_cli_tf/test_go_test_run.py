@@ -14,11 +14,15 @@ from atlas_init.cli_tf.go_test_run import (
 
 from atlas_init.cli_tf.go_test_tf_error import (
     CheckError,
+    ErrorRuleMatcher,
     GoTestAPIError,
+    GoTestErrorClass,
     GoTestGeneralCheckError,
     GoTestResourceCheckError,
+    load_error_rule_matcher,
     parse_error_details,
 )
+from atlas_init.cli_tf.keyword_matcher import KeywordMatcher
 from zero_3rdparty.datetime_utils import utc_now
 
 logger = logging.getLogger(__name__)
@@ -318,3 +322,29 @@ def test_extract_error_details(test_name, expected_details):
 
 def dummy_run(logs_str: str, name: str):
     return GoTestRun(name=name, output_lines=logs_str.splitlines(), ts=utc_now())
+
+
+def test_keyword_matcher_finds_overlapping_keywords():
+    matcher = KeywordMatcher(["timeout", "time", "out", "i/o", "missing"])
+    assert matcher.first_positions("dial: i/o timeout") == {"i/o": 6, "time": 10, "timeout": 10, "out": 14}
+
+
+def test_error_rule_matcher(tmp_path):
+    output = "Error: POST HTTP 500 (request UNEXPECTED_ERROR)\ntimeout while waiting for state"
+    assert GoTestErrorClass.auto_classification(output) == GoTestErrorClass.FLAKY_500
+    assert GoTestErrorClass.auto_classification("words of HTTP in any 500 order") == GoTestErrorClass.FLAKY_500
+    assert GoTestErrorClass.auto_classification("HTTP 400") is None
+    hits = ErrorRuleMatcher.from_contains_mapping().hits(output)
+    assert [(hit.error_class, hit.rule.contains) for hit in hits] == [
+        (GoTestErrorClass.FLAKY_500, "HTTP 500"),
+        (GoTestErrorClass.FLAKY_500, "UNEXPECTED_ERROR"),
+        (GoTestErrorClass.TIMEOUT, "timeout while waiting for"),
+    ]
+    assert hits[0].positions == {"HTTP": 12, "500": 17}
+    assert hits[0].position == 12
+
+    rules_path = tmp_path / "error_rules.yaml"
+    assert load_error_rule_matcher(rules_path).first_hit("HTTP 400") is None
+    rules_path.write_text("rules:\n  - error_class: flaky_400\n    contains: HTTP 400\n")
+    matcher = load_error_rule_matcher(rules_path)
+    assert GoTestErrorClass.auto_classification("HTTP 400", matcher) == GoTestErrorClass.FLAKY_400
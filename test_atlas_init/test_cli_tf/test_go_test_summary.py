@@ -0,0 +1,236 @@
+from datetime import timedelta
+from tempfile import TemporaryFile
+from types import SimpleNamespace
+
+import pytest
+from zero_3rdparty.datetime_utils import utc_now
+
+from atlas_init.cli_tf.go_test_run import GoTestRun, GoTestStatus
+from atlas_init.cli_tf import go_test_summary
+from atlas_init.cli_tf.go_test_summary import (
+    DailyReportIn,
+    ErrorRowColumns,
+    MarkdownReportStream,
+    MonthlyReportIn,
+    RunHistoryFilter,
+    TFCITestOutput,
+    markdown_table_lines,
+    write_daily_report,
+    write_monthly_reports,
+)
+from atlas_init.cli_tf.go_test_tf_error import (
+    ErrorClassAuthor,
+    GoTestDefaultError,
+    GoTestError,
+    GoTestErrorClass,
+    GoTestErrorClassification,
+)
+from atlas_init.html_out.md_export import MonthlyReportPaths
+
+
+def _runs(*statuses: GoTestStatus) -> list[GoTestRun]:
+    now = utc_now()
+    return [GoTestRun(name="TestAcc", status=status, ts=now - timedelta(days=i)) for i, status in enumerate(statuses)]
+
+
+def _rows() -> list[go_test_summary.TestRow]:
+    return [
+        go_test_summary.TestRow(
+            group_name="cluster",
+            package_url="cluster",
+            full_name="cluster/TestAccCluster_basic",
+            test_name="TestAccCluster_basic",
+            error_classes=[],
+            details_summary="[FAIL](details.md)",
+            last_env_runs={"dev": _runs(GoTestStatus.FAIL, GoTestStatus.PASS), "qa": _runs(GoTestStatus.PASS)},
+        ),
+        go_test_summary.TestRow(
+            group_name="project",
+            package_url="project",
+            full_name="project/TestAccProject_basic",
+            test_name="TestAccProject_basic",
+            error_classes=[],
+            details_summary="",
+            last_env_runs={"qa": _runs(GoTestStatus.FAIL), "prod": []},
+        ),
+    ]
+
+
+def _modify_details(row: go_test_summary.TestRow, values: dict[str, str]) -> dict[str, str]:
+    assert f"{ErrorRowColumns.PASS_RATE} (prod)" in values, "all columns are passed to the row_modifier"
+    return values | {ErrorRowColumns.DETAILS_SUMMARY: f"modified {row.test_name}"}
+
+
+def test_markdown_report_stream_matches_in_memory_report(tmp_path):
+    rows = _rows()
+    skip_columns = {ErrorRowColumns.TIME_SINCE_PASS}
+    columns = ErrorRowColumns.column_names(rows, skip_columns)
+    expected = "\n".join(
+        [
+            f"# Report {len(rows)}",
+            *markdown_table_lines("Test Run Table", rows, columns, lambda row: row.as_row(columns)),
+        ]
+    )
+    all_rows = MarkdownReportStream(
+        path=tmp_path / "all.md",
+        table_header="Test Run Table",
+        title_lines=lambda count: [f"# Report {count}"],
+        skip_columns=skip_columns,
+    )
+    only_qa = MarkdownReportStream(
+        path=tmp_path / "qa.md",
+        table_header="Test Run Table",
+        title_lines=lambda count: [f"# Report {count}"],
+        include_row=lambda row: "dev" not in row.last_env_runs,
+        row_modifier=_modify_details,
+    )
+    empty = MarkdownReportStream(
+        path=tmp_path / "empty.md", table_header="Test Run Table", title_lines=lambda count: [f"No rows {count}"]
+    )
+    for row in rows:
+        values = row.column_values()
+        all_rows.add(row, values)
+        only_qa.add(row, values)
+    assert all_rows.finish().read_text() == expected
+    assert only_qa.finish().read_text().splitlines()[-2:] == [
+        "---" + " | ---" * 7,
+        "project | TestAccProject_basic | No error classes | modified TestAccProject_basic | N/A | never run | 0.00% (1 runs) | never pass",
+    ]
+    assert empty.finish().read_text() == "No rows 0"
+
+
+def _env_run(name: str, status: GoTestStatus, days_ago: int, env: str = "dev") -> GoTestRun:
+    run = GoTestRun(name=name, status=status, ts=utc_now() - timedelta(days=days_ago))
+    run.package_url = "github.com/mongodb/terraform-provider-mongodbatlas/internal/service/cluster"
+    run.env = env
+    run.run_seconds = 1.0
+    run.branch = "master"
+    return run
+
+
+class _FakeDao:
+    def __init__(self, runs: list[GoTestRun]):
+        self.runs = runs
+
+    async def read_tf_tests_for_day(self, branch, day) -> list[GoTestRun]:
+        return [run for run in self.runs if run.ts.date() == self.runs[0].ts.date()]
+
+    async def read_run_history(self, *, test_name: str, **_) -> list[GoTestRun]:
+        return [run for run in self.runs if run.name == test_name]
+
+    async def read_error_classifications(self, run_ids) -> dict:
+        return {}
+
+
+@pytest.fixture()
+def fake_dao(monkeypatch) -> _FakeDao:
+    dao = _FakeDao([])
+
+    async def init_mongo_dao(_):
+        return dao
+
+    monkeypatch.setattr(go_test_summary, "init_mongo_dao", init_mongo_dao)
+    return dao
+
+
+_settings = SimpleNamespace(github_ci_summary_details_rel_path=lambda summary, name: f"{summary}/{name}.md")
+
+
+def _history_filter() -> RunHistoryFilter:
+    return RunHistoryFilter(run_history_start=utc_now() - timedelta(days=30), run_history_end=utc_now())
+
+
+def _monthly_in(tmp_path) -> MonthlyReportIn:
+    paths = MonthlyReportPaths(
+        summary_path=tmp_path / "monthly.md",
+        error_only_path=tmp_path / "monthly_error-only.md",
+        details_dir=tmp_path / "monthly_details",
+        summary_name="monthly",
+        daily_path=tmp_path / "monthly_daily.md",
+    )
+    return MonthlyReportIn(name="monthly", branch="master", history_filter=_history_filter(), report_paths=paths)
+
+
+def test_write_monthly_reports(tmp_path, fake_dao):
+    fake_dao.runs = [
+        _env_run("TestAccCluster_basic", GoTestStatus.FAIL, 0),
+        _env_run("TestAccCluster_basic", GoTestStatus.PASS, 1),
+        _env_run("TestAccCluster_import", GoTestStatus.PASS, 0, env="qa"),
+    ]
+    event = _monthly_in(tmp_path)
+    stale_details = event.report_paths.details_dir / "stale.md"
+    stale_details.parent.mkdir()
+    stale_details.write_text("stale")
+    summary_path, error_only_path = write_monthly_reports(_settings, event)
+    summary_lines = summary_path.read_text().splitlines()
+    assert "Found 2 unique Tests" in summary_lines[0]
+    assert summary_lines[-1].startswith("cluster | TestAccCluster_import | No error classes | [PASS]")
+    assert summary_lines[-1].endswith(f"N/A | never passed | always | {utc_now():%Y-%m-%d}")
+    error_only_lines = error_only_path.read_text().splitlines()
+    assert "Found 1 unique Tests" in error_only_lines[0]
+    assert error_only_lines[-1].startswith("cluster | TestAccCluster_basic | No error classes")
+    assert "50.00% (2 runs)" in error_only_lines[-1]
+    assert sorted(path.name for path in event.report_paths.details_dir.rglob("*.md")) == [
+        "TestAccCluster_basic.md",
+        "TestAccCluster_import.md",
+    ]
+
+
+def test_write_monthly_reports_without_tests_keeps_existing_details(tmp_path, fake_dao, monkeypatch):
+    spools = []
+
+    def temporary_file(mode: str):
+        spools.append(spool := TemporaryFile(mode))
+        return spool
+
+    monkeypatch.setattr(go_test_summary, "TemporaryFile", temporary_file)
+    fake_dao.runs = [_env_run("TestAccCluster_basic", GoTestStatus.SKIP, 0)]
+    event = _monthly_in(tmp_path)
+    event.skip_rows = [MonthlyReportIn.skip_skipped]
+    existing_details = event.report_paths.details_dir / "existing.md"
+    existing_details.parent.mkdir()
+    existing_details.write_text("existing")
+    with pytest.raises(AssertionError, match="No error rows found"):
+        write_monthly_reports(_settings, event)
+    assert existing_details.read_text() == "existing"
+    assert not (tmp_path / ".monthly_details.tmp").exists()
+    assert len(spools) == 2
+    assert all(spool.closed for spool in spools)
+
+
+def _add_link(row: go_test_summary.TestRow, values: dict[str, str]) -> dict[str, str]:
+    return values | {
+        ErrorRowColumns.DETAILS_SUMMARY: f"[{values[ErrorRowColumns.DETAILS_SUMMARY]}]({row.test_name}.md)"
+    }
+
+
+def test_write_daily_report(tmp_path, fake_dao):
+    failed = _env_run("TestAccCluster_basic", GoTestStatus.FAIL, 0)
+    details = GoTestDefaultError(error_str="boom")
+    fake_dao.runs = [failed, _env_run("TestAccCluster_basic", GoTestStatus.PASS, 1)]
+    output = TFCITestOutput(
+        found_tests=[failed],
+        found_errors=[GoTestError(details=details, run=failed)],
+        classified_errors=[
+            GoTestErrorClassification(
+                error_class=GoTestErrorClass.FLAKY_400,
+                author=ErrorClassAuthor.HUMAN,
+                details=details,
+                run_id=failed.id,
+                test_name=failed.name,
+            )
+        ],
+    )
+    event = DailyReportIn(report_date=utc_now(), history_filter=_history_filter(), row_modifier=_add_link)
+    daily_lines = write_daily_report(output, _settings, event, tmp_path / "daily.md").read_text().splitlines()
+    assert daily_lines[0] == f"# Daily Report on {utc_now():%Y-%m-%d}"
+    assert daily_lines[-1].startswith(
+        "cluster | TestAccCluster_basic | flaky_400 | [](TestAccCluster_basic.md) | 50.00% (2 runs)"
+    )
+
+
+def test_write_daily_report_all_passed(tmp_path, fake_dao):
+    output = TFCITestOutput(found_tests=[_env_run("TestAccCluster_basic", GoTestStatus.PASS, 0)])
+    event = DailyReportIn(report_date=utc_now(), history_filter=_history_filter())
+    daily_text = write_daily_report(output, _settings, event, tmp_path / "daily.md").read_text()
+    assert daily_text.startswith("🎉All tests passed")
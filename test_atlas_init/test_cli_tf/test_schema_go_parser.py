@@ -68,3 +68,48 @@ def test_go_parser(go_schema_paths):
     first, *_, last = absolute_paths
     assert first == "accept_data_risks_and_force_replica_set_reconfig"
     assert last == "version_release_system"
+
+
+_go_schema = """package cluster
+
+func ResourceSchema(ctx context.Context) schema.Schema {
+	zoneAttr = schema.StringAttribute{
+		Computed: true,
+	}
+	return schema.Schema{
+		Attributes: map[string]schema.Attribute{
+			"replication_specs": schema.ListNestedAttribute{
+				Required: true,
+				NestedObject: schema.NestedAttributeObject{
+					Attributes: map[string]schema.Attribute{
+						"zone_name": &zoneAttr,
+						"electable_specs": specsSchema(true),
+					},
+				},
+			},
+			"read_only_specs": specsSchema(false),
+		},
+	}
+}
+
+func specsSchema(required bool) schema.SingleNestedAttribute {
+	return schema.SingleNestedAttribute{
+		Attributes: map[string]schema.Attribute{
+			"instance_size": schema.StringAttribute{
+				Optional: true,
+			},
+		},
+	}
+}
+"""
+
+
+def test_go_parser_resolves_references_and_functions():
+    attributes, functions = parse_schema_functions(_go_schema)
+    by_name = {a.name: a for a in attributes}
+    assert by_name["zone_name"].start_end == (4, 6)
+    assert by_name["zone_name"].attr_ref_line.attr_ref == "zoneAttr"
+    assert by_name["electable_specs"].start_end == (23, 31)
+    assert by_name["electable_specs"].attribute_path == "replication_specs.electable_specs"
+    assert [func.name for func in functions] == ["", "specsSchema"]
+    assert [a.name for a in functions[1].attributes] == ["instance_size"]
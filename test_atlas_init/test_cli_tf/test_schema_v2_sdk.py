@@ -1,7 +1,7 @@
 import pytest
 
 from atlas_init.cli_tf.schema_v2 import SchemaV2, SDKModelExample
-from atlas_init.cli_tf.schema_v2_sdk import generate_model_go, parse_sdk_model
+from atlas_init.cli_tf.schema_v2_sdk import SDKModelIndex, generate_model_go, load_sdk_model_index, parse_sdk_model
 
 
 def test_parse_sdk_model(sdk_repo_path):
@@ -68,3 +68,46 @@ def test_model_go(sdk_repo_path, schema_with_api_info: SchemaV2, resource_name,
     sdk_model = parse_sdk_model(sdk_repo_path, schema.resources[resource_name].conversion.sdk_start_refs[0].name)
     actual = generate_model_go(schema, schema.resources[resource_name], sdk_model)
     file_regression.check(actual, basename=resource_name, extension=".go")
+
+
+_sdk_models = {
+    "api_atlas_resource_policy": """type ApiAtlasResourcePolicy struct {
+	CreatedByUser *ApiAtlasUserMetadata `json:"createdByUser,omitempty"`
+	Id *string `json:"id,omitempty"`
+	Links *[]Link `json:"links,omitempty"`
+	Policies *[]ApiAtlasPolicy `json:"policies,omitempty"`
+}
+""",
+    "api_atlas_user_metadata": """type ApiAtlasUserMetadata struct {
+	Id *string `json:"id,omitempty"`
+	Name *string `json:"name,omitempty"`
+}
+""",
+    "api_atlas_policy": """type ApiAtlasPolicy struct {
+	Body *string `json:"body,omitempty"`
+	CreatedByUser *ApiAtlasUserMetadata `json:"createdByUser,omitempty"`
+}
+""",
+}
+
+
+def test_sdk_model_index_parses_each_model_once(tmp_path):
+    admin_dir = tmp_path / "admin"
+    admin_dir.mkdir()
+    for name, go_code in _sdk_models.items():
+        (admin_dir / f"model_{name}.go").write_text(go_code)
+    index = SDKModelIndex.parse(tmp_path, version_key="v1", max_workers=2)
+    assert sorted(index.model_fields) == sorted(_sdk_models)
+    sdk_model = index.model("ApiAtlasResourcePolicy")
+    assert list(sdk_model.attributes) == ["CreatedByUser", "Id", "Policies"]
+    policies = sdk_model.attributes["Policies"]
+    assert sorted(policies.nested_attributes) == ["Body", "CreatedByUser"]
+    user = index.model("ApiAtlasUserMetadata")
+    assert policies.nested_attributes["CreatedByUser"].nested_attributes is user.attributes
+    assert sdk_model.attributes["CreatedByUser"].nested_attributes is user.attributes
+    with pytest.raises(FileNotFoundError):
+        index.model("Missing")
+
+    assert load_sdk_model_index(tmp_path, version_key="v1") is load_sdk_model_index(tmp_path, version_key="v1")
+    assert load_sdk_model_index(tmp_path, version_key="v2") is not load_sdk_model_index(tmp_path, version_key="v1")
+    assert parse_sdk_model(tmp_path, "ApiAtlasPolicy").attributes.keys() == {"Body", "CreatedByUser"}
@@ -0,0 +1,41 @@
+from atlas_init.crud.error_similarity import ErrorOutputIndex, normalize_error_output
+
+_project_missing = """\
+2025-06-05T00:30:13.8309411Z === RUN   TestAccProjectAPI_basic
+2025-06-05T00:30:13.8319161Z     resource_test.go:22: Step 1/3 error: Check failed: Check 4/4 error: project(6840e511161ca93c1f053d1a) does not exist
+2025-06-05T00:30:13.8320050Z --- FAIL: TestAccProjectAPI_basic (3.15s)"""
+_project_missing_other_run = """\
+2025-07-11T09:12:01.1209411Z === RUN   TestAccProjectAPI_basic
+2025-07-11T09:12:01.1219161Z     resource_test.go:22: Step 1/3 error: Check failed: Check 4/4 error: project(6870f522161ca93c1f0aaaaa) does not exist
+2025-07-11T09:12:01.1220050Z --- FAIL: TestAccProjectAPI_basic (12.01s)"""
+_timeout = """\
+2025-06-05T00:30:13.8309411Z === RUN   TestAccClusterRS_basic
+2025-06-05T00:30:13.8319161Z     resource_test.go:98: Error: timeout while waiting for state to become 'IDLE' (last state: 'CREATING', timeout: 3h0m0s)
+request_id: 3f2b1c7e-8a9d-4e5f-b6c7-d8e9f0a1b2c3
+2025-06-05T00:30:13.8320050Z --- FAIL: TestAccClusterRS_basic (10800.15s)"""
+
+
+def test_normalize_masks_run_specific_values():
+    assert normalize_error_output(_project_missing) == normalize_error_output(_project_missing_other_run)
+    normalized = normalize_error_output(_timeout)
+    assert "<uuid>" in normalized
+    assert "<ts>" in normalized
+    assert "3f2b1c7e" not in normalized
+
+
+def test_error_output_index_top_k():
+    index = ErrorOutputIndex()
+    index.add("r1", _project_missing)
+    index.add("r2", _timeout)
+    assert len(index) == 2
+    [best, *rest] = index.query(_project_missing_other_run, top_k=2)
+    assert best.doc_id == "r1"
+    assert best.score == 1.0
+    assert all(match.score < best.score for match in rest)
+    assert index.query(_project_missing_other_run, accept=lambda doc_id: doc_id != "r1", min_score=0.5) == []
+
+    index.add("r1", _timeout)
+    assert {match.doc_id for match in index.query(_timeout, min_score=0.9)} == {"r1", "r2"}
+    index.remove("r2")
+    assert "r2" not in index
+    assert [match.doc_id for match in index.query(_timeout)] == ["r1"]
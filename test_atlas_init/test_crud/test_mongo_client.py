@@ -207,6 +207,15 @@ async def test_classification_read_similar(mongo_dao: MongoDao, subtests):
         assert len(similars2) == 1
         _, c2_found = similars2.popitem()
         assert c2_check_details == c2_found
+    with subtests.test("read similar error output"):
+        c3_default = dummy_classification("r3", error_class=GoTestErrorClass.FLAKY_CHECK)
+        await mongo_dao.add_classification(c3_default)
+        other_run_logs = _example_logs.replace("6840e511161ca93c1f053d1a", "6870f522161ca93c1f0aaaaa")
+        similars3 = await mongo_dao.read_similar_error_classifications(GoTestDefaultError(error_str=other_run_logs))
+        assert list(similars3) == ["r3"]
+        [(similar, c3_found)] = await mongo_dao.search_similar_error_output(other_run_logs, top_k=1)
+        assert similar.score == 1.0
+        assert c3_found.error_class == GoTestErrorClass.FLAKY_CHECK
 
 
 @pytest.mark.asyncio()
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from zero_3rdparty.datetime_utils import utc_now
+
+from atlas_init.cli_tf.go_test_tf_error import (
+    ErrorClassAuthor,
+    GoTestDefaultError,
+    GoTestErrorClass,
+    GoTestErrorClassification,
+)
+from atlas_init.crud.mongo_dao import MongoDao, error_output
+from atlas_init.crud.mongo_utils import dump_with_id
+
+_project_missing = """\
+2025-06-05T00:30:13.8309411Z === RUN   TestAccProjectAPI_basic
+2025-06-05T00:30:13.8319161Z     resource_test.go:22: Step 1/3 error: Check failed: Check 4/4 error: project(6840e511161ca93c1f053d1a) does not exist
+2025-06-05T00:30:13.8320050Z --- FAIL: TestAccProjectAPI_basic (3.15s)"""
+_project_missing_other_run = """\
+2025-07-11T09:12:01.1209411Z === RUN   TestAccProjectAPI_basic
+2025-07-11T09:12:01.1219161Z     resource_test.go:22: Step 1/3 error: Check failed: Check 4/4 error: project(6870f522161ca93c1f0aaaaa) does not exist
+2025-07-11T09:12:01.1220050Z --- FAIL: TestAccProjectAPI_basic (12.01s)"""
+
+
+class _FakeClassifications:
+    """Just enough of a collection for the `MongoDao` classification reads and writes."""
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+
+    def insert(self, classification: GoTestErrorClassification) -> None:
+        self.docs[classification.run_id] = dump_with_id(classification, id=classification.run_id, dt_keys=["ts"])
+
+    async def replace_one(self, query: dict, raw: dict, upsert: bool):
+        is_new = raw["_id"] not in self.docs
+        self.docs[raw["_id"]] = raw
+        return SimpleNamespace(upserted_id=raw["_id"] if is_new else None)
+
+    async def find(self, query: dict):
+        min_ts = query.get("ts", {}).get("$gte")
+        for raw in list(self.docs.values()):
+            if min_ts is None or raw["ts"] >= min_ts:
+                yield dict(raw)
+
+
+def _classification(run_id: str, ts: datetime, error_str: str = "") -> GoTestErrorClassification:
+    return GoTestErrorClassification(
+        author=ErrorClassAuthor.HUMAN,
+        error_class=GoTestErrorClass.FLAKY_CHECK,
+        ts=ts,
+        run_id=run_id,
+        test_output=_project_missing,
+        details=GoTestDefaultError(error_str=error_str),
+        test_name="TestAccProjectAPI_basic",
+    )
+
+
+@pytest.fixture()
+def dao_and_collection(settings) -> tuple[MongoDao, _FakeClassifications]:
+    dao = MongoDao(settings=settings)
+    dao.__dict__["classifications"] = collection = _FakeClassifications()
+    return dao, collection
+
+
+def test_error_output_falls_back_to_test_output():
+    assert error_output(GoTestDefaultError(error_str=""), _project_missing) == _project_missing
+    assert error_output(GoTestDefaultError(error_str="boom"), _project_missing) == "boom"
+    assert error_output(GoTestDefaultError(error_str="")) == ""
+
+
+@pytest.mark.asyncio()
+async def test_read_similar_error_classifications_uses_error_output(dao_and_collection):
+    dao, collection = dao_and_collection
+    collection.insert(_classification("r1", utc_now()))
+    details = GoTestDefaultError(error_str="")
+    assert await dao.read_similar_error_classifications(details) == {}
+    similars = await dao.read_similar_error_classifications(details, test_output=_project_missing_other_run)
+    assert list(similars) == ["r1"]
+
+
+@pytest.mark.asyncio()
+async def test_add_classification_keeps_the_refresh_watermark(dao_and_collection):
+    dao, collection = dao_and_collection
+    now = utc_now()
+    collection.insert(_classification("r1", now))
+    await dao.refresh_error_output_index()
+    await dao.add_classification(_classification("r2", now + timedelta(hours=1)))
+    collection.insert(_classification("r3", now + timedelta(minutes=30)))  # written by another client
+    index = await dao.refresh_error_output_index()
+    assert all(run_id in index for run_id in ["r1", "r2", "r3"])
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from model_lib import dump
+from zero_3rdparty.datetime_utils import utc_now
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.cli_tf.go_test_run import GoTestRun
+from atlas_init.cli_tf.go_test_tf_error import GoTestDefaultError, GoTestError, GoTestErrorClass
+from atlas_init.crud.mongo_dao import (
+    TFErrors,
+    read_tf_error_by_run,
+    read_tf_errors,
+    tf_errors_path,
+    tf_errors_store_dir,
+)
+from atlas_init.crud.tf_error_store import TFErrorStore
+
+
+def _errors(count: int) -> list[GoTestError]:
+    now = utc_now()
+    return [
+        GoTestError(
+            details=GoTestDefaultError(error_str=f"error {i}"),
+            run=GoTestRun(name=f"test_run{i}", ts=now + timedelta(seconds=i), output_lines=[f"line {i}"] * 10),
+        )
+        for i in range(count)
+    ]
+
+
+def test_tf_error_store_appends_and_compacts(tmp_path):
+    root = tmp_path / "store"
+    errors = _errors(3)
+    store = TFErrorStore(root=root, min_compact_bytes=0)
+    store.put_many(errors)
+    assert store.get(errors[1].run_id) == errors[1]
+    assert store.get("unknown") is None
+
+    errors[1].set_human_and_bot_classification(GoTestErrorClass.FLAKY_400)
+    store.put_many([errors[1]])
+    assert store.dead_bytes > 0
+    reloaded = TFErrorStore(root=root, min_compact_bytes=0)
+    assert len(reloaded) == 3
+    assert reloaded.get(errors[1].run_id) == errors[1]
+    assert sorted(reloaded.read_all()) == errors
+
+    for _ in range(3):
+        reloaded.put_many([errors[0]])
+    assert [path.name for path in sorted(root.iterdir())] == ["000001.idx", "000001.jsonl"]
+    reloaded.compact()
+    assert reloaded.dead_bytes == 0
+    assert [path.name for path in sorted(root.iterdir())] == ["000002.idx", "000002.jsonl"]
+    assert sorted(TFErrorStore(root=root).read_all()) == errors
+
+
+def test_tf_errors_yaml_migration(settings):
+    errors = _errors(2)
+    legacy_path = tf_errors_path(settings)
+    ensure_parents_write_text(legacy_path, dump(TFErrors(errors=errors), "yaml"))
+    assert read_tf_error_by_run(settings, errors[0].run) == errors[0]
+    assert not legacy_path.exists()
+    assert legacy_path.with_name("tf_errors.migrated.yaml").exists()
+    assert read_tf_errors(settings).errors == errors
+    assert len(TFErrorStore(root=tf_errors_store_dir(settings))) == 2
@@ -1,9 +1,13 @@
 from datetime import timedelta
 from zero_3rdparty.datetime_utils import utc_now
 from atlas_init.cli_tf.go_test_run import GoTestRun
-from atlas_init.cli_tf.go_test_tf_error import GoTestDefaultError, GoTestError, GoTestErrorClass
+from atlas_init.cli_tf.go_test_tf_error import GoTestAPIError, GoTestDefaultError, GoTestError, GoTestErrorClass
 from atlas_init.crud.mongo_dao import (
+    TFErrors,
+    look_for_existing_classifications,
+    open_tf_error_store,
     read_tf_error_by_run,
+    read_tf_error_fingerprint_index,
     read_tf_errors,
     store_or_update_tf_errors,
 )
@@ -50,3 +54,61 @@ def test_tf_errors(settings, subtests):
             GoTestErrorClass.FLAKY_400,
             GoTestErrorClass.FLAKY_400,
         )
+
+
+def _api_error(run_name: str, api_path: str, ts_offset: int = 0) -> GoTestError:
+    details = GoTestAPIError(
+        api_error_code_str="UNEXPECTED_ERROR",
+        api_path=api_path,
+        api_method="DELETE",
+        api_response_code=500,
+    )
+    details.api_path_normalized = "/api/atlas/v2/groups/{groupId}/backupCompliancePolicy"
+    return GoTestError(details=details, run=GoTestRun(name=run_name, ts=utc_now() + timedelta(seconds=ts_offset)))
+
+
+def test_tf_errors_fingerprint_index(settings):
+    classified = _api_error("test_run1", "/api/atlas/v2/groups/680ecbbe1ad7050ec5b1ebe3/backupCompliancePolicy")
+    classified.set_human_and_bot_classification(GoTestErrorClass.FLAKY_500)
+    other_group = _api_error("test_run2", "/api/atlas/v2/groups/123/backupCompliancePolicy", ts_offset=1)
+    assert classified.fingerprint
+    assert classified.fingerprint == other_group.fingerprint
+    assert classified.match(other_group)
+    unrelated = GoTestError(details=GoTestDefaultError(error_str="boom"), run=GoTestRun(name="test_run3", ts=utc_now()))
+    assert unrelated.fingerprint == ""
+
+    store_or_update_tf_errors(settings, [classified, unrelated])
+    expected = (GoTestErrorClass.FLAKY_500, GoTestErrorClass.FLAKY_500)
+    assert read_tf_errors(settings).look_for_existing_classifications(other_group) == expected
+    assert read_tf_errors(settings).look_for_existing_classifications(unrelated) is None
+    index = read_tf_error_fingerprint_index(settings)
+    assert index.look_for_existing_classifications(other_group) == expected
+    assert index.look_for_existing_classifications(unrelated) is None
+    assert look_for_existing_classifications(settings, other_group) == expected
+
+
+def test_tf_errors_index_follows_replaced_errors():
+    error = _api_error("test_run1", "/api/atlas/v2/groups/123/backupCompliancePolicy")
+    other_group = _api_error("test_run2", "/api/atlas/v2/groups/456/backupCompliancePolicy", ts_offset=1)
+    errors = TFErrors(errors=[error])
+    assert errors.look_for_existing_classifications(other_group) is None
+    classified = error.model_copy(deep=True)
+    classified.set_human_and_bot_classification(GoTestErrorClass.FLAKY_500)
+    errors.errors[0] = classified
+    assert errors.look_for_existing_classifications(other_group) == (
+        GoTestErrorClass.FLAKY_500,
+        GoTestErrorClass.FLAKY_500,
+    )
+
+
+def test_tf_error_fingerprint_index_rebuilt_when_stale(settings):
+    error = _api_error("test_run1", "/api/atlas/v2/groups/123/backupCompliancePolicy")
+    other_group = _api_error("test_run2", "/api/atlas/v2/groups/456/backupCompliancePolicy", ts_offset=1)
+    store_or_update_tf_errors(settings, [error])
+    assert look_for_existing_classifications(settings, other_group) is None
+    error.set_human_and_bot_classification(GoTestErrorClass.FLAKY_500)
+    open_tf_error_store(settings).put_many([error])  # bypasses the index update
+    assert look_for_existing_classifications(settings, other_group) == (
+        GoTestErrorClass.FLAKY_500,
+        GoTestErrorClass.FLAKY_500,
+    )
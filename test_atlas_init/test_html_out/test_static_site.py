@@ -0,0 +1,40 @@
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.html_out.md_export import index_md_from_names
+from atlas_init.html_out.static_site import SITE_MANIFEST_FILENAME, SiteManifest, publish_static_pages
+
+
+def test_publish_static_pages_renders_only_changed_pages(tmp_path):
+    docs_dir = tmp_path / "docs"
+    site_dir = tmp_path / "site"
+    summary = docs_dir / "2025-06-26.md"
+    details = docs_dir / "2025-06-26_details" / "TestAccCluster.md"
+    ensure_parents_write_text(
+        summary,
+        "# Summary 2025-06-26\n\n| Test | Status |\n| --- | --- |\n| [cluster](2025-06-26_details/TestAccCluster.md#error-1) | FAIL |\n",
+    )
+    ensure_parents_write_text(details, "# Error 1\n\nfailed")
+
+    written = publish_static_pages(docs_dir, site_dir, [summary, details], index_md_from_names)
+    assert written == [
+        site_dir / "2025-06-26.html",
+        site_dir / "2025-06-26_details/TestAccCluster.html",
+        site_dir / "index.html",
+    ]
+    summary_html = (site_dir / "2025-06-26.html").read_text()
+    assert '<a href="2025-06-26_details/TestAccCluster.html#error-1">' in summary_html
+    assert "<table>" in summary_html
+    assert '<h1 id="error-1">Error 1</h1>' in (site_dir / "2025-06-26_details/TestAccCluster.html").read_text()
+    assert '<a href="./2025-06-26.html">2025-06-26</a>' in (site_dir / "index.html").read_text()
+
+    next_day = docs_dir / "2025-06-27.md"
+    ensure_parents_write_text(next_day, "# Summary 2025-06-27")
+    written = publish_static_pages(docs_dir, site_dir, [summary, details, next_day], index_md_from_names)
+    assert written == [site_dir / "2025-06-27.html", site_dir / "index.html"]
+    index_md = (docs_dir / "index.md").read_text()
+    assert index_md.index("2025-06-27") < index_md.index("2025-06-26")
+    assert list(SiteManifest.load(site_dir / SITE_MANIFEST_FILENAME).pages) == [
+        "2025-06-26.md",
+        "2025-06-26_details/TestAccCluster.md",
+        "2025-06-27.md",
+    ]
@@ -0,0 +1,78 @@
+import json
+from datetime import date
+from io import StringIO
+
+from model_lib import dump, parse_payload
+
+from atlas_init.sdk_ext.go import dump_openapi_yaml, transform_openapi
+
+
+def _content(*versions: str) -> dict:
+    return {
+        f"application/vnd.atlas.{version}+json": {"schema": {"$ref": f"#/components/schemas/Model{version}"}}
+        for version in versions
+    }
+
+
+def _spec() -> dict:
+    return {
+        "openapi": "3.0.1",
+        "info": {"title": "MongoDB Atlas Administration API", "version": "2.0"},
+        "paths": {
+            "/api/atlas/v2/groups/{groupId}/clusters": {
+                "parameters": [{"$ref": "#/components/parameters/groupId"}],
+                "get": {
+                    "description": "multi line\ndescription: with 'quotes'",
+                    "responses": {
+                        "200": {"description": "OK", "content": _content("2023-01-01", "2024-08-05", "2023-02-01")},
+                        "400": {"$ref": "#/components/responses/badRequest"},
+                    },
+                },
+                "post": {
+                    "requestBody": {"content": _content("2023-01-01", "2024-10-23")},
+                    "responses": {"201": {"description": "Created", "content": _content("2024-10-23")}},
+                },
+            },
+            "/api/atlas/v2/groups/{groupId}/alerts/{alertId}": {
+                "patch": {"responses": {"200": {"content": {"application/json": {"x-xgen-version": "2023-01-01"}}}}}
+            },
+        },
+        "components": {"schemas": {"Model": {"type": "object", "properties": {"enabled": {"type": "boolean"}}}}},
+        "tags": [{"name": "Clusters"}],
+    }
+
+
+def test_transform_openapi_keeps_latest_version(tmp_path):
+    src = tmp_path / "openapi-mms.json"
+    src.write_text(json.dumps(_spec()))
+    dest = transform_openapi(src, tmp_path / "sdk/openapi/openapi-mms.yaml")
+    paths = parse_payload(dest)["paths"]  # type: ignore
+    clusters = paths["/api/atlas/v2/groups/{groupId}/clusters"]
+    assert list(clusters["get"]["responses"]["200"]["content"]) == ["application/vnd.atlas.2024-08-05+json"]
+    assert clusters["get"]["responses"]["400"] == {"$ref": "#/components/responses/badRequest"}
+    assert list(clusters["post"]["requestBody"]["content"]) == ["application/vnd.atlas.2024-10-23+json"]
+    assert list(clusters["post"]["responses"]["201"]["content"]) == ["application/vnd.atlas.2024-10-23+json"]
+    assert (
+        paths["/api/atlas/v2/groups/{groupId}/alerts/{alertId}"]
+        == _spec()["paths"]["/api/atlas/v2/groups/{groupId}/alerts/{alertId}"]
+    )
+
+
+def test_dump_openapi_yaml_matches_dump():
+    spec = _spec()
+    stream = StringIO()
+    dump_openapi_yaml(spec, stream)
+    assert stream.getvalue() == dump(spec, "yaml")
+
+
+def test_dump_openapi_yaml_bytes_match_dump_with_dates_multiline_and_non_ascii():
+    spec = _spec()
+    clusters = spec["paths"]["/api/atlas/v2/groups/{groupId}/clusters"]
+    clusters["get"]["x-sunset"] = "2025-06-01"
+    clusters["get"]["x-released"] = date(2023, 1, 1)
+    clusters["get"]["summary"] = "Übersicht der Cluster – 東京 ✅"
+    clusters["post"]["description"] = "first line\n\n  indented second line\nlast line with trailing space \n"
+    spec["info"]["description"] = "Zürich: naïve café\r\nwindows line ending"
+    stream = StringIO()
+    dump_openapi_yaml(spec, stream)
+    assert stream.getvalue().encode() == dump(spec, "yaml").encode()
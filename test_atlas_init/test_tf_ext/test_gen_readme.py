@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.tf_ext import gen_readme
+from atlas_init.tf_ext.gen_readme import (
+    README_MANIFEST_FILENAME,
+    ReadmeManifest,
+    ReadmeMarkers,
+    find_readme_module_dirs,
+    generate_and_write_readmes,
+)
+
+
+def _add_module(modules_dir: Path, name: str) -> Path:
+    module_dir = modules_dir / name
+    ensure_parents_write_text(module_dir / "README.md", ReadmeMarkers.example_boilerplate())
+    ensure_parents_write_text(module_dir / "main.tf", f'resource "null_resource" "{name}" {{}}\n')
+    ensure_parents_write_text(module_dir / "examples/01_basic/main.tf", f'module "{name}" {{\n  source = "../.."\n}}\n')
+    ensure_parents_write_text(module_dir / "examples/01_basic/README.md", "example readme")
+    return module_dir
+
+
+def test_generate_and_write_readmes_skips_unchanged_modules(tmp_path, monkeypatch):
+    commands: list[tuple[str, Path]] = []
+
+    def fake_run_and_wait(command: str, cwd: Path, **_):
+        commands.append((command, cwd))
+
+    monkeypatch.setattr(gen_readme, "run_and_wait", fake_run_and_wait)
+    module_a = _add_module(tmp_path, "module_a")
+    module_b = _add_module(tmp_path, "module_b")
+    module_dirs = find_readme_module_dirs(tmp_path)
+    assert module_dirs == [module_a, module_b]
+
+    assert generate_and_write_readmes(module_dirs) == module_dirs
+    fmt_commands = [cwd for command, cwd in commands if command.startswith("terraform fmt")]
+    assert fmt_commands == [tmp_path]
+    assert sum(command.startswith("terraform-docs") for command, _ in commands) == 2
+    readme_a = (module_a / "README.md").read_text()
+    assert 'resource "null_resource" "module_a"' not in readme_a
+    assert 'module "module_a"' in readme_a
+    manifest = ReadmeManifest.load(tmp_path / README_MANIFEST_FILENAME)
+    assert list(manifest.modules) == ["module_a", "module_b"]
+
+    commands.clear()
+    assert generate_and_write_readmes(module_dirs) == []
+    assert commands == []
+
+    ensure_parents_write_text(module_b / "examples/02_other/main.tf", 'module "other" {\n  source = "../.."\n}\n')
+    assert generate_and_write_readmes(module_dirs) == [module_b]
+    assert [cwd for command, cwd in commands if command.startswith("terraform fmt")] == [module_b]
+    assert "02_other" in (module_b / "README.md").read_text()
+
+    (module_a / "README.md").write_text(ReadmeMarkers.example_boilerplate())
+    assert generate_and_write_readmes(module_dirs) == [module_a]
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import json
 import logging
+import subprocess
+import sys
+import time
 
 import pytest
 from model_lib import dump, parse_model
@@ -8,13 +12,19 @@ from zero_3rdparty.file_utils import copy, ensure_parents_write_text
 
 from atlas_init.tf_ext.constants import ATLAS_PROVIDER_NAME
 from atlas_init.tf_ext.gen_examples import generate_module_examples
-from atlas_init.tf_ext.gen_resource_main import format_tf_content, generate_resource_main
+from atlas_init.tf_ext.gen_resource_main import (
+    data_external,
+    format_tf_content,
+    generate_resource_main,
+    resource_declare_direct,
+)
 from atlas_init.tf_ext.gen_resource_output import generate_resource_output
 from atlas_init.tf_ext.gen_resource_variables import generate_module_variables
 from atlas_init.tf_ext.models_module import ModuleGenConfig, ResourceGenConfig, ResourceTypePythonModule
 from atlas_init.tf_ext.provider_schema import ResourceSchema, parse_provider_resource_schema
 from atlas_init.tf_ext.schema_to_dataclass import (
     convert_and_format,
+    fast_validator_code,
     import_resource_type_python_module,
 )
 
@@ -213,3 +223,102 @@ def test_create_output_tf(file_regression, generated_dataclass_path):
         python_module, ModuleGenConfig(resources=[ResourceGenConfig(name=resource_type)])
     )
     file_regression.check(output_code, extension=".tf", basename=f"{resource_type}_output")
+
+
+_validator_inputs = {
+    "mongodbatlas_advanced_cluster": {
+        "project_id": "p1",
+        "name": "cluster",
+        "cluster_type": "REPLICASET",
+        "backup_enabled": True,
+        "tags": {"team": "atlas"},
+        "replication_specs": [
+            {
+                "region_configs": [
+                    {
+                        "provider_name": "AWS",
+                        "region_name": "US_EAST_1",
+                        "priority": 7,
+                        "electable_specs": {"instance_size": "M10", "node_count": 3},
+                    }
+                ]
+            }
+        ],
+    },
+    "mongodbatlas_cloud_backup_schedule": {
+        "project_id": "p1",
+        "cluster_name": "cluster",
+        "policy_item_daily": [{"frequency_interval": 1, "retention_unit": "days", "retention_value": 7}],
+        "copy_settings": [{"cloud_provider": "AWS", "frequencies": ["DAILY"]}],
+    },
+}
+
+
+def _run_program(args: list[str], query: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, *args], input=json.dumps(query), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize("resource_type", sorted(_validator_inputs))
+def test_fast_validator_same_output_as_dataclass_main(resource_type: str, generated_dataclass_path, tmp_path):
+    """Also a benchmark of the external data source for a module with 50 instances."""
+    dataclass_path = generated_dataclass_path(resource_type)
+    config = ModuleGenConfig(resources=[ResourceGenConfig(name=resource_type)], fast_validator=True)
+    validator_path = tmp_path / f"{resource_type}_validator.py"
+    validator_path.write_text(fast_validator_code(resource_type, dataclass_path.read_text(), config))
+    query = {"input_json": json.dumps(_validator_inputs[resource_type])}
+    start = time.perf_counter()
+    expected = _run_program([str(dataclass_path)], query)
+    dataclass_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    assert _run_program(["-S", str(validator_path)], query) == expected
+    validator_seconds = time.perf_counter() - start
+    instances = {f"instance-{i}": _validator_inputs[resource_type] for i in range(50)}
+    start = time.perf_counter()
+    batch_output = _run_program(["-S", str(validator_path)], {"inputs_json": json.dumps(instances)})
+    batch_seconds = time.perf_counter() - start
+    assert {key: json.loads(output) for key, output in batch_output.items()} == {key: expected for key in instances}
+    logger.info(
+        f"{resource_type} estimated for 50 instances: dataclass {dataclass_seconds * 50:.2f}s, "
+        f"fast validator {validator_seconds * 50:.2f}s, batched {batch_seconds:.2f}s"
+    )
+
+
+def test_fast_validator_reports_errors(generated_dataclass_path, tmp_path):
+    resource_type = "mongodbatlas_cloud_backup_schedule"
+    config = ModuleGenConfig(resources=[ResourceGenConfig(name=resource_type)], fast_validator=True)
+    validator_path = tmp_path / f"{resource_type}_validator.py"
+    validator_path.write_text(
+        fast_validator_code(resource_type, generated_dataclass_path(resource_type).read_text(), config)
+    )
+    invalid = {"project_id": "p1", "unknown": 1, "policy_item_daily": [{"retention_unit": "days"}], "export": {}}
+    output = _run_program(["-S", str(validator_path)], {"input_json": json.dumps(invalid)})
+    assert output["error_message"].splitlines() == [
+        "Resource: unexpected attributes unknown",
+        "export: expected a list, got dict",
+    ]
+    assert json.loads(output["policy_item_daily"])[0]["frequency_interval"] is None
+
+
+def test_data_external_uses_fast_validator_only_without_hooks(generated_dataclass_path, dataclass_manual_path):
+    resource_type = "mongodbatlas_advanced_cluster"
+    config = ModuleGenConfig(resources=[ResourceGenConfig(name=resource_type)], fast_validator=True)
+    python_module = _import_resource_type_dataclass(resource_type, generated_dataclass_path)
+    assert f'["python3", "-S", "${{path.module}}/{resource_type}_validator.py"]' in data_external(python_module, config)
+    custom_module = import_resource_type_python_module(resource_type, dataclass_manual_path(ADV_CLUSTER_CUSTOM))
+    assert f'["python3", "${{path.module}}/{resource_type}.py"]' in data_external(custom_module, config)
+
+
+def test_skip_python_if_simple_declares_resource_directly(generated_dataclass_path, dataclass_manual_path):
+    resource_type = "mongodbatlas_advanced_cluster"
+    config = ModuleGenConfig(resources=[ResourceGenConfig(name=resource_type)], skip_python_if_simple=True)
+    python_module = _import_resource_type_dataclass(resource_type, generated_dataclass_path)
+    assert not config.uses_python(python_module)
+    custom_module = import_resource_type_python_module(resource_type, dataclass_manual_path(ADV_CLUSTER_CUSTOM))
+    assert config.uses_python(custom_module)
+    resource_hcl = resource_declare_direct(python_module, config.resource_config(resource_type), validate_required=True)
+    assert resource_hcl.count("precondition {") == len(python_module.resource.REQUIRED_ATTRIBUTES)  # type: ignore
+    assert 'condition     = var.project_id != null\n      error_message = "project_id is required"' in resource_hcl
+    assert "  project_id = var.project_id" in resource_hcl
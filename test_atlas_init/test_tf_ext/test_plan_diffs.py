@@ -0,0 +1,115 @@
+from model_lib import dump
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.tf_ext.plan_diffs import (
+    ExamplePlanCheck,
+    PlanOutput,
+    diff_plan_output,
+    diff_values,
+    resource_type_name_filename,
+)
+from atlas_init.tf_ext.tf_mod_gen import dump_plan_diff
+
+_cluster_values = {
+    "name": "my-cluster",
+    "replication_specs": [
+        {
+            "zone_name": "Zone 1",
+            "region_configs": [{"priority": 7, "region_name": "US_EAST_1", "electable_specs": {"node_count": 3}}],
+        }
+    ],
+    "tags": {"env": "dev"},
+}
+
+
+def _plan_output(values: dict) -> PlanOutput:
+    resource = {
+        "address": "module.cluster.mongodbatlas_advanced_cluster.this",
+        "mode": "managed",
+        "type": "mongodbatlas_advanced_cluster",
+        "name": "this",
+        "provider_name": "registry.terraform.io/mongodb/mongodbatlas",
+        "schema_version": 1,
+        "values": values,
+        "sensitive_values": {},
+    }
+    return PlanOutput.model_validate(
+        {
+            "planned_values": {"root_module": {"child_modules": [{"resources": [resource]}]}},
+            "format_version": "1.2",
+            "terraform_version": "1.9.0",
+            "variables": {},
+            "configuration": {},
+        }
+    )
+
+
+def _example_check() -> ExamplePlanCheck:
+    resource = {"type": "mongodbatlas_advanced_cluster", "name": "this"}
+    return ExamplePlanCheck.model_validate(
+        {
+            "example_name": "01_basic",
+            "expected_output_dir_name": "basic",
+            "resource_checks": [{"actual": resource, "expected_resource": resource}],
+        }
+    )
+
+
+def test_diff_values_skips_equal_subtrees():
+    actual = {
+        **_cluster_values,
+        "replication_specs": [
+            {
+                "zone_name": "Zone 1",
+                "region_configs": [{"priority": 6, "region_name": "US_EAST_1", "electable_specs": {"node_count": 3}}],
+            }
+        ],
+        "backup_enabled": True,
+    }
+    actual.pop("tags")
+    changes = {change.path: change for change in diff_values(_cluster_values, actual)}
+    assert sorted(changes) == ["backup_enabled", "replication_specs[0].region_configs[0].priority", "tags"]
+    assert changes["backup_enabled"].kind == "added"
+    assert changes["tags"].kind == "removed"
+    priority = changes["replication_specs[0].region_configs[0].priority"]
+    assert (priority.kind, priority.expected, priority.actual) == ("changed", 7, 6)
+    assert not list(diff_values(_cluster_values, {**_cluster_values}))
+
+
+def test_diff_plan_output(tmp_path):
+    check = _example_check()
+    expected_path = tmp_path / check.expected_output_dir_name
+    ensure_parents_write_text(
+        expected_path / resource_type_name_filename("mongodbatlas_advanced_cluster", "this"),
+        dump(_cluster_values, "yaml"),
+    )
+    no_diff = diff_plan_output(tmp_path, check, _plan_output(_cluster_values))
+    assert not no_diff.has_changes
+
+    plan_diff = diff_plan_output(tmp_path, check, _plan_output(_cluster_values | {"name": "other"}))
+    assert plan_diff.has_changes
+    [resource_diff] = plan_diff.changed_resources
+    assert resource_diff.actual_address == "module.cluster.mongodbatlas_advanced_cluster.this"
+    assert "~ name: 'my-cluster' -> 'other'" in plan_diff.summary_md()
+    assert '"expected": "my-cluster"' in plan_diff.summary_json()
+    assert resource_diff.expected_values is None, "values are only kept for the html diff"
+
+
+def test_plan_diff_html(tmp_path):
+    check = _example_check().model_copy(update={"html_diff": True})
+    expected_path = tmp_path / check.expected_output_dir_name
+    ensure_parents_write_text(
+        expected_path / resource_type_name_filename("mongodbatlas_advanced_cluster", "this"),
+        dump(_cluster_values, "yaml"),
+    )
+    plan_diff = diff_plan_output(
+        tmp_path, check, _plan_output(_cluster_values | {"name": "other"}), keep_values=check.html_diff
+    )
+    out_dir = tmp_path / "diffs"
+    md_path = dump_plan_diff(plan_diff, out_dir / "basic", html_diff=check.html_diff)
+    assert sorted(path.name for path in out_dir.iterdir()) == ["basic.html", "basic.json", "basic.md"]
+    assert md_path == out_dir / "basic.md"
+    html_text = (out_dir / "basic.html").read_text()
+    assert "my-cluster" in html_text
+    assert "other" in html_text
+    assert '"expected_values"' not in plan_diff.summary_json()
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+from model_lib import parse_dict
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.tf_ext import provider_schema
+from atlas_init.tf_ext.constants import ATLAS_PROVIDER_NAME
+from atlas_init.tf_ext.models_module import ProviderGenConfig
+from atlas_init.tf_ext.provider_schema import (
+    AtlasSchemaInfo,
+    ProviderSchemaStore,
+    atlas_provider_binary_path,
+    atlas_provider_version_key,
+    load_atlas_schema,
+)
+from atlas_init.tf_ext.settings import TfExtSettings
+
+_resource_types = ["mongodbatlas_advanced_cluster", "mongodbatlas_cloud_backup_schedule"]
+
+
+def _schema(resource_type_schema_path) -> AtlasSchemaInfo:
+    return AtlasSchemaInfo(
+        resource_types=_resource_types,
+        deprecated_resource_types=[],
+        raw_resource_schema={
+            resource_type: parse_dict(resource_type_schema_path(resource_type)) for resource_type in _resource_types
+        },
+    )
+
+
+def test_provider_schema_store_loads_only_accessed_resources(tmp_path, resource_type_schema_path):
+    store = ProviderSchemaStore(root=tmp_path)
+    assert not store.exists("v1")
+    schema = _schema(resource_type_schema_path)
+    store.write("v1", schema)
+    assert store.exists("v1")
+
+    stored = store.read("v1")
+    assert stored.resource_types == _resource_types
+    assert stored.raw_resource_schema == {}
+    cluster_type = "mongodbatlas_advanced_cluster"
+    parsed = stored.parsed_resource_schema(cluster_type)
+    assert parsed.block.attributes
+    assert list(stored.raw_resource_schema) == [cluster_type]
+    assert stored.resource_schema(cluster_type) == schema.raw_resource_schema[cluster_type]
+    assert dict(stored.iter_resource_schemas()) == schema.raw_resource_schema
+
+
+def test_load_atlas_schema_shares_in_process_cache(resource_type_schema_path):
+    settings = TfExtSettings.from_env()
+    store = ProviderSchemaStore(root=settings.provider_cache_dir(ATLAS_PROVIDER_NAME))
+    store.write("sha1", _schema(resource_type_schema_path))
+    schema = load_atlas_schema(settings, "sha1")
+    assert schema.resource_types == _resource_types
+    assert load_atlas_schema(settings, "sha1") is schema
+
+
+def test_atlas_provider_version_key_follows_binary_content(tmp_path):
+    settings = TfExtSettings.from_env().model_copy(update={"repo_path_atlas_provider": tmp_path})
+    binary_path = atlas_provider_binary_path(settings)
+    ensure_parents_write_text(binary_path, "build 1")
+    key = atlas_provider_version_key(settings)
+    assert atlas_provider_version_key(settings) == key
+    binary_path.write_text("build 2 from uncommitted changes")
+    assert atlas_provider_version_key(settings) != key
+
+
+def test_atlas_provider_version_key_without_binary_uses_git_sha(tmp_path, monkeypatch):
+    settings = TfExtSettings.from_env().model_copy(update={"repo_path_atlas_provider": tmp_path})
+    commands = []
+
+    def run_and_wait(command: str, cwd):
+        commands.append((command, cwd))
+        return SimpleNamespace(stdout_one_line="abc123")
+
+    monkeypatch.setattr(provider_schema, "run_and_wait", run_and_wait)
+    assert atlas_provider_version_key(settings) == "abc123"
+    assert commands == [("git rev-parse HEAD", tmp_path)]
+
+
+def test_provider_gen_config_drops_last_gen_sha():
+    config = ProviderGenConfig.model_validate(
+        {"provider_path": "mongodb/mongodbatlas", "last_gen_sha": "abc123", "settings": TfExtSettings.from_env()}
+    )
+    assert config.last_gen_version_key == ""
+    assert "last_gen_sha" not in config.config_dump()
+    assert config.config_dump()["last_gen_version_key"] == ""
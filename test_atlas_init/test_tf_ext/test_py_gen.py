@@ -2,7 +2,11 @@ from dataclasses import dataclass  # noqa: F401
 from typing import Optional  # noqa: F401
 
 from atlas_init.tf_ext.py_gen import ensure_dataclass_use_conversion, longest_common_substring_among_all
-from atlas_init.tf_ext.schema_to_dataclass import run_fmt_and_fixes
+from atlas_init.tf_ext.schema_to_dataclass import (
+    module_dataclass_defs,
+    py_file_validate_and_auto_fixes,
+    simplify_classes,
+)
 
 _dataclasses_py = """
 @dataclass
@@ -46,8 +50,8 @@ def test_make_post_init_line_from_field(tmp_path, file_regression):
     py_path.write_text(_extra_imports + _dataclasses_py + _dataclasses_py2)
     dataclasses = {key: globals()[key] for key in ("_MyCls", "_Nested")}
     ensure_dataclass_use_conversion(dataclasses, py_path, set())
-    run_fmt_and_fixes(py_path)
-    file_regression.check(py_path.read_text(), basename="post_init_generation", extension=".py")
+    formatted = py_file_validate_and_auto_fixes(py_path.read_text())
+    file_regression.check(formatted, basename="post_init_generation", extension=".py")
 
 
 def test_sequence_matching():
@@ -63,3 +67,59 @@ def test_sequence_matching():
         "Auto_scaling",
     ]
     assert longest_common_substring_among_all(options2) == "AutoScaling"
+
+
+_specs_py = """from dataclasses import dataclass
+from typing import ClassVar, List, Optional, Set
+
+
+@dataclass
+class Resource_Electable_specs:
+    REQUIRED_ATTRIBUTES: ClassVar[Set[str]] = set()
+    instance_size: Optional[str] = None
+    node_count: Optional[float] = None
+
+
+@dataclass
+class Resource_Read_only_specs:
+    REQUIRED_ATTRIBUTES: ClassVar[Set[str]] = set()
+    node_count: Optional[float] = None
+    instance_size: Optional[str] = None
+
+
+@dataclass
+class Resource_Analytics_specs:
+    REQUIRED_ATTRIBUTES: ClassVar[Set[str]] = {"instance_size"}
+    instance_size: Optional[str] = None
+    node_count: Optional[float] = None
+
+
+@dataclass
+class Resource:
+    electable_specs: Optional[Resource_Electable_specs] = None
+    read_only_specs: Optional[List[Resource_Read_only_specs]] = None
+    analytics_specs: Optional[Resource_Analytics_specs] = None
+"""
+
+
+def test_module_dataclass_defs_reads_fields_statically():
+    defs = module_dataclass_defs(_specs_py)
+    assert list(defs) == [
+        "Resource_Electable_specs",
+        "Resource_Read_only_specs",
+        "Resource_Analytics_specs",
+        "Resource",
+    ]
+    analytics = defs["Resource_Analytics_specs"]
+    assert analytics.field_names == ["instance_size", "node_count"]
+    assert analytics.required == {"instance_size"}
+    assert _specs_py[analytics.index_start :].startswith("@dataclass\nclass Resource_Analytics_specs:")
+
+
+def test_simplify_classes_merges_duplicates_and_renames_in_one_pass():
+    py_code, new_names = simplify_classes(_specs_py)
+    assert new_names == {"Spec", "AnalyticsSpec"}
+    assert "class Resource_" not in py_code
+    assert py_code.count("class Spec:") == 1
+    assert "read_only_specs: Optional[List[Spec]] = None" in py_code
+    assert "analytics_specs: Optional[AnalyticsSpec] = None" in py_code
@@ -0,0 +1,124 @@
+import platform
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from zero_3rdparty.file_utils import ensure_parents_write_text
+
+from atlas_init.tf_ext import run_tf
+from atlas_init.tf_ext.run_tf import TF_LOCK_FILE_NAME, TfInitCache, TfInitManifest, workspace_sha
+
+_fake_provider_tf = """\
+terraform {
+  required_providers {
+    fake = {
+      source  = "example/fake"
+      version = "0.1.0"
+    }
+  }
+}
+"""
+
+
+def _platform() -> str:
+    machine = platform.machine().lower()
+    arch = {"x86_64": "amd64", "aarch64": "arm64"}.get(machine, machine)
+    return f"{platform.system().lower()}_{arch}"
+
+
+def _fake_provider_mirror(mirror_dir: Path) -> Path:
+    binary = mirror_dir / "registry.terraform.io/example/fake/0.1.0" / _platform() / "terraform-provider-fake_v0.1.0"
+    ensure_parents_write_text(binary, "#!/bin/sh\nexit 1\n")
+    binary.chmod(0o755)
+    return mirror_dir
+
+
+def _cache(tmp_path: Path, mirror_dir: Path | None = None) -> TfInitCache:
+    return TfInitCache(
+        plugin_cache_dir=tmp_path / "plugin_cache",
+        manifest_path=tmp_path / "manifest.yaml",
+        filesystem_mirror_dir=mirror_dir,
+    )
+
+
+def test_init_skipped_when_lockfile_unchanged(tmp_path, monkeypatch):
+    workdir = tmp_path / "ws"
+    ensure_parents_write_text(workdir / "main.tf", _fake_provider_tf)
+    commands: list[str] = []
+
+    def fake_run_and_wait(command: str, cwd: Path, env: dict, **_):
+        commands.append(command)
+        assert env[run_tf.TF_PLUGIN_CACHE_DIR_ENV_NAME]
+        (cwd / ".terraform/providers").mkdir(parents=True, exist_ok=True)
+        (cwd / TF_LOCK_FILE_NAME).write_text('provider "registry.terraform.io/example/fake" {}')
+
+    monkeypatch.setattr(run_tf, "run_and_wait", fake_run_and_wait)
+    cache = _cache(tmp_path)
+    assert cache.init(workdir)
+    assert not cache.init(workdir)
+    cache.store_manifest()
+    assert len(commands) == 1
+    assert list(cache.report.skipped) == [str(workdir / ".terraform")]
+    assert "skipped 1 dirs" in str(cache.report)
+
+    reloaded = _cache(tmp_path)
+    assert reloaded.manifest.records[str(workdir / ".terraform")].workspace_sha == workspace_sha(workdir)
+    assert not reloaded.init(workdir)
+    (workdir / TF_LOCK_FILE_NAME).write_text("changed")
+    assert reloaded.init(workdir)
+    assert len(commands) == 2
+    assert not reloaded.init(workdir)
+    (workdir / "main.tf").write_text(_fake_provider_tf.replace("0.1.0", "0.2.0"))
+    assert reloaded.init(workdir)
+    assert len(commands) == 3
+
+
+def test_first_init_fills_plugin_cache_alone(tmp_path, monkeypatch):
+    events: list[tuple[str, str]] = []
+
+    def fake_run_and_wait(command: str, cwd: Path, env: dict, **_):
+        assert "TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE" not in env
+        events.append(("start", cwd.name))
+        time.sleep(0.05)
+        (cwd / TF_LOCK_FILE_NAME).write_text("lock")
+        events.append(("end", cwd.name))
+
+    monkeypatch.setattr(run_tf, "run_and_wait", fake_run_and_wait)
+    cache = _cache(tmp_path)
+    workdirs = [tmp_path / f"ws{i}" for i in range(4)]
+    for workdir in workdirs:
+        ensure_parents_write_text(workdir / "main.tf", _fake_provider_tf)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(cache.init, workdirs))
+    assert events[0][0] == "start"
+    assert events[1] == ("end", events[0][1])
+    assert len(events) == 8  # noqa: PLR2004
+
+
+def test_init_runs_when_modules_missing(tmp_path, monkeypatch):
+    workdir = tmp_path / "ws"
+    ensure_parents_write_text(workdir / "main.tf", 'module "fake" {\n  source = "./fake"\n}\n')
+    (workdir / ".terraform/providers").mkdir(parents=True)
+    (workdir / TF_LOCK_FILE_NAME).write_text("lock")
+    cache = _cache(tmp_path)
+    cache.manifest = TfInitManifest.model_validate(
+        {"records": {str(workdir / ".terraform"): {"workspace_sha": workspace_sha(workdir), "duration_seconds": 1.0}}}
+    )
+    assert not cache.is_initialized(workdir)
+    ensure_parents_write_text(workdir / ".terraform/modules/modules.json", "{}")
+    assert cache.is_initialized(workdir)
+
+
+@pytest.mark.skipif(shutil.which("terraform") is None, reason="needs terraform binary")
+def test_init_offline_with_filesystem_mirror(tmp_path):
+    mirror_dir = _fake_provider_mirror(tmp_path / "mirror")
+    cache = _cache(tmp_path, mirror_dir)
+    workdirs = [tmp_path / f"ws{i}" for i in range(2)]
+    for workdir in workdirs:
+        ensure_parents_write_text(workdir / "main.tf", _fake_provider_tf)
+    assert all(cache.init(workdir, attempts=1) for workdir in workdirs)
+    assert not any(cache.init(workdir, attempts=1) for workdir in workdirs)
+    assert len(cache.report.ran) == 2
+    assert len(cache.report.skipped) == 2
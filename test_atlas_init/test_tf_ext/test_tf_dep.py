@@ -5,6 +5,8 @@ from unittest.mock import MagicMock
 from pydot import Graph
 import pytest
 from atlas_init.tf_ext.tf_dep import (
+    AtlasGraph,
+    GraphCycleError,
     ResourceRef,
     create_atlas_graph,
     find_variable_resource_type_usages,
@@ -52,3 +54,40 @@ def test_find_variables(tf_variables_path):
 def test_module_name():
     ref = ResourceRef(full_ref="module.vpc")
     assert ref.module_name == "vpc"
+
+
+def test_atlas_graph_indexes():
+    graph = AtlasGraph()
+    graph.add_internal_edge("mongodbatlas_organization", "mongodbatlas_project")
+    graph.add_internal_edge("mongodbatlas_project", "mongodbatlas_advanced_cluster")
+    graph.add_internal_edge("mongodbatlas_project", "mongodbatlas_database_user")
+    assert graph.parents("mongodbatlas_advanced_cluster") == {"mongodbatlas_project"}
+    assert graph.ancestors("mongodbatlas_advanced_cluster") == {"mongodbatlas_organization", "mongodbatlas_project"}
+    assert graph.topological_order() == [
+        "mongodbatlas_organization",
+        "mongodbatlas_project",
+        "mongodbatlas_advanced_cluster",
+        "mongodbatlas_database_user",
+    ]
+    graph.add_internal_edge("mongodbatlas_advanced_cluster", "mongodbatlas_search_deployment")
+    assert graph.parents("mongodbatlas_search_deployment") == {"mongodbatlas_advanced_cluster"}
+    assert "mongodbatlas_search_deployment" in graph.descendants("mongodbatlas_organization")
+    assert graph.topological_order()[-1] == "mongodbatlas_search_deployment"
+    graph.add_internal_edge("mongodbatlas_search_deployment", "mongodbatlas_project")
+    with pytest.raises(GraphCycleError):
+        graph.topological_order()
+
+
+def test_atlas_graph_large_synthetic():
+    node_count = 10_000
+    nodes = [f"mongodbatlas_r{i:05d}" for i in range(node_count)]
+    graph = AtlasGraph()
+    for i in range(1, node_count):
+        for parent in {i // 2, max(i - 50, 0)}:
+            graph.add_internal_edge(nodes[parent], nodes[i])
+    order = graph.topological_order()
+    positions = {node: i for i, node in enumerate(order)}
+    assert len(order) == node_count
+    assert all(positions[parent] < positions[child] for parent, child in graph.iterate_internal_edges())
+    assert len(graph.descendants(nodes[0])) == node_count - 1
+    assert graph.ancestors(nodes[-1]) >= {nodes[(node_count - 1) // 2], nodes[0]}